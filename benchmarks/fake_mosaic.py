@@ -0,0 +1,298 @@
+"""
+A local stand-in for a Rubrik Mosaic cluster, used to run and benchmark the SDK without a live cluster.
+
+The server implements the endpoints used by the reporting functions over HTTPS and serves a synthetic cluster of
+configurable size. Each response can be delayed to simulate the latency of a real cluster.
+
+Usage: python benchmarks/fake_mosaic.py [--port 9090] [--stores 10] [--sources 100] [--policies 100] [--jobs 10000] [--latency 0.02]
+
+Connect to it with rubrik_mosaic.Connect('127.0.0.1', 'admin', 'admin', port=9090). A self-signed certificate is
+generated with the openssl command unless --cert and --key are provided.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+    class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+try:
+    from urllib.parse import parse_qs, unquote
+except ImportError:
+    from urlparse import parse_qs
+    from urllib import unquote
+
+JOB_STATES = ('job_successful', 'job_failed', 'job_scheduled', 'job_aborted')
+
+
+class SyntheticCluster():
+    """The stores, sources, policies and jobs of a synthetic Rubrik Mosaic cluster. The same seed always generates the same
+    cluster so benchmark runs are comparable.
+
+    Keyword Arguments:
+        stores {int} -- The number of backup stores. (default: {10})
+        sources {int} -- The number of data sources. (default: {100})
+        policies {int} -- The number of backup policies. (default: {100})
+        jobs {int} -- The number of jobs, spread over the last 72 hours. (default: {10000})
+        seed {int} -- The seed of the random number generator. (default: {0})
+    """
+
+    def __init__(self, stores=10, sources=100, policies=100, jobs=10000, seed=0):
+        rng = random.Random(seed)
+        now = int(time.time())
+
+        self.stores = ['store-{}'.format(index) for index in range(stores)]
+        self.store_stats = {}
+        for name in self.stores:
+            self.store_stats[name] = {name: {'store_stats': {
+                'store_size': '{} GB'.format(rng.randint(100, 100000)),
+                'store_type': rng.choice(['S3', 'NFS', 'AZURE']),
+                'dedup_ratio': round(rng.uniform(1, 20), 2),
+            }}}
+
+        self.sources = ['source-{}'.format(index) for index in range(sources)]
+        self.source_stats = {}
+        for name in self.sources:
+            self.source_stats[name] = {
+                'source_name': name,
+                'source_type': rng.choice(['MONGO', 'CASSANDRA', 'HIVE']),
+                'db_stats': {'status': rng.random() < 0.9, 'licensed_size': str(rng.randint(1, 500000))},
+            }
+
+        self.policies = []
+        for index in range(policies):
+            self.policies.append({
+                '_id': 'policy-{}'.format(index),
+                'sys_p_doc': {
+                    'policy_group_name': 'policy-group-{}'.format(index),
+                    'source_mgmt_obj': self.sources[index % len(self.sources)] if self.sources else 'source',
+                    'policy_disabled': rng.random() < 0.1,
+                    'backup_store': self.stores[index % len(self.stores)] if self.stores else 'store',
+                    'retention': {'days': rng.choice([7, 14, 30, 90])},
+                },
+                'physical_size': rng.randint(1, 100000),
+                'version_count': rng.randint(1, 500),
+            })
+
+        self.jobs = []
+        for index in range(jobs):
+            end_time = now - rng.randint(0, 72 * 3600)
+            self.jobs.append({
+                '_id': 'job-{}'.format(index),
+                'current_state': rng.choice(JOB_STATES),
+                'start_time': end_time - rng.randint(60, 7200),
+                'end_time': end_time,
+                'policy_id': 'policy-{}'.format(index % max(policies, 1)),
+                'job_type': rng.choice(['backup', 'restore', 'refresh']),
+                'bytes_transferred': rng.randint(0, 10 ** 10),
+            })
+
+    def responses(self):
+        """Serialize the response body of every GET endpoint once so the server does not spend time on it per request.
+
+        Returns:
+            dict -- The encoded response body keyed by the request path.
+        """
+        responses = {
+            '/datos/liststore': {'status': 'ok', 'data': [{'store_name': name} for name in self.stores]},
+            '/datos/listsource': {'status': 'ok', 'data': [{'source_name': name} for name in self.sources]},
+            '/datos/listpolicy': {'status': 'ok', 'data': self.policies},
+            '/datos/listjobs': {'status': 'ok', 'data': self.jobs},
+        }
+        for name, stats in self.store_stats.items():
+            responses['/datos/getstorestats/{}'.format(name)] = {'status': 'ok', 'data': stats}
+        for name, stats in self.source_stats.items():
+            responses['/datos/getsourcestats/{}'.format(name)] = {'status': 'ok', 'data': stats}
+        return dict((path, json.dumps(body).encode('utf-8')) for path, body in responses.items())
+
+
+class FakeMosaicServer():
+    """A local HTTPS server that answers the Rubrik Mosaic API calls of the SDK from a SyntheticCluster.
+
+    Arguments:
+        cluster {SyntheticCluster} -- The cluster to serve.
+
+    Keyword Arguments:
+        host {str} -- The address to listen on. (default: {'127.0.0.1'})
+        port {int} -- The port to listen on, 0 picks a free port. (default: {0})
+        latency {float} -- The number of seconds each response is delayed by. (default: {0})
+        jitter {float} -- A random number of seconds, up to this value, added to the latency of each response. (default: {0})
+        username {str} -- The username accepted by /datos/login. (default: {'admin'})
+        password {str} -- The password accepted by /datos/login. (default: {'admin'})
+        cert {str} -- The path of the certificate to serve. If a value is not provided a self-signed certificate is generated. (default: {None})
+        key {str} -- The path of the private key of the certificate. (default: {None})
+    """
+
+    def __init__(self, cluster, host='127.0.0.1', port=0, latency=0, jitter=0, username='admin', password='admin', cert=None, key=None):
+        self.cluster = cluster
+        self.latency = latency
+        self.jitter = jitter
+        self.username = username
+        self.password = password
+        self.requests = 0
+        self.logins = 0
+        self._tokens = set()
+        self._responses = cluster.responses()
+        self._lock = threading.Lock()
+        self._temp_dir = None
+        if cert is None:
+            cert, key = self._self_signed_certificate()
+
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def _self_signed_certificate(self):
+        """Internal method used to generate a short lived self-signed certificate with the openssl command."""
+        self._temp_dir = tempfile.mkdtemp(prefix='fake_mosaic_')
+        cert = os.path.join(self._temp_dir, 'cert.pem')
+        key = os.path.join(self._temp_dir, 'key.pem')
+        subprocess.check_call(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-subj', '/CN=localhost', '-days', '1',
+                               '-keyout', key, '-out', cert], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return cert, key
+
+    def start(self):
+        """Serve requests on a background thread.
+
+        Returns:
+            FakeMosaicServer -- The running server.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve requests on the current thread until interrupted."""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop the server and remove the generated certificate."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def delay(self):
+        """Sleep for the configured latency of a response."""
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def login(self, form):
+        """Validate the credentials of a login request.
+
+        Returns:
+            str -- A new API token, or None if the credentials are invalid.
+        """
+        if form.get('username') != self.username or form.get('password') != self.password:
+            return None
+        with self._lock:
+            self.logins += 1
+            token = 'fake-mosaic-token-{}'.format(self.logins)
+            self._tokens.add(token)
+        return token
+
+    def authorized(self, token):
+        with self._lock:
+            self.requests += 1
+            return token in self._tokens
+
+    def response(self, path):
+        return self._responses.get(unquote(path.split('?', 1)[0]))
+
+
+def _handler(server):
+    """Internal function used to create the request handler class of a FakeMosaicServer."""
+
+    class FakeMosaicHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # The headers and body are written separately, with Nagle's algorithm each small response would wait on a delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body):
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length).decode('utf-8')
+            server.delay()
+            if self.path.split('?', 1)[0] != '/datos/login':
+                return self._send(404, {'errorType': 'NotFound', 'message': 'Unknown endpoint {}'.format(self.path)})
+            form = dict((key, values[0]) for key, values in parse_qs(body).items())
+            token = server.login(form)
+            if token is None:
+                return self._send(401, {'errorType': 'AuthenticationFailed', 'message': 'Invalid username or password'})
+            self._send(200, {'status': 'ok', 'data': {'token': token}})
+
+        def do_GET(self):
+            server.delay()
+            if not server.authorized(self.headers.get('x-access-token')):
+                return self._send(401, {'errorType': 'Unauthorized', 'message': 'Invalid API token'})
+            body = server.response(self.path)
+            if body is None:
+                return self._send(404, {'errorType': 'NotFound', 'message': 'Unknown endpoint {}'.format(self.path)})
+            self._send(200, body)
+
+    return FakeMosaicHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a synthetic Rubrik Mosaic cluster.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9090)
+    parser.add_argument('--stores', type=int, default=10)
+    parser.add_argument('--sources', type=int, default=100)
+    parser.add_argument('--policies', type=int, default=100)
+    parser.add_argument('--jobs', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0, help='Seconds to delay each response by.')
+    parser.add_argument('--jitter', type=float, default=0, help='Maximum random seconds added to the latency.')
+    parser.add_argument('--cert')
+    parser.add_argument('--key')
+    args = parser.parse_args()
+
+    cluster = SyntheticCluster(args.stores, args.sources, args.policies, args.jobs, args.seed)
+    server = FakeMosaicServer(cluster, args.host, args.port, args.latency, args.jitter, cert=args.cert, key=args.key)
+    print('Serving a synthetic Rubrik Mosaic cluster on https://{}:{} (username admin, password admin)'.format(server.host, server.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Measure how long importing the SDK takes, which every short-lived reporting script run from cron pays.
+
+Each scenario is run in a new interpreter with `python -X importtime` and the cumulative import time of the statement is
+taken from its report. The `total` time is what a script pays to import the SDK, third party packages included, and the
+slowest imports of that run are listed below each scenario. The `sdk` time is measured again with the third party
+packages the scenario needs (ex. requests) imported beforehand, so it only covers the modules of the SDK and what they
+import, and is shown as a share of the total. The targets apply to the `sdk` time, as the SDK cannot make requests or
+aiohttp import faster, and the benchmark fails when the median `sdk` time of a scenario is over its target.
+
+Usage: python benchmarks/import_time.py [--repeat 15] [--top 15] [--scale 1.0] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+MARKER = 'rubrik_mosaic_import_time'
+
+# name, statement, packages imported before the measurement starts, target in milliseconds for the `sdk` time
+SCENARIOS = [
+    ('package', 'import rubrik_mosaic', [], 5),
+    ('connect', 'import rubrik_mosaic; rubrik_mosaic.Connect', ['requests'], 20),
+    ('async_connect', 'import rubrik_mosaic; rubrik_mosaic.AsyncConnect', ['requests', 'aiohttp'], 25),
+]
+
+
+def import_times(statement, preload=()):
+    """Run `statement` in a new interpreter and return its total import time and the cumulative time of each module it
+    imported directly, in milliseconds."""
+    code = '; '.join(['import {}'.format(name) for name in preload] + [
+        'import sys',
+        'sys.stderr.write("import time: {}\\n")'.format(MARKER),
+        statement,
+    ])
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # Cron runs the compiled modules, so make sure they are written and used
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env, stderr=subprocess.PIPE,
+                            universal_newlines=True, check=True).stderr
+
+    modules = []
+    started = False
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        if line.endswith(MARKER):
+            started = True
+            continue
+        fields = line[len('import time:'):].split('|')
+        if not started or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2][1:]
+        # Only count the modules imported directly by the statement, the others are included in their cumulative time
+        if not name.startswith(' '):
+            modules.append((name, int(fields[1]) / 1000.0))
+    return sum(time for name, time in modules), modules
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--top', type=int, default=15, help='The number of the slowest imports of each scenario to list.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply the targets, ex. on a slower machine.')
+    parser.add_argument('--json', default=None, help='Write the results to this file.')
+    args = parser.parse_args()
+
+    # Compile the modules once so the first measurement does not include it
+    for name, statement, preload, target in SCENARIOS:
+        import_times(statement)
+
+    results = []
+    failed = False
+    print('{:<14} {:>10} {:>10} {:>10} {:>10}'.format('scenario', 'total ms', 'sdk ms', 'sdk share', 'target ms'))
+    for name, statement, preload, target in SCENARIOS:
+        try:
+            totals = []
+            for _ in range(args.repeat):
+                time, modules = import_times(statement)
+                totals.append(time)
+            # Without third party packages to preload the whole import time is the time of the SDK
+            sdk = [import_times(statement, preload)[0] for _ in range(args.repeat)] if preload else totals
+        except subprocess.CalledProcessError:
+            print('{:<14} skipped, {} is not installed'.format(name, ' or '.join(preload)))
+            continue
+        target = target * args.scale
+        result = {'scenario': name, 'total_ms': median(totals), 'sdk_ms': median(sdk), 'target_ms': target}
+        result['sdk_share'] = result['sdk_ms'] / result['total_ms'] if result['total_ms'] else 1.0
+        results.append(result)
+        failed = failed or result['sdk_ms'] > target
+        print('{:<14} {:>10.1f} {:>10.1f} {:>10.0%} {:>10.1f}{}'.format(
+            name, result['total_ms'], result['sdk_ms'], result['sdk_share'], target, '' if result['sdk_ms'] <= target else '  OVER TARGET'))
+        for module, time in sorted(modules, key=lambda module: -module[1])[:args.top]:
+            print('    {:<40} {:>8.1f}'.format(module, time))
+
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
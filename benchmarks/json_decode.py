@@ -0,0 +1,54 @@
+"""
+Measure how long each available JSON backend takes to decode the responses of the Rubrik Mosaic API.
+
+The synthetic responses the SDK decodes with its JSON backend, a large /listpolicy body and the many small
+/getsourcestats and /login bodies, are decoded with each backend the SDK can use: the standard library json module and
+orjson when it is installed. The streamed calls, such as /listjobs, are parsed incrementally with the json module
+whichever backend is selected so they are not measured.
+
+Usage: python benchmarks/json_decode.py [--policies 20000] [--sources 2000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rubrik_mosaic.json_backend import BACKENDS  # noqa: E402
+from fake_mosaic import SyntheticCluster  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--policies', type=int, default=20000)
+    parser.add_argument('--sources', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cluster = SyntheticCluster(stores=1, sources=args.sources, policies=args.policies, jobs=1)
+    # Each endpoint has the list of response bodies decoded by a reporting run, the tiny /login body is repeated as many
+    # times as there are sources so it is timed over as many decodes as the stats
+    responses = [
+        ('/listpolicy', [json.dumps({'status': 'ok', 'data': cluster.policies}).encode('utf-8')]),
+        ('/getsourcestats', [json.dumps({'status': 'ok', 'data': stats}).encode('utf-8') for stats in cluster.source_stats.values()]),
+        ('/login', [json.dumps({'status': 'ok', 'data': {'token': 'token-{}'.format(index)}}).encode('utf-8') for index in range(args.sources)]),
+    ]
+
+    for endpoint, bodies in responses:
+        baseline = None
+        for name in sorted(BACKENDS):
+            # Decode once so a backend that is imported on first use is imported before it is timed
+            BACKENDS[name](b'{}')
+            loads = BACKENDS[name]
+            best = min(timeit.repeat(lambda: [loads(body) for body in bodies], number=1, repeat=args.repeat))
+            baseline = baseline or best
+            print('{:<16} {:<8} {:>6} x {:>9} bytes {:.3f} seconds ({:.1f}x json)'.format(
+                endpoint, name, len(bodies), sum(map(len, bodies)) // len(bodies), best, baseline / best))
+
+
+if __name__ == '__main__':
+    main()
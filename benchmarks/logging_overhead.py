@@ -0,0 +1,134 @@
+"""
+Measure the time the reporting functions spend on debug logging while debug logging is disabled.
+
+A synthetic job history and set of policies and sources is summarized with logging disabled, which is how the SDK usually
+runs, and again with debug logging enabled and sent to a handler that discards the messages. The same loops are also run
+with the logging of the SDK before debug logging was made lazy, inlined below as `baseline_log()` and `baseline_run()`,
+so the overhead can be compared before and after the change.
+
+Usage: python benchmarks/logging_overhead.py [--jobs 200000] [--policies 20000] [--repeat 5]
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rubrik_mosaic.rubrik_mosaic import Connect  # noqa: E402
+from rubrik_mosaic.reporting import _JobSummary, _backup_count, _secondary_storage_consumed, _size_under_protection, _log_policies  # noqa: E402
+
+JOB_STATES = ['job_failed', 'job_aborted']
+WINDOWS = [1, 24, 72]
+
+
+def synthetic_jobs(count):
+    now = int(time.time())
+    states = ['job_successful', 'job_failed', 'job_scheduled', 'job_aborted']
+    jobs = []
+    for index in range(count):
+        end_time = now - (index * 7) % (72 * 3600)
+        jobs.append({
+            '_id': 'job-{}'.format(index),
+            'current_state': states[index % len(states)],
+            'start_time': end_time - 600,
+            'end_time': end_time,
+        })
+    return jobs
+
+
+def synthetic_policies(count):
+    return [{
+        'sys_p_doc': {'policy_group_name': 'policy-{}'.format(index), 'source_mgmt_obj': 'db-{}'.format(index), 'policy_disabled': False},
+        'physical_size': index,
+        'version_count': index % 30,
+    } for index in range(count)]
+
+
+def run(jobs, policies, sources):
+    _JobSummary(JOB_STATES, WINDOWS, Connect.log).extend(jobs).result()
+    _log_policies(policies, Connect.log)
+    _secondary_storage_consumed(policies, Connect.log)
+    _backup_count(policies, Connect.log)
+    _size_under_protection(sources, Connect.log)
+
+
+def baseline_log(log_message):
+    """Connect.log() before debug logging was made lazy."""
+    log = logging.getLogger('rubrik_mosaic.rubrik_mosaic')
+    log.debug(log_message)
+
+
+def baseline_run(jobs, policies, sources):
+    """The loops of run() with the logging of the SDK before debug logging was made lazy: every message is formatted by the
+    caller and passed to `baseline_log()` whether debug logging is enabled or not."""
+    baseline_log('get_job_summary - Attepting to find \'{}\' jobs within the last {} hours'.format(JOB_STATES, WINDOWS))
+    currenttime = time.time()
+    cutoffs = [currenttime - hours * 3600 for hours in WINDOWS]
+    oldest = min(cutoffs)
+    matches = [[] for _ in WINDOWS]
+    for job in jobs:
+        end_time = job['end_time']
+        if job['current_state'] in JOB_STATES and end_time >= oldest:
+            starttime = datetime.datetime.fromtimestamp(job['start_time'])
+            endtime = datetime.datetime.fromtimestamp(end_time)
+            baseline_log('get_job_summary - Found match! job id: {} | start time: {} | end time: {} | status: {}'.format(job['_id'], starttime.strftime("%m-%d-%Y %H:%M:%S"), endtime.strftime("%m-%d-%Y %H:%M:%S"), job['current_state']))
+            for window, cutoff in zip(matches, cutoffs):
+                if end_time >= cutoff:
+                    window.append(job)
+
+    for policy in policies:
+        baseline_log('get_policies - Found the following policy: {} - {}'.format(policy['sys_p_doc']['policy_group_name'], policy['sys_p_doc']['source_mgmt_obj']))
+
+    secondarystorageconsumed = 0
+    for policy in policies:
+        baseline_log('get_secondary_storage_consumed - {} - {} is storing {} MB of data'.format(policy['sys_p_doc']['policy_group_name'], policy['sys_p_doc']['source_mgmt_obj'], policy['physical_size']))
+        secondarystorageconsumed += int(policy['physical_size'])
+
+    backupcount = 0
+    for policy in policies:
+        baseline_log('get_backup_count - {} - {} has {} versions'.format(policy['sys_p_doc']['policy_group_name'], policy['sys_p_doc']['source_mgmt_obj'], policy['version_count']))
+        backupcount += int(policy['version_count'])
+
+    sizeunderprotection = 0
+    baseline_log('get_size_under_protection - Calculating capacity under protection')
+    for source in sources:
+        if source['db_stats']['status'] == True:
+            baseline_log('get_size_under_protection - source {} has {} MB under protection'.format(source['source_name'], source['db_stats']['licensed_size']))
+            sizeunderprotection += int(source['db_stats']['licensed_size'])
+        elif source['db_stats']['status'] != True:
+            baseline_log('get_size_under_protection - source {} has a status of {}, skipping it'.format(source['source_name'], source['db_stats']['status']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=200000)
+    parser.add_argument('--policies', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    jobs = synthetic_jobs(args.jobs)
+    policies = synthetic_policies(args.policies)
+    sources = [{'source_name': 'source-{}'.format(index), 'db_stats': {'status': index % 2 == 0, 'licensed_size': index}} for index in range(args.policies)]
+
+    logger = logging.getLogger('rubrik_mosaic')
+    logger.propagate = False
+    logger.handlers = [logging.NullHandler()]
+    results = {}
+    print('{:<10} {:<15} {:>8}'.format('logging', 'debug logging', 'seconds'))
+    for name, function in (('baseline', baseline_run), ('current', run)):
+        for enabled in (False, True):
+            logger.setLevel(logging.DEBUG if enabled else logging.WARNING)
+            best = min(timeit.repeat(lambda: function(jobs, policies, sources), number=1, repeat=args.repeat))
+            results[name, enabled] = best
+            print('{:<10} {:<15} {:>8.3f}'.format(name, 'enabled' if enabled else 'disabled', best))
+    print('with debug logging disabled the current logging is {:.1f}x faster than the baseline'.format(
+        results['baseline', False] / results['current', False]))
+
+
+if __name__ == '__main__':
+    main()
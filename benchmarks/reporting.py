@@ -0,0 +1,154 @@
+"""
+Measure the latency, throughput and peak memory of every reporting function against a local fake Rubrik Mosaic cluster.
+
+For each scale a synthetic cluster is served by benchmarks/fake_mosaic.py in a separate process, so the server does not
+compete with the SDK for the interpreter, and every reporting function is called `--repeat` times on a logged in
+connection. Peak memory is the largest amount of memory allocated by Python during a call, measured with tracemalloc in
+a separate pass so it does not slow down the timed calls.
+
+Usage: python benchmarks/reporting.py [--scales small,medium] [--repeat 5] [--latency 0.005] [--max-workers 8] [--json-backend json] [--records] [--json results.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rubrik_mosaic.rubrik_mosaic import Connect  # noqa: E402
+from rubrik_mosaic.json_backend import BACKENDS, get_json_backend, set_json_backend  # noqa: E402
+from fake_mosaic import FakeMosaicServer, SyntheticCluster  # noqa: E402
+
+SCALES = {
+    'small': {'stores': 5, 'sources': 20, 'policies': 50, 'jobs': 1000},
+    'medium': {'stores': 20, 'sources': 200, 'policies': 1000, 'jobs': 50000},
+    'large': {'stores': 50, 'sources': 1000, 'policies': 10000, 'jobs': 500000},
+}
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    numpy = None
+
+# The reporting functions and the number of items each one returns, used to compute the throughput
+BENCHMARKS = [
+    ('get_store_stats', lambda mosaic: mosaic.get_store_stats(), 'stores'),
+    ('get_source_stats', lambda mosaic: mosaic.get_source_stats(), 'sources'),
+    ('get_policies', lambda mosaic: mosaic.get_policies(), 'policies'),
+    ('get_jobs', lambda mosaic: mosaic.get_jobs(), 'jobs'),
+    ('iter_jobs', lambda mosaic: sum(1 for _ in mosaic.iter_jobs()), 'jobs'),
+    ('get_job_summary', lambda mosaic: mosaic.get_job_summary('job_failed', 24), 'jobs'),
+    ('get_job_table', lambda mosaic: mosaic.get_job_table(), 'jobs'),
+    ('get_protected_object_count', lambda mosaic: mosaic.get_protected_object_count(), 'policies'),
+    ('get_size_under_protection', lambda mosaic: mosaic.get_size_under_protection(), 'sources'),
+    ('get_secondary_storage_consumed', lambda mosaic: mosaic.get_secondary_storage_consumed(), 'policies'),
+    ('get_backup_count', lambda mosaic: mosaic.get_backup_count(), 'policies'),
+    ('snapshot', lambda mosaic: mosaic.snapshot(), None),
+]
+
+
+def serve(size, latency, ready, stop):
+    server = FakeMosaicServer(SyntheticCluster(**size), latency=latency).start()
+    ready.put(server.port)
+    stop.wait()
+    server.stop()
+
+
+def measure(mosaic, function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(mosaic)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function(mosaic)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return timings, peak
+
+
+def run_scale(name, size, args):
+    ready = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    process = multiprocessing.Process(target=serve, args=(size, args.latency, ready, stop))
+    process.start()
+    results = []
+    try:
+        port = ready.get(timeout=60)
+        mosaic = Connect('127.0.0.1', 'admin', 'admin', port=port, max_workers=args.max_workers, records=args.records)
+        mosaic.get_policies()
+        for benchmark, function, unit in BENCHMARKS:
+            if args.functions and benchmark not in args.functions:
+                continue
+            if benchmark == 'get_job_table' and numpy is None:
+                print('{:<8} {:<32} skipped, the numpy package is not installed'.format(name, benchmark))
+                continue
+            timings, peak = measure(mosaic, function, args.repeat)
+            median = statistics.median(timings)
+            items = size[unit] if unit is not None else sum(size.values())
+            result = {
+                'scale': name,
+                'function': benchmark,
+                'items': items,
+                'min': min(timings),
+                'median': median,
+                'max': max(timings),
+                'throughput': items / median if median else None,
+                'peak_memory': peak,
+            }
+            results.append(result)
+            print('{scale:<8} {function:<32} {median:>9.4f}s {min:>9.4f}s {max:>9.4f}s {throughput:>12,.0f}/s {peak_mb:>9.1f} MB'.format(
+                peak_mb=peak / 1024.0 / 1024.0, **result))
+    finally:
+        stop.set()
+        process.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', default='small,medium', help='Comma separated scales to run. (choices: {})'.format(', '.join(SCALES)))
+    parser.add_argument('--functions', default=None, help='Comma separated reporting functions to run. All of them are run by default.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds the fake cluster delays each response by.')
+    parser.add_argument('--max-workers', type=int, default=1)
+    parser.add_argument('--json-backend', default=None, choices=sorted(BACKENDS), help='The JSON backend used to decode the responses. The default backend is used if not provided.')
+    parser.add_argument('--records', action='store_true', help='Return Job, Policy, SourceStats and StoreStats records instead of dicts.')
+    parser.add_argument('--json', default=None, help='Write the results to this file to compare runs.')
+    args = parser.parse_args()
+    args.functions = set(args.functions.split(',')) if args.functions else None
+    warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+    if args.json_backend:
+        set_json_backend(args.json_backend)
+
+    print('{:<8} {:<32} {:>10} {:>10} {:>10} {:>14} {:>12}'.format('scale', 'function', 'median', 'min', 'max', 'throughput', 'peak memory'))
+    results = []
+    for name in args.scales.split(','):
+        results.extend(run_scale(name, SCALES[name], args))
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'repeat': args.repeat,
+                'latency': args.latency,
+                'max_workers': args.max_workers,
+                'json_backend': get_json_backend(),
+                'records': args.records,
+                'results': results,
+            }, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
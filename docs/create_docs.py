@@ -121,14 +121,10 @@ for function in rubrik_mosaic_sdk_functions:
 
     function_code = inspect.getsource(function[1])
 
-    if '@staticmethod' in function_code:
-        function_code = function_code.replace('@staticmethod\n', '')
-        function_code = function_code.splitlines()[0].replace(
-            'self, ', '').replace('self', '').replace(':', '').strip()
-
-    else:
-        function_code = function_code.splitlines()[0].replace(
-            'self, ', '').replace('self', '').replace(':', '').strip()
+    # Skip any decorators (ex. @staticmethod) to document the function definition itself
+    function_definition = [line for line in function_code.splitlines() if line.strip().startswith('def ')][0]
+    function_code = function_definition.replace(
+        'self, ', '').replace('self', '').replace(':', '').strip()
 
     function_examples[function[0]] = function_code
 
@@ -137,7 +133,7 @@ for function_name, function_doc_string in function_documentation.items():
 
     # print(function_name)
 
-    if 'init' not in function_name:
+    if not function_name.startswith('__'):
         arguments_start = None
         keyword_argument_start = None
         return_start = None
@@ -255,17 +251,14 @@ base_api_functions_search = inspect.getmembers(rubrik_mosaic.rubrik_mosaic.Api,
 base_api_functions = []
 for function in base_api_functions_search:
     # If first character of the function name...
-    base_api_functions.append(function[0])
-del base_api_functions[0]
+    if not function[0].startswith('__'):
+        base_api_functions.append(function[0])
 
 reporting_search = inspect.getmembers(rubrik_mosaic.rubrik_mosaic.Reporting, inspect.isfunction)
 reporting_functions = []
 for function in reporting_search:
-    if function[0] not in base_api_functions:
+    if function[0] not in base_api_functions and function[0][0] != '_':
         reporting_functions.append(function[0])
-for function in reporting_functions:
-    if function[0] is '_':
-        reporting_functions.remove(function)
 
 
 combined_function_list = base_api_functions + reporting_functions
@@ -273,9 +266,8 @@ combined_function_list = base_api_functions + reporting_functions
 connect_functions_search = inspect.getmembers(rubrik_mosaic.rubrik_mosaic.Connect, inspect.isfunction)
 connect_functions = []
 for function in connect_functions_search:
-    if function[0] not in combined_function_list:
+    if function[0] not in combined_function_list and not function[0].startswith('__'):
         connect_functions.append(function[0])
-del connect_functions[0]
 
 # Create the SUMMARY (side navigation) Document
 markdown = open('SUMMARY.md', 'w')
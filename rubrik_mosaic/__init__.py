@@ -1,16 +1,56 @@
 "rubrik: A Python package for interacting with the Rubrik Mosaic API."
 
-from .rubrik_mosaic import Connect
+import sys
+from importlib import import_module
 
-import logging
+# The classes and functions of the SDK, keyed by name, with the module they are defined in. The modules are only imported
+# when a name is first used so `import rubrik_mosaic` does not pay for importing requests, aiohttp or numpy up front
+_LAZY = {
+    'Connect': 'rubrik_mosaic',
+    'AsyncConnect': 'async_rubrik_mosaic',
+    'ResponseCache': 'cache',
+    'RequestCoalescer': 'coalesce',
+    'JobSync': 'job_sync',
+    'JobTable': 'job_table',
+    'JobWatcher': 'job_watch',
+    'JobTransition': 'job_watch',
+    'MosaicFleet': 'fleet',
+    'RetryPolicy': 'retry',
+    'CircuitBreaker': 'retry',
+    'NodePool': 'node_pool',
+    'MetricsRegistry': 'metrics',
+    'Tracer': 'tracing',
+    'Transport': 'transport',
+    'RecordTransport': 'transport',
+    'ReplayTransport': 'transport',
+    'get_json_backend': 'json_backend',
+    'set_json_backend': 'json_backend',
+    'Job': 'records',
+    'Policy': 'records',
+    'SourceStats': 'records',
+    'StoreStats': 'records',
+    'BulkExporter': 'bulk_export',
+    'log': 'logger',
+    'console_output_handler': 'logger',
+}
 
-# Define the logging params
-console_output_handler = logging.StreamHandler()
-formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] -- %(message)s")
-console_output_handler.setFormatter(formatter)
 
-log = logging.getLogger(__name__)
-log.addHandler(console_output_handler)
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(import_module('.' + _LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is only supported from Python 3.7, import every name up front on earlier versions
+    for _name in _LAZY:
+        __getattr__(_name)
 
 __version__ = "1.0"
 __author__ = "Rubrik Build"
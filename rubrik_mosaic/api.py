@@ -16,15 +16,25 @@ This module contains the Rubrik Mosaic SDK API class.
 """
 
 import requests
-import json
 import time
 try:
     from urllib import quote  # Python 2.X
 except ImportError:
     from urllib.parse import quote  # Python 3+
-from random import choice
 
 from .exceptions import RubrikConnectionException
+from .json_backend import loads
+from .metrics import _endpoint_label
+from .retry import RETRY_STATUS_CODES
+from .tracing import NULL_SPAN, timed_call, timed_iter
+from .streaming import JSONArrayParser
+
+
+def _error_message(api_response):
+    """Internal function used to get the error message provided by Rubrik in a decoded response body, or None if there is none."""
+    if isinstance(api_response, dict) and ('errorType' in api_response or 'message' in api_response):
+        return api_response.get('message', api_response.get('errorType'))
+    return None
 
 
 class Api():
@@ -50,63 +60,301 @@ class Api():
 
         self._api_validation(api_endpoint)
 
-        header = self._authorization_header()
+        with self._span(call_type + ' ' + api_endpoint, 'request', method=call_type, endpoint=api_endpoint):
+            header = self._authorization_header()
 
-        request_url = "https://{}:{}/datos{}".format(self.node_ip, self.port, api_endpoint)
+            request_path = "/datos{}".format(api_endpoint)
+            error_message = None
 
-        try:
-            # Determine which call type is being used and then set the relevant
-            # variables for that call type
-            if call_type == 'GET':
+            try:
+                # Determine which call type is being used and then set the relevant
+                # variables for that call type
+                if call_type == 'GET':
 
-                if params is not None:
-                    request_url = request_url + "?" + '&'.join("{}={}".format(key, val)
-                                                               for (key, val) in params.items())
-                request_url = quote(request_url, '://?=&')
-                self.log('GET {}'.format(request_url))
-                api_request = requests.get(request_url, verify=False, headers=header, timeout=timeout)
+                    if params is not None:
+                        request_path = request_path + "?" + '&'.join("{}={}".format(key, val)
+                                                                     for (key, val) in params.items())
+                    request_path = quote(request_path, '://?=&')
+                    self.log('GET {}', request_path)
 
-            else:
-                # config = json.dumps(config)
-                self.log('POST {}'.format(request_url))
-                self.log('Config {}'.format(config))
+                else:
+                    # config = json.dumps(config)
+                    self.log('POST {}', request_path)
+                    self.log('Config {}', config)
 
-                self.log(type(config))
+                api_request = self._send_with_retry(call_type, request_path, header, config, timeout)
 
-                api_request = requests.post(request_url, verify=False, headers=header, json=config, timeout=timeout)
+                self.log("{}\n", api_request)
+                try:
+                    # The body is only decoded once, the error inspection below uses the decoded response
+                    with self._span('decode', 'phase'):
+                        api_response = loads(api_request.content)
+                except ValueError:
+                    api_request.raise_for_status()
+                    return {'status_code': api_request.status_code}
 
-            self.log(str(api_request) + "\n")
-            try:
-                api_response = api_request.json()
                 # Check to see if an error message has been provided by Rubrik
-                for key, value in api_response.items():
-                    if key == "errorType" or key == 'message':
-                        error_message = api_response['message']
-                        api_request.raise_for_status()
+                error_message = _error_message(api_response)
+                api_request.raise_for_status()
+            except requests.exceptions.ConnectTimeout:
+                raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
+            except requests.exceptions.ConnectionError:
+                raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
+            except requests.exceptions.ReadTimeout:
+                raise RubrikConnectionException(
+                    "The Rubrik Mosaic cluster did not respond to the API request in the allotted amount of time. To fix this issue, increase the timeout value.")
+            except requests.exceptions.RequestException as error:
+                # If an error message was provided by Rubrik raise an exception for that message else
+                # raise an exception for the request exception error
+                if error_message is None:
+                    raise RubrikConnectionException(error)
+                raise RubrikConnectionException(error_message)
 
-            except BaseException:
+            return api_response
+
+    def _stream_api(self, api_endpoint, key='data', timeout=15, chunk_size=65536):
+        """Internal method used to send a GET request and stream the items of an array in the response body as they are
+        received instead of loading the full response into memory.
+
+        Arguments:
+            api_endpoint {str} -- The endpoint of the Rubrik Mosaic API to call (ex. /listjobs).
+
+        Keyword Arguments:
+            key {str} -- The key of the array in the response body to stream the items of. (default: {'data'})
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik Mosaic cluster before returning a timeout error. (default: {15})
+            chunk_size {int} -- The number of bytes to read from the connection at a time. (default: {65536})
+
+        Returns:
+            generator -- Each item of the `key` array of the response body.
+        """
+
+        if self.cache is not None and self.cache.ttl(api_endpoint) > 0:
+            # Caching the response requires the full response so it is read through get() instead
+            for item in self.get(api_endpoint, timeout=timeout)[key]:
+                yield item
+            return
+
+        self._api_validation(api_endpoint)
+
+        # The span is only made active while this generator is running so the caller's own spans are not nested under it
+        tracer = self.tracer
+        span = None if tracer is None else tracer.start_span('GET ' + api_endpoint, 'request', method='GET', endpoint=api_endpoint)
+        error = None
+        phases = {}
+
+        request_path = quote("/datos{}".format(api_endpoint), '://?=&')
+        self.log('GET {} (streaming)', request_path)
+
+        try:
+            with NULL_SPAN if span is None else tracer.activate(span):
+                header = self._authorization_header()
+                api_request = self._send_with_retry('GET', request_path, header, None, timeout, stream=True)
+
+            self.log("{}\n", api_request)
+            response_bytes = 0
+            try:
+                if api_request.status_code >= 400:
+                    # The error body is small, read it so the message provided by Rubrik is raised as in _common_api
+                    try:
+                        error_message = _error_message(loads(api_request.content))
+                    except ValueError:
+                        error_message = None
+                    if error_message is not None:
+                        raise RubrikConnectionException(error_message)
                 api_request.raise_for_status()
-        except requests.exceptions.ConnectTimeout:
+                parser = JSONArrayParser(key)
+                chunks = api_request.iter_content(chunk_size)
+                feed = parser.feed
+                if span is not None:
+                    chunks = timed_iter(chunks, phases, 'transfer')
+                    feed = timed_call(feed, phases, 'decode')
+                for chunk in chunks:
+                    response_bytes += len(chunk)
+                    for item in feed(chunk):
+                        yield item
+                for item in parser.close():
+                    yield item
+            finally:
+                api_request.close()
+                if self.metrics_registry is not None:
+                    self.metrics_registry.add_response_bytes('GET', _endpoint_label(request_path), response_bytes)
+        except requests.exceptions.ConnectTimeout as request_error:
+            error = request_error
             raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
-        except requests.exceptions.ConnectionError:
+        except requests.exceptions.ConnectionError as request_error:
+            error = request_error
             raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
-        except requests.exceptions.ReadTimeout:
+        except requests.exceptions.ReadTimeout as request_error:
+            error = request_error
             raise RubrikConnectionException(
                 "The Rubrik Mosaic cluster did not respond to the API request in the allotted amount of time. To fix this issue, increase the timeout value.")
-        except requests.exceptions.RequestException as error:
-            # If "error_message" has be defined raise an exception for that message else
-            # raise an exception for the request exception error
-            try:
-                error_message
-            except NameError:
-                raise RubrikConnectionException(error)
-            else:
-                raise RubrikConnectionException(error_messageer)
-        else:
+        except requests.exceptions.RequestException as request_error:
+            error = request_error
+            raise RubrikConnectionException(request_error)
+        except Exception as other_error:
+            error = other_error
+            raise
+        finally:
+            if span is not None:
+                for phase in ('transfer', 'decode'):
+                    if phase in phases:
+                        tracer.add_span(phase, 'phase', phases[phase], parent=span)
+                tracer.end_span(span, error)
+
+    def _send_with_retry(self, call_type, request_path, header, config, timeout, stream=False):
+        """Internal method used to send an HTTP request to a node of the Rubrik Mosaic cluster selected by the node pool,
+        generating a new API token if the current one is rejected, failing fast while the circuit breaker of every node is
+        open and retrying transient errors as allowed by the retry policy. A connection error or timeout is always tried once
+        on each other healthy node, even without a retry policy or once its retries are exhausted.
+
+        Arguments:
+            call_type {str} -- The HTTP Method for the type of RESTful API call being made, or TOKEN_GENERATE to login. (choices: {'GET', 'POST', 'TOKEN_GENERATE'})
+            request_path {str} -- The path and query string of the API call (ex. /datos/listjobs).
+            header {dict} -- The authorization header to send with the API call, None for a login.
+            config {dict} -- The body to send with `POST` API calls, or the credentials of a login.
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik Mosaic cluster before returning a timeout error.
+
+        Keyword Arguments:
+            stream {bool} -- Flag to determine if the response body is read as it is consumed instead of immediately. (default: {False})
+
+        Returns:
+            requests.Response -- The response of the API call.
+        """
+
+        login = call_type == 'TOKEN_GENERATE'
+        # A login does not change anything on the cluster so it is retried like a GET call. It is recorded as the POST it is
+        retry_method = 'GET' if login else call_type
+        if login:
+            call_type = 'POST'
+
+        metrics = self.metrics_registry
+        if metrics is not None:
+            endpoint = _endpoint_label(request_path)
+
+        attempt = 0
+        tried = set()
+        refreshed = login
+        node = self.node_pool.select()
+        while True:
+            request_url = "https://{}:{}{}".format(node, self.port, request_path)
+            start = time.time()
+
             try:
-                return api_request.json()
+                api_request = self._send_request('TOKEN_GENERATE' if login else call_type, request_url, header, config, timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                self.node_pool.record_failure(node)
+                if metrics is not None:
+                    metrics.count_exception(call_type, endpoint, error)
+                tried.add(node)
+                if self.retry is None or not self.retry.should_retry(retry_method, attempt):
+                    # Without a retry left the API call is still sent once to each other healthy node before giving up
+                    node = self.node_pool.failover(tried)
+                    if node is None:
+                        raise
+                    self.log('{} {} failed with {}, trying the next node {}', call_type, request_url, type(error).__name__, node)
+                    continue
+                backoff = self.retry.backoff(attempt)
+                self.log('{} {} failed with {}, retrying in {:.2f} seconds', call_type, request_url, type(error).__name__, backoff)
+            except requests.exceptions.RequestException as error:
+                self.node_pool.record_failure(node)
+                if metrics is not None:
+                    metrics.count_exception(call_type, endpoint, error)
+                raise
             except BaseException:
-                return {'status_code': api_request.status_code}
+                # Not a failure of the node (ex. KeyboardInterrupt), only release a half-open probe so the circuit breaker is
+                # not left waiting on it
+                self.node_pool.release(node)
+                raise
+            else:
+                latency = time.time() - start
+                if metrics is not None:
+                    # A streamed response body has not been read yet, its size is added as it is consumed
+                    metrics.observe_request(call_type, endpoint, api_request.status_code, latency,
+                                            len(api_request.request.body or b''), 0 if stream else len(api_request.content))
+                if api_request.status_code == 401 and not refreshed:
+                    # The cached API token has expired or been revoked, generate a new one and try again once. The node
+                    # responded so its call is recorded first, a half-open probe left pending would fail the login fast
+                    self.node_pool.record_success(node, latency)
+                    self.log('The API Token was rejected by the Rubrik Mosaic cluster, retrying with a new API Token')
+                    api_request.close()
+                    header = self._authorization_header(rejected_token=header["x-access-token"])
+                    refreshed = True
+                    node = self.node_pool.select()
+                    continue
+                # Only the transient server errors count as a failure of the node, any other response shows it is healthy
+                status_codes = RETRY_STATUS_CODES if self.retry is None else self.retry.status_codes
+                if api_request.status_code not in status_codes:
+                    self.node_pool.record_success(node, latency)
+                    return api_request
+                self.node_pool.record_failure(node)
+                tried.add(node)
+                if self.retry is None or not self.retry.should_retry(retry_method, attempt):
+                    return api_request
+                backoff = self.retry.backoff(attempt, api_request.headers.get('Retry-After'))
+                api_request.close()
+                self.log('{} {} failed with {}, retrying in {:.2f} seconds', call_type, request_url, api_request.status_code, backoff)
+
+            time.sleep(backoff)
+            attempt += 1
+            # A retry prefers a node the API call has not failed on yet
+            node = self.node_pool.failover(tried) or self.node_pool.select()
+
+    def _send_request(self, call_type, request_url, header, config, timeout, stream=False):
+        """Internal method used to send a single HTTP request to the Rubrik Mosaic cluster.
+
+        Arguments:
+            call_type {str} -- The HTTP Method for the type of RESTful API call being made, or TOKEN_GENERATE to login. (choices: {'GET', 'POST', 'TOKEN_GENERATE'})
+            request_url {str} -- The full URL of the API call.
+            header {dict} -- The authorization header to send with the API call, None for a login.
+            config {dict} -- The body to send with `POST` API calls, or the credentials of a login.
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik Mosaic cluster before returning a timeout error.
+
+        Keyword Arguments:
+            stream {bool} -- Flag to determine if the response body is read as it is consumed instead of immediately. (default: {False})
+
+        Returns:
+            requests.Response -- The response of the API call.
+        """
+
+        if self.tracer is None:
+            if call_type == 'GET':
+                return self.transport.send(self._session, 'GET', request_url, verify=self.verify, headers=header, timeout=timeout, stream=stream)
+            if call_type == 'TOKEN_GENERATE':
+                # The credentials are sent as a form
+                return self.transport.send(self._session, 'POST', request_url, verify=self.verify, data=config, timeout=timeout)
+            return self.transport.send(self._session, 'POST', request_url, verify=self.verify, headers=header, json=config, timeout=timeout)
+
+        # The body is read separately from the headers so the server and transfer time are recorded as separate phases
+        with self.tracer.span('request', 'phase', url=request_url) as span:
+            if call_type == 'GET':
+                api_request = self.transport.send(self._session, 'GET', request_url, verify=self.verify, headers=header, timeout=timeout, stream=True)
+            elif call_type == 'TOKEN_GENERATE':
+                api_request = self.transport.send(self._session, 'POST', request_url, verify=self.verify, data=config, timeout=timeout, stream=True)
+            else:
+                api_request = self.transport.send(self._session, 'POST', request_url, verify=self.verify, headers=header, json=config, timeout=timeout, stream=True)
+            span.set(status_code=api_request.status_code)
+        if not stream:
+            with self.tracer.span('transfer', 'phase') as span:
+                span.set(bytes=len(api_request.content))
+        return api_request
+
+    def _span(self, name, kind, **attributes):
+        """Internal method used to record a span of the active trace when tracing is enabled.
+
+        Arguments:
+            name {str} -- The name of the span.
+            kind {str} -- The type of the span. (choices: {'method', 'request', 'login', 'phase'})
+
+        Keyword Arguments:
+            attributes {dict} -- Details of the span.
+
+        Returns:
+            context manager -- The started Span, or a placeholder that records nothing when tracing is disabled.
+        """
+
+        if self.tracer is None:
+            return NULL_SPAN
+        return self.tracer.span(name, kind, **attributes)
 
     def get(self, api_endpoint, timeout=15, params=None):
         """Send a GET request to the provided Rubrik Mosaic API endpoint.
@@ -119,10 +367,28 @@ class Api():
             timeout {int} -- The number of seconds to wait to establish a connection the Rubrik Mosaic cluster before returning a timeout error. (default: {15})
 
         Returns:
-            dict -- The response body of the API call.
+            dict -- The response body of the API call. When a response cache is configured the response may be served from the cache. When request coalescing is enabled the response may be shared with concurrent callers.
         """
 
-        return self._common_api('GET', api_endpoint, config=None, timeout=timeout, params=params)
+        cached = self.cache is not None and self.cache.ttl(api_endpoint) > 0
+        if cached:
+            # Taken before the request is sent so a response that predates a post() made while it was in flight is not cached
+            generation = self.cache.generation
+            api_response = self.cache.get(api_endpoint, params)
+            if api_response is not None:
+                self.log('GET {} (cached)', api_endpoint)
+                return api_response
+
+        def get_response():
+            api_response = self._common_api('GET', api_endpoint, config=None, timeout=timeout, params=params)
+            if cached:
+                self.cache.set(api_endpoint, params, api_response, generation)
+            return api_response
+
+        if self.coalescer is None:
+            return get_response()
+        key = (api_endpoint, tuple(sorted(params.items())) if params else None)
+        return self.coalescer.call(key, get_response)
 
     def post(self, api_endpoint, config, timeout=15):
         """Send a POST request to the provided Rubrik Mosaic API endpoint.
@@ -134,7 +400,16 @@ class Api():
             timeout {int} -- The number of seconds to wait to establish a connection the Rubrik Mosaic cluster before returning a timeout error. (default: {15})
 
         Returns:
-            dict -- The response body of the API call.
+            dict -- The response body of the API call. Any response cache configured is cleared.
         """
 
-        return self._common_api('POST', api_endpoint, config, timeout=timeout)
+        if self.cache is None:
+            return self._common_api('POST', api_endpoint, config, timeout=timeout)
+
+        # Any change made on the cluster may be reflected in the cached responses. The cache is invalidated again once the
+        # POST is done so the responses of the GET requests sent while it ran are not cached
+        self.cache.invalidate()
+        try:
+            return self._common_api('POST', api_endpoint, config, timeout=timeout)
+        finally:
+            self.cache.invalidate()
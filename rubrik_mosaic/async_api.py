@@ -0,0 +1,217 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK AsyncApi class.
+"""
+
+import asyncio
+try:
+    from urllib import quote  # Python 2.X
+except ImportError:
+    from urllib.parse import quote  # Python 3+
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .api import _error_message
+from .exceptions import RubrikConnectionException
+from .json_backend import loads
+from .streaming import JSONArrayParser
+
+
+def _status_error(status, reason, request_url, api_response):
+    """Internal function used to create the message of the exception raised for an error response. The message provided by
+    Rubrik is used when the response body has one, otherwise the message of requests.Response.raise_for_status() used by
+    the synchronous client is mirrored."""
+    error_message = _error_message(api_response)
+    if error_message is not None:
+        return error_message
+    return "{} {} Error: {} for url: {}".format(status, 'Client' if status < 500 else 'Server', reason, request_url)
+
+
+class AsyncApi():
+    """This class contains the asyncio versions of the base API methods."""
+
+    async def _common_api(self, call_type, api_endpoint, config=None, timeout=15, params=None):
+        """Internal method that consolidates the base API functions.
+
+        Arguments:
+            call_type {str} -- The HTTP Method for the type of RESTful API call being made. (choices: {'GET', 'POST'})
+            api_endpoint {str} -- The endpoint of the Rubrik Mosaic API to call (ex. /login).
+
+        Keyword Arguments:
+            params {dict} -- An optional dict containing variables in a key:value format to send with `GET` & `POST` API calls (default: {None})
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error. (default: {15})
+
+        Returns:
+            dict -- The full API call response for the provided endpoint.
+        """
+
+        self._api_validation(api_endpoint)
+
+        header = await self._authorization_header()
+
+        request_url = "https://{}:{}/datos{}".format(self.node_ip, self.port, api_endpoint)
+
+        if call_type == 'GET':
+
+            if params is not None:
+                request_url = request_url + "?" + '&'.join("{}={}".format(key, val)
+                                                           for (key, val) in params.items())
+            request_url = quote(request_url, '://?=&')
+            self.log('GET {}', request_url)
+
+        else:
+            self.log('POST {}', request_url)
+            self.log('Config {}', config)
+
+        try:
+            status, reason, api_response = await self._send_request(call_type, request_url, header, config, timeout)
+
+            if status == 401:
+                # The cached API token has expired or been revoked, generate a new one and try again once
+                self.log('The API Token was rejected by the Rubrik Mosaic cluster, retrying with a new API Token')
+                header = await self._authorization_header(rejected_token=header["x-access-token"])
+                status, reason, api_response = await self._send_request(call_type, request_url, header, config, timeout)
+
+        except asyncio.TimeoutError:
+            raise RubrikConnectionException(
+                "The Rubrik Mosaic cluster did not respond to the API request in the allotted amount of time. To fix this issue, increase the timeout value.")
+        except aiohttp.ClientConnectionError:
+            raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
+        except aiohttp.ClientError as error:
+            raise RubrikConnectionException(error)
+
+        self.log("<Response [{}]>\n", status)
+
+        if status >= 400:
+            raise RubrikConnectionException(_status_error(status, reason, request_url, api_response))
+
+        if api_response is None:
+            return {'status_code': status}
+        return api_response
+
+    async def _stream_api(self, api_endpoint, key='data', timeout=15, chunk_size=65536):
+        """Internal method used to send a GET request and stream the items of an array in the response body as they are
+        received instead of loading the full response into memory.
+
+        Arguments:
+            api_endpoint {str} -- The endpoint of the Rubrik Mosaic API to call (ex. /listjobs).
+
+        Keyword Arguments:
+            key {str} -- The key of the array in the response body to stream the items of. (default: {'data'})
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik Mosaic cluster before returning a timeout error. (default: {15})
+            chunk_size {int} -- The number of bytes to read from the connection at a time. (default: {65536})
+
+        Returns:
+            async generator -- Each item of the `key` array of the response body.
+        """
+
+        self._api_validation(api_endpoint)
+
+        header = await self._authorization_header()
+
+        request_url = quote("https://{}:{}/datos{}".format(self.node_ip, self.port, api_endpoint), '://?=&')
+        self.log('GET {} (streaming)', request_url)
+
+        client_timeout = aiohttp.ClientTimeout(sock_connect=timeout, sock_read=timeout)
+        try:
+            api_request = await self._get_session().get(request_url, headers=header, timeout=client_timeout)
+
+            if api_request.status == 401:
+                # The cached API token has expired or been revoked, generate a new one and try again once
+                self.log('The API Token was rejected by the Rubrik Mosaic cluster, retrying with a new API Token')
+                api_request.release()
+                header = await self._authorization_header(rejected_token=header["x-access-token"])
+                api_request = await self._get_session().get(request_url, headers=header, timeout=client_timeout)
+
+            self.log("<Response [{}]>\n", api_request.status)
+            try:
+                if api_request.status >= 400:
+                    # The error body is small, read it so the message provided by Rubrik is raised as in _common_api
+                    try:
+                        api_response = loads(await api_request.read())
+                    except ValueError:
+                        api_response = None
+                    raise RubrikConnectionException(_status_error(api_request.status, api_request.reason, request_url, api_response))
+                parser = JSONArrayParser(key)
+                async for chunk in api_request.content.iter_chunked(chunk_size):
+                    for item in parser.feed(chunk):
+                        yield item
+                for item in parser.close():
+                    yield item
+            finally:
+                api_request.release()
+        except asyncio.TimeoutError:
+            raise RubrikConnectionException(
+                "The Rubrik Mosaic cluster did not respond to the API request in the allotted amount of time. To fix this issue, increase the timeout value.")
+        except aiohttp.ClientConnectionError:
+            raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
+        except aiohttp.ClientError as error:
+            raise RubrikConnectionException(error)
+
+    async def _send_request(self, call_type, request_url, header, config, timeout):
+        """Internal method used to send a single HTTP request to the Rubrik Mosaic cluster.
+
+        Arguments:
+            call_type {str} -- The HTTP Method for the type of RESTful API call being made. (choices: {'GET', 'POST'})
+            request_url {str} -- The full URL of the API call.
+            header {dict} -- The authorization header to send with the API call.
+            config {dict} -- The body to send with `POST` API calls.
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik Mosaic cluster before returning a timeout error.
+
+        Returns:
+            tuple -- The status code, reason and decoded body of the response. The body is None if it is not valid JSON.
+        """
+
+        client_timeout = aiohttp.ClientTimeout(sock_connect=timeout, sock_read=timeout)
+        async with self._get_session().request(call_type, request_url, headers=header, json=config, timeout=client_timeout) as api_request:
+            try:
+                api_response = await api_request.json(loads=loads, content_type=None)
+            except ValueError:
+                api_response = None
+            return api_request.status, api_request.reason, api_response
+
+    async def get(self, api_endpoint, timeout=15, params=None):
+        """Send a GET request to the provided Rubrik Mosaic API endpoint.
+
+        Arguments:
+            api_endpoint {str} -- The endpoint of the Rubrik Mosaic API to call (ex. /listjobs).
+
+        Keyword Arguments:
+            params {dict} -- An optional dict containing variables in a key:value format to send with `GET` & `DELETE` API calls (default: {None})
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik Mosaic cluster before returning a timeout error. (default: {15})
+
+        Returns:
+            dict -- The response body of the API call.
+        """
+
+        return await self._common_api('GET', api_endpoint, config=None, timeout=timeout, params=params)
+
+    async def post(self, api_endpoint, config, timeout=15):
+        """Send a POST request to the provided Rubrik Mosaic API endpoint.
+
+        Arguments:
+            api_endpoint {str} -- The endpoint of the Rubrik Mosaic API to call (ex. /listjobs).
+
+        Keyword Arguments:
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik Mosaic cluster before returning a timeout error. (default: {15})
+
+        Returns:
+            dict -- The response body of the API call.
+        """
+
+        return await self._common_api('POST', api_endpoint, config, timeout=timeout)
@@ -0,0 +1,325 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK AsyncReporting class.
+"""
+
+import asyncio
+
+from .async_api import AsyncApi
+from .exceptions import RubrikConnectionException
+from .logger import debug_enabled
+from .records import Job, Policy, SourceStats, StoreStats
+from .reporting import ClusterSnapshot, ReportList, _stats_list, _log_policies, _count_job_state, _log_job_states, _JobSummary, _protected_object_count, \
+    _size_under_protection, _secondary_storage_consumed, _backup_count
+
+
+async def _gather(*coroutines):
+    """Internal function used to run coroutines concurrently like asyncio.gather(), but the coroutines that are still
+    running are cancelled as soon as one of them raises an exception."""
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        # Wait for the cancelled tasks so none of them keeps calling the cluster after the exception is raised
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class AsyncReporting(AsyncApi):
+    """This class contains the asyncio versions of the Reporting methods."""
+
+    async def _get_each(self, api_endpoint, names, max_workers=None, record=None, name_field=None, collect_errors=False):
+        """Internal method used to send a GET request for each item name and collect the responses in the same order as the names.
+
+        Arguments:
+            api_endpoint {str} -- The endpoint of the Rubrik Mosaic API to call with a `{}` placeholder for the item name (ex. /getstorestats/{}).
+            names {list} -- The names of the items to get.
+
+        Keyword Arguments:
+            max_workers {int} -- The maximum number of API calls to run concurrently. If a value is not provided the `max_workers` value of the connection is used. (default: {None})
+            record {class} -- The record class each item is converted to when the connection was created with `records=True`. (default: {None})
+            name_field {str} -- The field of the record the item name is stored in. (default: {None})
+            collect_errors {bool} -- Flag to determine if the items that fail are skipped, with their exception stored in the `errors` dict, instead of raising the exception. (default: {False})
+
+        Returns:
+            StatsList -- The `data` of each successful API call.
+        """
+
+        if max_workers is None:
+            max_workers = self.max_workers
+
+        semaphore = asyncio.Semaphore(max(max_workers, 1))
+
+        async def get_data(name):
+            async with semaphore:
+                try:
+                    return (await self.get(api_endpoint.format(name)))['data'], None
+                except Exception as error:
+                    if not collect_errors:
+                        raise
+                    return None, error
+
+        results = await _gather(*[get_data(name) for name in names])
+
+        return _stats_list(api_endpoint, names, results, self.log, record if self.records else None, name_field)
+
+    async def get_store_stats(self, max_workers=None, collect_errors=False):
+        """Get a list of all the backup store stats from Rubrik Mosaic.
+
+        Keyword Arguments:
+            max_workers {int} -- The maximum number of stores to get the stats of concurrently. If a value is not provided the `max_workers` value of the connection is used. (default: {None})
+            collect_errors {bool} -- Flag to determine if the stores whose stats could not be collected are skipped, and listed in the `errors` attribute of the returned list, instead of raising the exception. (default: {False})
+
+        Returns:
+            list -- A list that contains the statistics for each backup store in the Rubrik Mosaic cluster.
+        """
+        stores = []
+        for store in (await self.get("/liststore"))['data']:
+            stores.append(store['store_name'])
+        if debug_enabled():
+            for store in stores:
+                self.log('get_store_stats - Found the following store: {}', store)
+        self.log('get_store_stats - Getting store stats for {} stores', len(stores))
+        return await self._get_each("/getstorestats/{}", stores, max_workers, StoreStats, 'store_name', collect_errors)
+
+    async def get_source_stats(self, max_workers=None, collect_errors=False):
+        """Get a list of all the data source stats from Rubrik Mosaic.
+
+        Keyword Arguments:
+            max_workers {int} -- The maximum number of sources to get the stats of concurrently. If a value is not provided the `max_workers` value of the connection is used. (default: {None})
+            collect_errors {bool} -- Flag to determine if the sources whose stats could not be collected are skipped, and listed in the `errors` attribute of the returned list, instead of raising the exception. (default: {False})
+
+        Returns:
+            list -- A list that contains the statistics for each data source in the Rubrik Mosaic cluster.
+        """
+        sources = []
+        for source in (await self.get("/listsource"))['data']:
+            sources.append(source['source_name'])
+        if debug_enabled():
+            for source in sources:
+                self.log('get_source_stats - Found the following source: {}', source)
+        self.log('get_source_stats - Getting source stats for {} sources', len(sources))
+        return await self._get_each("/getsourcestats/{}", sources, max_workers, SourceStats, 'source_name', collect_errors)
+
+    async def get_policies(self):
+        """Get a list of all the backup policy documents from Rubrik Mosaic.
+
+        Returns:
+            list -- A list that contains the details of each backup policy in the Rubrik Mosaic cluster. It can be exported with `to_dataframe()` or `to_arrow()`.
+        """
+        policylist = (await self.get("/listpolicy"))['data']
+        _log_policies(policylist, self.log)
+        if self.records:
+            return ReportList(Policy.from_dict(policy) for policy in policylist)
+        return ReportList(policylist)
+
+    async def iter_jobs(self, counters=None):
+        """Iterate over the jobs of the Rubrik Mosaic cluster as they are received, without loading the full job list into memory.
+
+        Keyword Arguments:
+            counters {dict} -- An optional dict that is updated with the number of jobs in each state as the jobs are read. (default: {None})
+
+        Returns:
+            async generator -- The details of each job in the Rubrik Mosaic cluster.
+        """
+        async for job in self._iter_jobs(counters, self.records):
+            yield job
+
+    async def _iter_jobs(self, counters, records):
+        """Internal method used to iterate over the jobs of the Rubrik Mosaic cluster as they are received.
+
+        Arguments:
+            counters {dict} -- An optional dict that is updated with the number of jobs in each state as the jobs are read.
+            records {bool} -- Flag to determine if each job is converted to a Job record instead of being returned as a dict.
+
+        Returns:
+            async generator -- The details of each job in the Rubrik Mosaic cluster.
+        """
+        async for job in self._stream_api("/listjobs"):
+            if counters is not None:
+                _count_job_state(job, counters)
+            yield Job.from_dict(job) if records else job
+
+    async def watch_jobs(self, states=None, min_interval=5, max_interval=300, backoff=2, max_polls=None, initial=False):
+        """Watch the jobs of the Rubrik Mosaic cluster and report only the jobs that change state, ex. from job_scheduled to
+        job_failed. The poll interval drops to `min_interval` while jobs are running and backs off to `max_interval` while
+        the cluster is idle.
+
+        Keyword Arguments:
+            states {list} -- The states, or a single state, to report the transitions to (ex. job_failed). If a value is not provided every transition is reported. (default: {None})
+            min_interval {float} -- The number of seconds between polls while jobs are running. (default: {5})
+            max_interval {float} -- The maximum number of seconds between polls while the cluster is idle. (default: {300})
+            backoff {float} -- The factor the poll interval is multiplied by after each idle poll. (default: {2})
+            max_polls {int} -- The number of polls after which to stop. If a value is not provided the jobs are watched until the generator is closed. (default: {None})
+            initial {bool} -- Flag to determine if the first poll reports every job, with a previous state of None. (default: {False})
+
+        Returns:
+            async generator -- A JobTransition for each state change.
+        """
+        from .job_watch import JobWatcher
+        watcher = JobWatcher(self, states, min_interval, max_interval, backoff, initial)
+        polls = 0
+        while True:
+            watcher._begin()
+            try:
+                async for job in self._iter_jobs(None, False):
+                    watcher._add(job)
+                transitions = watcher._finish()
+            except RubrikConnectionException as error:
+                watcher._failed(error)
+                transitions = []
+            for transition in transitions:
+                yield transition
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                return
+            await asyncio.sleep(watcher.interval)
+
+    async def get_jobs(self):
+        """Get a list of all the jobs from the Rubrik Mosaic cluster.
+
+        Returns:
+            list -- A list that contains the details of each job in the Rubrik Mosaic cluster. It can be exported with `to_dataframe()` or `to_arrow()`.
+        """
+        counters = {}
+        joblist = ReportList([job async for job in self.iter_jobs(counters)])
+        _log_job_states(counters, self.log)
+        return joblist
+
+    async def get_job_summary(self, job_state, num_hours):
+        """Get a list of all the jobs from the Rubrik Mosaic cluster.
+
+        Arguments:
+            job_state {str} -- The current state of the job as a string, or a list of states
+            num_hours {int} -- The number of hours to go back in the job history, or a list of hours
+
+        Returns:
+            list -- A list that contains the details of each job in the Rubrik Mosaic cluster. When a list of hours is provided a dict that contains the list of jobs for each number of hours is returned instead.
+        """
+        counters = {}
+        summary = _JobSummary(job_state, num_hours, self.log, Job if self.records else None)
+        async for job in self._iter_jobs(counters, False):
+            summary.add(job)
+        joblist = summary.result()
+        _log_job_states(counters, self.log)
+        return joblist
+
+    async def export_jobs(self, path, format='ndjson', compression=None, chunk_size=10000, columns=None, resume=False):
+        """Export all the jobs from the Rubrik Mosaic cluster to a NDJSON, CSV or Parquet file as they are received, holding
+        only `chunk_size` jobs in memory at a time. An interrupted export can be resumed with `resume=True`.
+
+        Arguments:
+            path {str} -- The path of the file, or directory for Parquet, to write.
+
+        Keyword Arguments:
+            format {str} -- The format of the export. (choices: {'ndjson', 'csv', 'parquet'}) (default: {'ndjson'})
+            compression {str} -- The compression of a NDJSON or CSV file ('gzip', 'bz2' or 'xz') or the compression codec of the Parquet files (ex. 'snappy' or 'zstd'). (default: {None})
+            chunk_size {int} -- The number of jobs written at a time. (default: {10000})
+            columns {list} -- The flattened names of the columns of a CSV or Parquet export. If a value is not provided the fields of the first chunk of jobs are used. (default: {None})
+            resume {bool} -- Flag to determine if an interrupted export to the same path is resumed instead of starting over. (default: {False})
+
+        Returns:
+            int -- The number of jobs exported.
+        """
+        from .bulk_export import BulkExporter
+        exporter = BulkExporter(path, format, compression, chunk_size, columns, resume, '_id', self.log)
+        counters = {}
+        async for job in self._iter_jobs(counters, False):
+            exporter.add(job)
+        total = exporter.finish()
+        _log_job_states(counters, self.log)
+        return total
+
+    async def export_policies(self, path, format='ndjson', compression=None, chunk_size=10000, columns=None, resume=False):
+        """Export all the backup policy documents from Rubrik Mosaic to a NDJSON, CSV or Parquet file as they are received,
+        holding only `chunk_size` policies in memory at a time. An interrupted export can be resumed with `resume=True`.
+
+        Arguments:
+            path {str} -- The path of the file, or directory for Parquet, to write.
+
+        Keyword Arguments:
+            format {str} -- The format of the export. (choices: {'ndjson', 'csv', 'parquet'}) (default: {'ndjson'})
+            compression {str} -- The compression of a NDJSON or CSV file ('gzip', 'bz2' or 'xz') or the compression codec of the Parquet files (ex. 'snappy' or 'zstd'). (default: {None})
+            chunk_size {int} -- The number of policies written at a time. (default: {10000})
+            columns {list} -- The flattened names of the columns of a CSV or Parquet export. If a value is not provided the fields of the first chunk of policies are used. (default: {None})
+            resume {bool} -- Flag to determine if an interrupted export to the same path is resumed instead of starting over. (default: {False})
+
+        Returns:
+            int -- The number of policies exported.
+        """
+        from .bulk_export import BulkExporter
+        exporter = BulkExporter(path, format, compression, chunk_size, columns, resume, '_id', self.log)
+        async for policy in self._stream_api("/listpolicy"):
+            exporter.add(policy)
+        return exporter.finish()
+
+    async def get_protected_object_count(self):
+        """Get the number of objects currently under protection by the Rubrik Mosaic cluster
+
+        Returns:
+            int -- The total number of objects currently under protection by the Rubrik Mosaic cluster.
+        """
+        return _protected_object_count(await self.get_policies())
+
+    async def get_size_under_protection(self, max_workers=None):
+        """Get the total capacity of data currently under protection by the Rubrik Mosaic cluster
+
+        Keyword Arguments:
+            max_workers {int} -- The maximum number of sources to get the stats of concurrently. If a value is not provided the `max_workers` value of the connection is used. (default: {None})
+
+        Returns:
+            int -- The total capacity of data currently under protection in MB of the Rubrik Mosaic cluster.
+        """
+        return _size_under_protection(await self.get_source_stats(max_workers), self.log)
+
+    async def get_secondary_storage_consumed(self):
+        """Get the total secondary storage consumption of the Rubrik Mosaic cluster
+
+        Returns:
+            int -- The total secondary storage consumption in MB of the Rubrik Mosaic cluster.
+        """
+        return _secondary_storage_consumed(await self.get_policies(), self.log)
+
+    async def get_backup_count(self):
+        """Get the number of backups stored on a Rubrik Mosaic cluster.
+
+        Returns:
+            int -- The total number of backups stored on the Rubrik Mosaic cluster.
+        """
+        return _backup_count(await self.get_policies(), self.log)
+
+    async def snapshot(self, max_workers=None, collect_errors=False):
+        """Get a point in time snapshot of the Rubrik Mosaic cluster that contains the results of all of the reporting functions.
+        The policies, sources, stores and jobs are each fetched only once, concurrently, no matter how many of the results are used.
+
+        Keyword Arguments:
+            max_workers {int} -- The maximum number of stores or sources to get the stats of concurrently. If a value is not provided the `max_workers` value of the connection is used. (default: {None})
+            collect_errors {bool} -- Flag to determine if the stores and sources whose stats could not be collected are skipped, and listed in the `errors` attribute of the snapshot, instead of raising the exception. (default: {False})
+
+        Returns:
+            ClusterSnapshot -- The policies, store stats, source stats and jobs of the Rubrik Mosaic cluster along with the aggregates computed from them.
+        """
+        job_state_counts = {}
+
+        async def get_jobs():
+            return [job async for job in self.iter_jobs(job_state_counts)]
+
+        policies, store_stats, source_stats, jobs = await _gather(
+            self.get_policies(), self.get_store_stats(max_workers, collect_errors), self.get_source_stats(max_workers, collect_errors),
+            get_jobs())
+        _log_job_states(job_state_counts, self.log)
+        return ClusterSnapshot(policies, store_stats, source_stats, jobs, job_state_counts, self.log)
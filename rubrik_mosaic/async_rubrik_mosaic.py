@@ -0,0 +1,216 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK AsyncConnect class.
+"""
+
+import asyncio
+import os
+import logging
+import ssl
+import time
+
+from .async_api import aiohttp
+from .async_reporting import AsyncReporting
+from .exceptions import RubrikConnectionException, MissingCredentialException
+from .json_backend import loads
+from .rubrik_mosaic import Connect
+
+
+class AsyncConnect(AsyncReporting):
+    """This class is the asyncio counterpart of the Connect class. Every API and Reporting method is a coroutine that
+    shares a single aiohttp connection pool. The `aiohttp` package must be installed to use it.
+
+    Arguments:
+        AsyncReporting {class} - This class contains the asyncio versions of the methods related to reporting on the operations of the Rubrik Mosaic cluster.
+    """
+
+    def __init__(self, node_ip=None, username=None, password=None, port="9090", enable_logging=False, token_ttl=1800, token_refresh_margin=60, verify=False, pool_maxsize=10, max_workers=10, records=False):
+        """Constructor for the AsyncConnect class which is used to initialize the class variables.
+
+        Keyword Arguments:
+            node_ip {str} -- The Hostname or IP Address of a node in the Rubrik Mosaic cluster you wish to connect to. Unlike Connect, only a single node is supported. If a value is not provided we will check for a `rubrik_mosaic_node_ip` environment variable. (default: {None})
+            port {str} -- The Port used to connect to the Rubrik Mosaic cluster. If a value is not provided we will check for a `rubrik_mosaic_port` environment variable. (default: {9090})
+            username {str} -- The Username you wish to use to connect to the Rubrik Mosaic cluster. If a value is not provided we will check for a `rubrik_mosaic_username` environment variable. (default: {None})
+            password {str} -- The Password you wish to use to connect to the Rubrik Mosaic cluster. If a value is not provided we will check for a `rubrik_mosaic_password` environment variable. (default: {None})
+            enable_logging {bool} -- Flag to determine if logging will be enabled for the SDK. (default: {False})
+            token_ttl {int} -- The number of seconds a cached API token is considered valid when its expiry can not be read from the token itself. (default: {1800})
+            token_refresh_margin {int} -- The number of seconds before the API token expires that it will be proactively refreshed. (default: {60})
+            verify {bool} -- Flag to determine if the certificate of the Rubrik Mosaic cluster will be validated. A path to a CA bundle may also be provided. (default: {False})
+            pool_maxsize {int} -- The maximum number of connections to keep open to the Rubrik Mosaic cluster. (default: {10})
+            max_workers {int} -- The maximum number of API calls the reporting functions will run concurrently when collecting the stats of each store or source. (default: {10})
+            records {bool} -- Flag to determine if the reporting functions return compact Job, Policy, SourceStats and StoreStats records instead of dicts. (default: {False})
+        """
+
+        if aiohttp is None:
+            raise ImportError("The aiohttp package is required to use AsyncConnect. Install it with `pip install rubrik_mosaic[async]`.")
+
+        if enable_logging:
+            logging.getLogger().setLevel(logging.DEBUG)
+
+        if node_ip is None:
+            node_ip = os.environ.get('rubrik_mosaic_node_ip')
+            if node_ip is None:
+                raise MissingCredentialException("The Rubrik Mosaic Node IP has not been provided.")
+        if isinstance(node_ip, str):
+            node_ip = [node.strip() for node in node_ip.split(',') if node.strip()]
+        nodes = list(node_ip)
+        if not nodes:
+            raise MissingCredentialException("The Rubrik Mosaic Node IP has not been provided.")
+        if len(nodes) > 1:
+            raise ValueError("AsyncConnect connects to a single Rubrik Mosaic node, use Connect to spread the API calls across {}.".format(', '.join(nodes)))
+        self.node_ip = nodes[0]
+        self.log("Node IP: {}", self.node_ip)
+
+        self.port = os.environ.get('rubrik_mosaic_port', port)
+        self.log("Node Port: {}", self.port)
+
+        if username is None:
+            username = os.environ.get('rubrik_mosaic_username')
+            if username is None:
+                raise MissingCredentialException("The Rubrik Mosaic Username has not been provided.")
+        self.username = username
+        self.log("Username: {}", self.username)
+
+        if password is None:
+            password = os.environ.get('rubrik_mosaic_password')
+            if password is None:
+                raise MissingCredentialException("The Rubrik Mosaic Password has not been provided.")
+        self.password = password
+        self.log("Password: *******\n")
+
+        self.max_workers = max_workers
+        self.records = records
+
+        self.token_ttl = token_ttl
+        self.token_refresh_margin = token_refresh_margin
+        self._api_token = None
+        self._api_token_expiry = 0
+        # The lock is created from within the event loop the first time a token is generated, see _authorization_header()
+        self._api_token_lock = None
+
+        self.verify = verify
+        self.pool_maxsize = pool_maxsize
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Close all of the connections to the Rubrik Mosaic cluster that are kept open by the SDK.
+        """
+
+        self.log("Closing the connections to the Rubrik Mosaic cluster")
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    log = staticmethod(Connect.log)
+
+    _api_validation = staticmethod(Connect._api_validation)
+
+    _api_token_from_response = staticmethod(Connect._api_token_from_response)
+
+    _api_token_expiration = staticmethod(Connect._api_token_expiration)
+
+    def _get_session(self):
+        """Internal method used to create the shared aiohttp session the first time it is needed from within the event loop.
+
+        Returns:
+            aiohttp.ClientSession -- The session used for all of the API calls.
+        """
+
+        if self._session is None:
+            if self.verify is False:
+                ssl_context = False
+            elif self.verify is True:
+                ssl_context = None
+            else:
+                ssl_context = ssl.create_default_context(cafile=self.verify)
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, ssl=ssl_context)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def _authorization_header(self, rejected_token=None):
+        """Internal method used to create the authorization header used in the API calls. The API token is cached and only
+        regenerated when it is close to expiring or after it has been rejected by the Rubrik Mosaic cluster.
+
+        Keyword Arguments:
+            rejected_token {str} -- An API token the Rubrik Mosaic cluster has rejected. If it is still the cached token a new token will be generated. (default: {None})
+
+        Returns:
+            dict -- The authorization header that utilizes token-based authentication.
+        """
+
+        api_token = self._api_token
+        if api_token is None or api_token == rejected_token or time.time() >= self._api_token_expiry - self.token_refresh_margin:
+            # Only a single task generates a new token, any other caller waits on the lock and then reuses the result
+            if self._api_token_lock is None:
+                self._api_token_lock = asyncio.Lock()
+            async with self._api_token_lock:
+                api_token = self._api_token
+                if api_token is None or api_token == rejected_token or time.time() >= self._api_token_expiry - self.token_refresh_margin:
+                    api_token = await self._generate_api_token()
+
+        authorization_header = {
+            'Content-Type': 'application/json',
+            "x-access-token": api_token,
+        }
+
+        return authorization_header
+
+    async def _generate_api_token(self):
+        """Internal method used to login to the Rubrik Mosaic cluster and cache the API token that is returned.
+
+        Returns:
+            str -- The API token generated by the Rubrik Mosaic cluster.
+        """
+
+        config = {}
+        config["username"] = self.username
+        config["password"] = self.password
+
+        request_url = "https://{}:{}/datos/login".format(self.node_ip, self.port)
+
+        self.log("Generating API Token")
+
+        try:
+            async with self._get_session().post(request_url, data=config, timeout=aiohttp.ClientTimeout(sock_connect=30, sock_read=30)) as api_request:
+                try:
+                    api_response = await api_request.json(loads=loads, content_type=None)
+                except ValueError:
+                    api_response = None
+        except asyncio.TimeoutError:
+            raise RubrikConnectionException(
+                "The Rubrik Mosaic cluster did not respond to the API request in the allotted amount of time. To fix this issue, increase the timeout value.")
+        except aiohttp.ClientConnectionError:
+            raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
+        except aiohttp.ClientError as error:
+            raise RubrikConnectionException(error)
+
+        api_token = self._api_token_from_response(api_response)
+
+        self.log("API Token: {}", api_token)
+
+        expiry = self._api_token_expiration(api_token)
+        if expiry is None:
+            expiry = time.time() + self.token_ttl
+
+        self._api_token_expiry = expiry
+        self._api_token = api_token
+
+        return api_token
@@ -0,0 +1,292 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK BulkExporter class.
+"""
+
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+import os
+
+from .columnar import COLUMN_TYPES, _arrow_array, _columns, _flatten, _pyarrow
+from .records import Record
+
+FORMATS = ('ndjson', 'csv', 'parquet')
+
+COMPRESSORS = {
+    None: None,
+    'gzip': gzip.compress,
+    'bz2': bz2.compress,
+    'xz': lzma.compress,
+}
+
+
+def _csv_value(value):
+    """Internal function used to convert a flattened field to a CSV value."""
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+class BulkExporter():
+    """Writes rows, ex. the jobs streamed from the Rubrik Mosaic cluster, to a NDJSON, CSV or Parquet file in chunks so only
+    `chunk_size` rows are held in memory at a time. After each chunk is written its progress, with the `key` of each of its
+    rows, is appended to a `<path>.progress` file, so an interrupted export can be resumed: the file is truncated to the end
+    of the last complete chunk and the rows whose key was already written are skipped, wherever they are in the rows of the
+    new run. Rows that were added since, or that moved, are still written exactly once. The progress file is removed once
+    the export completes.
+
+    Each chunk of a compressed NDJSON or CSV file is written as a separate compressed stream, which the gzip, bz2 and xz
+    tools and modules read as a single file. A Parquet export is written to a directory with one part file per chunk, so
+    `chunk_size` should be larger for Parquet. CSV and Parquet exports flatten nested fields into columns named by their
+    dotted path (ex. sys_p_doc.policy_group_name) and use the columns of the first chunk unless `columns` is provided. Every
+    part file of a Parquet export has the same schema: the columns whose type is known (ex. start_time) are typed and every
+    other column is stored as text, with the values that are not strings encoded as JSON.
+
+    Arguments:
+        path {str} -- The path of the file, or directory for Parquet, to write.
+
+    Keyword Arguments:
+        format {str} -- The format of the export. (choices: {'ndjson', 'csv', 'parquet'}) (default: {'ndjson'})
+        compression {str} -- The compression of a NDJSON or CSV file ('gzip', 'bz2' or 'xz') or the compression codec of the Parquet files (ex. 'snappy' or 'zstd'). (default: {None})
+        chunk_size {int} -- The number of rows written at a time. (default: {10000})
+        columns {list} -- The flattened names of the columns of a CSV or Parquet export. (default: {None})
+        resume {bool} -- Flag to determine if an interrupted export of the same path is resumed instead of starting over. (default: {False})
+        key {str} -- The field that identifies a row, used to skip the rows already written when an export is resumed. (default: {'_id'})
+        log {function} -- The function used to create debug log messages. (default: {None})
+    """
+
+    def __init__(self, path, format='ndjson', compression=None, chunk_size=10000, columns=None, resume=False, key='_id', log=None):
+        if format not in FORMATS:
+            raise ValueError("The format argument must be one of: {}.".format(', '.join(FORMATS)))
+        if format != 'parquet' and compression not in COMPRESSORS:
+            raise ValueError("The compression argument must be one of: gzip, bz2, xz.")
+        if format == 'parquet':
+            self._pyarrow = _pyarrow()
+            import pyarrow.parquet
+        self.path = path
+        self.format = format
+        self.compression = compression
+        self.chunk_size = chunk_size
+        self.columns = list(columns) if columns is not None else None
+        self.key = key
+        self.log = log or (lambda message, *args: None)
+        self.progress_path = path + '.progress'
+        self.rows = 0
+        self.skipped = 0
+        self._written = None
+        self._size = 0
+        self._parts = 0
+        self._chunk = []
+
+        progress = self._load_progress() if resume else None
+        if progress is not None:
+            self.rows = progress['rows']
+            self.columns = progress['columns']
+            self._size = progress['size']
+            self._parts = progress['parts']
+            self._written = progress['keys']
+            self.log('BulkExporter - Resuming the export to {} after {} rows', path, self.rows)
+        self._prepare(progress is not None)
+        self._start_progress(progress)
+
+    def _header(self):
+        """Internal method used to get the first line of the progress file, which identifies the export."""
+        return {'format': self.format, 'compression': self.compression, 'key': self.key}
+
+    def _load_progress(self):
+        """Internal method used to read the progress of an interrupted export of the same path, format and key. The
+        progress of a chunk that was only partly recorded is ignored, as the chunk is written again."""
+        try:
+            with open(self.progress_path) as progress_file:
+                lines = progress_file.readlines()
+        except IOError:
+            return None
+        try:
+            if json.loads(lines[0]) != self._header():
+                return None
+        except (IndexError, ValueError):
+            return None
+        progress = None
+        keys = set()
+        for line in lines[1:]:
+            if not line.endswith('\n'):
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            keys.update(entry['keys'])
+            progress = entry
+        if progress is not None:
+            progress['keys'] = keys
+        return progress
+
+    def _start_progress(self, progress):
+        """Internal method used to atomically create the progress file, with the progress of the export being resumed."""
+        temp_path = self.progress_path + '.tmp'
+        with open(temp_path, 'w') as progress_file:
+            progress_file.write(json.dumps(self._header()) + '\n')
+            if progress is not None:
+                self._write_progress(progress_file, list(self._written))
+        os.replace(temp_path, self.progress_path)
+
+    def _write_progress(self, progress_file, keys):
+        """Internal method used to record the progress of the export after a chunk, with the keys of its rows."""
+        progress = {
+            'rows': self.rows,
+            'columns': self.columns,
+            'size': self._size,
+            'parts': self._parts,
+            'keys': keys,
+        }
+        progress_file.write(json.dumps(progress) + '\n')
+
+    def _prepare(self, resume):
+        """Internal method used to create the output, or discard anything written after the last complete chunk."""
+        if self.format == 'parquet':
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            for name in os.listdir(self.path):
+                if name.startswith('part-') and (not resume or int(name[5:10]) >= self._parts):
+                    os.remove(os.path.join(self.path, name))
+            return
+        with open(self.path, 'ab' if resume else 'wb') as output:
+            output.truncate(self._size)
+
+    def _part_path(self, part):
+        """Internal method used to get the path of a part file of a Parquet export."""
+        return os.path.join(self.path, 'part-{:05d}.parquet'.format(part))
+
+    def add(self, row):
+        """Add a row to the export. The rows already written by an interrupted export that is being resumed are skipped.
+
+        Arguments:
+            row {dict} -- The row to add.
+        """
+
+        if self._written and row[self.key] in self._written:
+            self.skipped += 1
+            return
+        self._chunk.append(row)
+        if len(self._chunk) >= self.chunk_size:
+            self._write_chunk()
+
+    def write(self, rows):
+        """Add every row to the export and complete it.
+
+        Arguments:
+            rows {iterable} -- The rows to export.
+
+        Returns:
+            int -- The total number of rows in the export.
+        """
+
+        for row in rows:
+            self.add(row)
+        return self.finish()
+
+    def finish(self):
+        """Write the remaining rows and complete the export.
+
+        Returns:
+            int -- The total number of rows in the export.
+        """
+
+        if self._chunk:
+            self._write_chunk()
+        if self.format == 'parquet' and self._parts == 0:
+            # An empty export still writes an empty part file so the dataset can be read
+            self._write_parquet([])
+        if self._written is not None and self.skipped < len(self._written):
+            self.log('BulkExporter - {} of the rows already written to {} are no longer listed', len(self._written) - self.skipped, self.path)
+        self._written = None
+        if os.path.exists(self.progress_path):
+            os.remove(self.progress_path)
+        self.log('BulkExporter - Exported {} rows to {}', self.rows, self.path)
+        return self.rows
+
+    def _write_chunk(self):
+        """Internal method used to write the current chunk and record the progress of the export."""
+        chunk = self._chunk
+        self._chunk = []
+        keys = [row[self.key] for row in chunk]
+        if self.format == 'parquet':
+            self._write_parquet(chunk)
+        else:
+            data = self._ndjson(chunk) if self.format == 'ndjson' else self._csv(chunk)
+            compress = COMPRESSORS[self.compression]
+            if compress is not None:
+                data = compress(data)
+            with open(self.path, 'ab') as output:
+                output.write(data)
+                output.flush()
+                os.fsync(output.fileno())
+            self._size += len(data)
+        self.rows += len(chunk)
+        with open(self.progress_path, 'a') as progress_file:
+            self._write_progress(progress_file, keys)
+        self.log('BulkExporter - Wrote {} rows to {}', self.rows, self.path)
+
+    def _ndjson(self, chunk):
+        """Internal method used to encode a chunk as NDJSON."""
+        return ''.join(json.dumps(row.to_dict() if isinstance(row, Record) else row, separators=(',', ':')) + '\n'
+                       for row in chunk).encode('utf-8')
+
+    def _csv(self, chunk):
+        """Internal method used to encode a chunk as CSV, preceded by the header at the start of the file."""
+        rows = []
+        for row in chunk:
+            flat = {}
+            _flatten(row.to_dict() if isinstance(row, Record) else row, '', flat)
+            rows.append(flat)
+        if self.columns is None:
+            self.columns = []
+            for flat in rows:
+                for name in flat:
+                    if name not in self.columns:
+                        self.columns.append(name)
+        text = io.StringIO()
+        writer = csv.writer(text, lineterminator='\n')
+        if self._size == 0:
+            writer.writerow(self.columns)
+        for flat in rows:
+            writer.writerow([_csv_value(flat.get(name)) for name in self.columns])
+        return text.getvalue().encode('utf-8')
+
+    def _write_parquet(self, chunk):
+        """Internal method used to write a chunk to the next part file of a Parquet export."""
+        pyarrow = self._pyarrow
+        data = _columns(chunk, self.columns)
+        if self.columns is None:
+            self.columns = list(data)
+        arrays = []
+        for name, values in data.items():
+            if name in COLUMN_TYPES:
+                arrays.append((name, _arrow_array(pyarrow, name, values)))
+            else:
+                # The other columns are stored as text so no chunk can have a different type than the chunks before it
+                arrays.append((name, pyarrow.array([value if value is None or isinstance(value, str) else json.dumps(value)
+                                                    for value in values], type=pyarrow.string())))
+        table = pyarrow.table(dict(arrays))
+        temp_path = os.path.join(self.path, '.part.tmp')
+        pyarrow.parquet.write_table(table, temp_path, compression=self.compression or 'none')
+        os.replace(temp_path, self._part_path(self._parts))
+        self._parts += 1
@@ -0,0 +1,152 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK ResponseCache class.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache():
+    """A size bounded, least recently used cache of GET responses where each entry expires after a per endpoint time to live.
+    Cached responses are shared between callers and must not be modified.
+
+    Keyword Arguments:
+        default_ttl {int} -- The number of seconds a response is cached for when its endpoint does not match any of the `ttls`. (default: {60})
+        ttls {dict} -- The number of seconds to cache the responses of each endpoint, keyed by the endpoint or an endpoint prefix (ex. {'/liststore': 600, '/listjobs': 10}). The longest matching prefix is used and a value of 0 disables caching for that endpoint. (default: {None})
+        maxsize {int} -- The maximum number of responses to cache before the least recently used response is evicted. (default: {256})
+    """
+
+    def __init__(self, default_ttl=60, ttls=None, maxsize=256):
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Incremented by every invalidation so a response fetched before it is not cached after it
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(api_endpoint, params):
+        if not params:
+            return api_endpoint
+        return api_endpoint, tuple(sorted(params.items()))
+
+    def ttl(self, api_endpoint):
+        """Get the number of seconds the responses of an endpoint are cached for.
+
+        Arguments:
+            api_endpoint {str} -- The endpoint of the Rubrik Mosaic API (ex. /liststore).
+
+        Returns:
+            int -- The time to live of the endpoint in seconds.
+        """
+
+        ttl = self.default_ttl
+        longest_prefix = -1
+        for prefix, prefix_ttl in self.ttls.items():
+            if api_endpoint.startswith(prefix) and len(prefix) > longest_prefix:
+                ttl = prefix_ttl
+                longest_prefix = len(prefix)
+        return ttl
+
+    def get(self, api_endpoint, params=None):
+        """Get the cached response of a GET request.
+
+        Arguments:
+            api_endpoint {str} -- The endpoint of the Rubrik Mosaic API (ex. /liststore).
+
+        Keyword Arguments:
+            params {dict} -- The params sent with the GET request. (default: {None})
+
+        Returns:
+            dict -- The cached response or None if it is not cached or has expired.
+        """
+
+        key = self._key(api_endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expiry, response = entry
+                if time.time() < expiry:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, api_endpoint, params, response, generation=None):
+        """Cache the response of a GET request.
+
+        Arguments:
+            api_endpoint {str} -- The endpoint of the Rubrik Mosaic API (ex. /liststore).
+            params {dict} -- The params sent with the GET request.
+            response {dict} -- The response of the GET request.
+
+        Keyword Arguments:
+            generation {int} -- The `generation` of the cache when the GET request was sent. The response is not cached if the cache has been invalidated since. (default: {None})
+        """
+
+        ttl = self.ttl(api_endpoint)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        key = self._key(api_endpoint, params)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.time() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, api_endpoint=None):
+        """Remove cached responses.
+
+        Keyword Arguments:
+            api_endpoint {str} -- Only remove the responses of the endpoints that start with this value. If a value is not provided the whole cache is cleared. (default: {None})
+        """
+
+        with self._lock:
+            self.generation += 1
+            if api_endpoint is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                endpoint = key if isinstance(key, str) else key[0]
+                if endpoint.startswith(api_endpoint):
+                    del self._entries[key]
+
+    def stats(self):
+        """Get the usage statistics of the cache.
+
+        Returns:
+            dict -- The number of hits, misses and evictions, the hit rate and the current number of cached responses.
+        """
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+                'size': len(self._entries),
+            }
@@ -0,0 +1,235 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK `mosaic` command line interface.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import OrderedDict
+
+from .bulk_export import _csv_value
+from .cache import ResponseCache
+from .columnar import _flatten
+from .exceptions import RubrikException
+from .records import Record
+from .rubrik_mosaic import Connect
+
+# The reports the `mosaic report` command can run, keyed by name, with their description and the function that runs them
+REPORTS = OrderedDict([
+    ('store-stats', ('The statistics of each backup store.', lambda mosaic, args: mosaic.get_store_stats(args.max_workers, args.collect_errors))),
+    ('source-stats', ('The statistics of each data source.', lambda mosaic, args: mosaic.get_source_stats(args.max_workers, args.collect_errors))),
+    ('policies', ('The backup policy documents.', lambda mosaic, args: mosaic.get_policies())),
+    ('jobs', ('Every job in the job history.', lambda mosaic, args: mosaic.get_jobs())),
+    ('job-summary', ('The jobs in --state that ended within the last --hours hours.', lambda mosaic, args: mosaic.get_job_summary(args.state, args.hours))),
+    ('protected-object-count', ('The number of objects under protection.', lambda mosaic, args: mosaic.get_protected_object_count())),
+    ('size-under-protection', ('The capacity of data under protection in MB.', lambda mosaic, args: mosaic.get_size_under_protection(args.max_workers))),
+    ('secondary-storage-consumed', ('The secondary storage consumed in MB.', lambda mosaic, args: mosaic.get_secondary_storage_consumed())),
+    ('backup-count', ('The number of backups stored.', lambda mosaic, args: mosaic.get_backup_count())),
+])
+
+# The reports that read the job history
+JOB_REPORTS = frozenset(['jobs', 'job-summary'])
+
+# The reports that return a list of items rather than a single value
+TABLE_REPORTS = frozenset(['store-stats', 'source-stats', 'policies', 'jobs', 'job-summary'])
+
+
+def _list_argument(convert):
+    """Internal function used to parse an argument that takes a single value or a comma separated list of values."""
+    def parse(value):
+        values = [convert(item) for item in value.split(',') if item]
+        return values[0] if len(values) == 1 else values
+    return parse
+
+
+def _parser():
+    """Internal function used to create the argument parser of the `mosaic` command."""
+    parser = argparse.ArgumentParser(prog='mosaic', description='Run reports against a Rubrik Mosaic cluster.')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    report = subparsers.add_parser(
+        'report', formatter_class=argparse.RawDescriptionHelpFormatter,
+        help='Run one or more reports in a single session.',
+        description='Run one or more reports in a single session. The reports share one login and each API endpoint is only '
+                    'called once, no matter how many of the reports use it.\n\nreports:\n' +
+                    '\n'.join('  {:<28}{}'.format(name, description) for name, (description, _) in REPORTS.items()))
+    report.add_argument('reports', nargs='+', choices=list(REPORTS), metavar='report', help='The reports to run.')
+    report.add_argument('--state', type=_list_argument(str), default='job_failed',
+                        help='The job state, or comma separated list of states, of the job-summary report. (default: job_failed)')
+    report.add_argument('--hours', type=_list_argument(int), default=24,
+                        help='The number of hours, or comma separated list of hours, to go back in the job history for the job-summary report. (default: 24)')
+    report.add_argument('--format', choices=['json', 'csv'], default='json', help='The output format. (default: json)')
+    report.add_argument('--output-dir', default=None,
+                        help='Write each report to <output-dir>/<report>.<format> instead of writing them to stdout.')
+    report.add_argument('--stats', action='store_true', help='Print the number of logins and API calls made to stderr.')
+    report.add_argument('--collect-errors', action='store_true',
+                        help='Report the stores or sources whose stats could be collected and warn about the others on stderr, '
+                             'instead of failing the store-stats and source-stats reports.')
+
+    connection = report.add_argument_group(
+        'connection', 'The environment variables used by rubrik_mosaic.Connect() are used for any value that is not provided.')
+    connection.add_argument('--node-ip', default=None, help='The hostname or IP address of a node, or a comma separated list of nodes.')
+    connection.add_argument('--port', default=None)
+    connection.add_argument('--username', default=None)
+    connection.add_argument('--password', default=None,
+                            help='Prefer the rubrik_mosaic_password environment variable, a password argument is visible to other users.')
+    connection.add_argument('--verify', default=False, nargs='?', const=True,
+                            help='Validate the certificate of the cluster, optionally against the CA bundle at the given path.')
+    connection.add_argument('--max-workers', type=int, default=1, help='The number of stores or sources to get the stats of in parallel. (default: 1)')
+    connection.add_argument('--debug', action='store_true', help='Enable the debug log messages of the SDK.')
+    return parser
+
+
+def _json_default(value):
+    """Internal function used to encode the records returned by the reporting functions as JSON."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError('Object of type {} is not JSON serializable'.format(type(value).__name__))
+
+
+def _rows(result):
+    """Internal function used to convert the result of a report to a list of flattened rows."""
+    if isinstance(result, dict):
+        # A job summary for several numbers of hours, each job is labelled with the number of hours it matched
+        rows = []
+        for hours, jobs in result.items():
+            rows.extend(dict(num_hours=hours, **(job.to_dict() if isinstance(job, Record) else job)) for job in jobs)
+    elif isinstance(result, list):
+        rows = result
+    else:
+        rows = [{'value': result}]
+
+    flat_rows = []
+    for row in rows:
+        flat = {}
+        _flatten(row.to_dict() if isinstance(row, Record) else row, '', flat)
+        flat_rows.append(flat)
+    return flat_rows
+
+
+def _write_csv(rows, output):
+    """Internal function used to write flattened rows as CSV with a column for every field found in the rows."""
+    columns = []
+    for row in rows:
+        for name in row:
+            if name not in columns:
+                columns.append(name)
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_value(row.get(name)) for name in columns])
+
+
+def _write_results(results, args, output):
+    """Internal function used to write the result of each report in the requested format."""
+    if args.output_dir is not None:
+        if not os.path.isdir(args.output_dir):
+            os.makedirs(args.output_dir)
+        for name, result in results.items():
+            with open(os.path.join(args.output_dir, '{}.{}'.format(name, args.format)), 'w', newline='') as report_file:
+                if args.format == 'json':
+                    json.dump(result, report_file, default=_json_default)
+                    report_file.write('\n')
+                else:
+                    _write_csv(_rows(result), report_file)
+    elif args.format == 'json':
+        json.dump(results, output, default=_json_default)
+        output.write('\n')
+    elif len(results) == 1:
+        _write_csv(_rows(next(iter(results.values()))), output)
+    else:
+        # Only reports that return a single value can share a table
+        _write_csv([{'report': name, 'value': result} for name, result in results.items()], output)
+
+
+def run_reports(mosaic, reports, args):
+    """Run several reports against the same connection. The connection should have a response cache so the API endpoints
+    used by more than one report are only called once.
+
+    Arguments:
+        mosaic {Connect} -- The connection to the Rubrik Mosaic cluster.
+        reports {list} -- The names of the reports to run.
+        args {argparse.Namespace} -- The parsed `mosaic report` arguments, ex. the --state and --hours of the job-summary report. With --collect-errors a warning is written to stderr for each store or source whose stats could not be collected.
+
+    Returns:
+        OrderedDict -- The result of each report keyed by its name.
+    """
+
+    results = OrderedDict()
+    for name in reports:
+        mosaic.log('mosaic - Running the {} report', name)
+        result = REPORTS[name][1](mosaic, args)
+        # The errors are only collected, rather than raised, with --collect-errors
+        for item, error in getattr(result, 'errors', {}).items():
+            sys.stderr.write('mosaic: warning: the {} report is missing {}: {}\n'.format(name, item, error))
+        results[name] = result
+    return results
+
+
+def _print_stats(mosaic):
+    """Internal function used to print the number of logins and API calls made by the session to stderr."""
+    metrics = mosaic.metrics()
+    sys.stderr.write('mosaic: {} login(s)\n'.format(metrics['logins']))
+    for endpoint, methods in sorted(metrics['endpoints'].items()):
+        for method, endpoint_metrics in sorted(methods.items()):
+            sys.stderr.write('mosaic: {} {} called {} time(s)\n'.format(method, endpoint, endpoint_metrics['count']))
+    if metrics['cache'] is not None:
+        sys.stderr.write('mosaic: {} response(s) served from the cache\n'.format(metrics['cache']['hits']))
+
+
+def main(argv=None, output=None):
+    """The entry point of the `mosaic` command.
+
+    Keyword Arguments:
+        argv {list} -- The command line arguments. If a value is not provided the arguments of the process are used. (default: {None})
+        output {file} -- The file the reports are written to when --output-dir is not used. (default: {sys.stdout})
+
+    Returns:
+        int -- The exit status of the command.
+    """
+
+    parser = _parser()
+    args = parser.parse_args(argv)
+    output = output or sys.stdout
+
+    reports = list(OrderedDict.fromkeys(args.reports))
+    if args.format == 'csv' and args.output_dir is None and len(reports) > 1 and TABLE_REPORTS.intersection(reports):
+        parser.error('writing more than one report as CSV to stdout requires --output-dir, unless every report returns a single value')
+
+    # Every response is kept for the whole run so the reports share them. The job history is only kept when more than one
+    # report reads it, otherwise it is streamed
+    ttls = {} if len(JOB_REPORTS.intersection(reports)) > 1 else {'/listjobs': 0}
+    cache = ResponseCache(default_ttl=24 * 3600, ttls=ttls, maxsize=sys.maxsize)
+
+    try:
+        with Connect(args.node_ip, args.username, args.password, args.port or '9090', enable_logging=args.debug,
+                     verify=args.verify, pool_maxsize=max(10, args.max_workers), max_workers=args.max_workers,
+                     cache=cache) as mosaic:
+            results = run_reports(mosaic, reports, args)
+            _write_results(results, args, output)
+            if args.stats:
+                _print_stats(mosaic)
+    except (RubrikException, IOError) as error:
+        sys.stderr.write('mosaic: error: {}\n'.format(error))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
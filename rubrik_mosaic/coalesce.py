@@ -0,0 +1,95 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK RequestCoalescer class.
+"""
+
+import threading
+
+
+class _Call():
+    """Internal class used to hold the outcome of an in-flight request for the callers waiting on it."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer():
+    """Coalesces concurrent identical requests into a single request. The first caller of a key makes the request and any
+    caller that asks for the same key while it is in flight waits for it and receives the same response, or the same
+    exception, instead of making its own. Coalesced responses are shared between callers and must not be modified.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def call(self, key, function):
+        """Call `function` unless a call with the same key is already in flight, in which case wait for its outcome.
+
+        Arguments:
+            key {object} -- The hashable key that identifies identical requests (ex. the endpoint and params of a GET request).
+            function {function} -- The function that makes the request when no identical request is in flight.
+
+        Returns:
+            object -- The value returned by `function`, or by the identical request that was in flight.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.requests += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            # Callers that arrive from now on make a new request rather than receive a response that may be stale
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        """Get the usage statistics of the coalescer.
+
+        Returns:
+            dict -- The number of requests made, the number of requests that were coalesced into one already in flight and the number of requests currently in flight.
+        """
+
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
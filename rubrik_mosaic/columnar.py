@@ -0,0 +1,169 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK functions used to export reporting results to pandas and Arrow.
+"""
+
+import json
+
+from .records import Record
+
+# The type of the columns whose type is known, keyed by the flattened field name. Times are in seconds since the epoch
+COLUMN_TYPES = {
+    'start_time': 'timestamp',
+    'end_time': 'timestamp',
+    'physical_size': 'int',
+    'version_count': 'int',
+    'db_stats.licensed_size': 'int',
+    'db_stats.status': 'bool',
+    'sys_p_doc.policy_disabled': 'bool',
+    'current_state': 'category',
+}
+
+
+def _pandas():
+    """Internal function used to import pandas only when it is used, as it takes longer to import than the SDK itself."""
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("The pandas package is required to use to_dataframe(). Install it with `pip install rubrik_mosaic[pandas]`.")
+    return pandas
+
+
+def _pyarrow():
+    """Internal function used to import pyarrow only when it is used, as it takes longer to import than the SDK itself."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("The pyarrow package is required to use to_arrow(). Install it with `pip install rubrik_mosaic[arrow]`.")
+    return pyarrow
+
+
+def _flatten(row, prefix, flat):
+    """Internal function used to flatten the nested objects of a row into `flat`, keyed by their dotted path (ex. sys_p_doc.policy_group_name)."""
+    for key, value in row.items():
+        if type(value) is dict:
+            _flatten(value, prefix + key + '.', flat)
+        else:
+            flat[prefix + key] = value
+
+
+def _columns(rows, columns=None):
+    """Internal function used to convert rows of nested dicts, or records, to a dict of columns in a single pass.
+
+    Arguments:
+        rows {iterable} -- The rows to convert.
+
+    Keyword Arguments:
+        columns {list} -- The flattened names of the columns to include. If a value is not provided every field found in the rows is included. (default: {None})
+
+    Returns:
+        dict -- The list of values of each column, None where a row does not have the field.
+    """
+
+    data = {} if columns is None else dict((name, []) for name in columns)
+    count = 0
+    for row in rows:
+        flat = {}
+        _flatten(row.to_dict() if isinstance(row, Record) else row, '', flat)
+        if columns is None:
+            for name in flat:
+                if name not in data:
+                    data[name] = [None] * count
+        get = flat.get
+        for name, values in data.items():
+            values.append(get(name))
+        count += 1
+
+    for name, values in data.items():
+        column_type = COLUMN_TYPES.get(name)
+        if column_type in ('int', 'timestamp'):
+            data[name] = [None if value is None else int(value) for value in values]
+        elif column_type == 'bool':
+            data[name] = [None if value is None else bool(value) for value in values]
+    return data
+
+
+def _arrow_array(pyarrow, name, values):
+    """Internal function used to convert the values of a column to a typed Arrow array."""
+    column_type = COLUMN_TYPES.get(name)
+    if column_type == 'int':
+        return pyarrow.array(values, type=pyarrow.int64())
+    if column_type == 'timestamp':
+        return pyarrow.array(values, type=pyarrow.int64()).cast(pyarrow.timestamp('s', tz='UTC'))
+    if column_type == 'bool':
+        return pyarrow.array(values, type=pyarrow.bool_())
+    if column_type == 'category':
+        return pyarrow.array(values, type=pyarrow.string()).dictionary_encode()
+    try:
+        return pyarrow.array(values)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        # A field with values of more than one type (ex. a str or a list) is stored as JSON text
+        return pyarrow.array([value if value is None or isinstance(value, str) else json.dumps(value) for value in values], type=pyarrow.string())
+
+
+def _pandas_column(pandas, name, values):
+    """Internal function used to convert the values of a column to a typed pandas column."""
+    column_type = COLUMN_TYPES.get(name)
+    if column_type == 'int':
+        return pandas.array(values, dtype='Int64') if None in values else pandas.array(values, dtype='int64')
+    if column_type == 'timestamp':
+        return pandas.to_datetime(pandas.array(values, dtype='Int64'), unit='s', utc=True)
+    if column_type == 'bool':
+        return pandas.array(values, dtype='boolean') if None in values else pandas.array(values, dtype='bool')
+    if column_type == 'category':
+        return pandas.Categorical(values)
+    return values
+
+
+def to_dataframe(rows, columns=None):
+    """Convert rows of nested dicts, or records, to a pandas DataFrame. Nested objects are flattened into columns named by
+    their dotted path (ex. sys_p_doc.policy_group_name) and the columns whose type is known are typed: times as UTC
+    datetimes, sizes and counts as integers, flags as booleans and job states as categories. The `pandas` package must be
+    installed.
+
+    Arguments:
+        rows {iterable} -- The rows to convert.
+
+    Keyword Arguments:
+        columns {list} -- The flattened names of the columns to include. If a value is not provided every field found in the rows is included. (default: {None})
+
+    Returns:
+        pandas.DataFrame -- One row per item and one column per field.
+    """
+
+    pandas = _pandas()
+    data = _columns(rows, columns)
+    return pandas.DataFrame(dict((name, _pandas_column(pandas, name, values)) for name, values in data.items()), columns=list(data))
+
+
+def to_arrow(rows, columns=None):
+    """Convert rows of nested dicts, or records, to an Arrow Table with the same flattened and typed columns as
+    `to_dataframe()`. Fields whose values have more than one type are stored as JSON text. The `pyarrow` package must be
+    installed.
+
+    Arguments:
+        rows {iterable} -- The rows to convert.
+
+    Keyword Arguments:
+        columns {list} -- The flattened names of the columns to include. If a value is not provided every field found in the rows is included. (default: {None})
+
+    Returns:
+        pyarrow.Table -- One row per item and one column per field.
+    """
+
+    pyarrow = _pyarrow()
+    data = _columns(rows, columns)
+    return pyarrow.table(dict((name, _arrow_array(pyarrow, name, values)) for name, values in data.items()))
+
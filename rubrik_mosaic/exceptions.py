@@ -17,3 +17,7 @@ class InvalidAPIEndPointException(RubrikException):
 
 class MissingCredentialException(RubrikException):
     pass
+
+
+class CircuitOpenException(RubrikConnectionException):
+    pass
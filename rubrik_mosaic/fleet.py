@@ -0,0 +1,222 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK MosaicFleet class.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+try:
+    from queue import Queue, Empty  # Python 3+
+except ImportError:
+    from Queue import Queue, Empty  # Python 2.X
+
+from .exceptions import RubrikConnectionException
+from .rubrik_mosaic import Connect
+
+
+class FleetResult():
+    """The result of running a reporting function across every cluster of a fleet.
+
+    Arguments:
+        results {dict} -- The result of each cluster that completed successfully, keyed by the cluster name.
+        errors {dict} -- The exception raised by each cluster that failed or timed out, keyed by the cluster name.
+    """
+
+    def __init__(self, results, errors):
+        self.results = results
+        self.errors = errors
+
+    def merge(self):
+        """Merge the results of every successful cluster into a single fleet wide result. Numbers are added together, lists
+        are concatenated and dicts are merged key by key.
+
+        Returns:
+            object -- The merged result.
+        """
+        return _merge(list(self.results.values()))
+
+
+def _merge(values):
+    """Internal function used to merge a list of results of the same type."""
+    if not values:
+        return None
+    first = values[0]
+    if isinstance(first, bool):
+        raise TypeError("Unable to merge results of type bool.")
+    if isinstance(first, (int, float)):
+        return sum(values)
+    if isinstance(first, list):
+        merged = []
+        for value in values:
+            merged.extend(value)
+        return merged
+    if isinstance(first, dict):
+        keys = []
+        for value in values:
+            keys.extend(key for key in value if key not in keys)
+        return {key: _merge([value[key] for value in values if key in value]) for key in keys}
+    raise TypeError("Unable to merge results of type {}.".format(type(first).__name__))
+
+
+class MosaicFleet():
+    """Run the reporting functions of the Rubrik Mosaic SDK across many clusters concurrently. Every reporting function of
+    the Connect class is available on the fleet and returns a FleetResult. A slow or failing cluster is isolated from the
+    others and reported in the `errors` of the result.
+
+    Arguments:
+        clusters {list} -- The Connect keyword arguments (node_ip, username, password, etc.) of each cluster. An optional `name` key identifies the cluster in the results, the first `node_ip` is used otherwise. A dict of configs keyed by cluster name is also accepted.
+
+    Keyword Arguments:
+        max_workers {int} -- The maximum number of clusters to run a reporting function on in parallel. If a value is not provided every cluster is run in parallel. (default: {None})
+        timeout {int} -- The number of seconds each cluster has to complete, counted from when a worker starts running it, before it is reported as timed out and its worker is replaced. A cluster waiting for a free worker is not timed out. If a value is not provided there is no time limit. (default: {None})
+    """
+
+    def __init__(self, clusters, max_workers=None, timeout=None):
+        if isinstance(clusters, dict):
+            clusters = [dict(config, name=name) for name, config in clusters.items()]
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.clusters = {}
+        for config in clusters:
+            config = dict(config)
+            name = config.pop('name', None)
+            mosaic = Connect(**config)
+            name = name or mosaic.node_ip
+            if name in self.clusters:
+                raise ValueError("The cluster name {} is used more than once.".format(name))
+            self.clusters[name] = mosaic
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getattr__(self, name):
+        if name.startswith('_') or not callable(getattr(Connect, name, None)):
+            raise AttributeError(name)
+
+        def run_method(*args, **kwargs):
+            return self.run(name, *args, **kwargs)
+
+        run_method.__name__ = name
+        run_method.__doc__ = getattr(Connect, name).__doc__
+        return run_method
+
+    def close(self):
+        """Close the connections to every cluster in the fleet.
+        """
+        for mosaic in self.clusters.values():
+            mosaic.close()
+
+    def run(self, method, *args, **kwargs):
+        """Run a reporting function on every cluster in the fleet concurrently.
+
+        Arguments:
+            method {str} -- The name of the Connect method to run (ex. get_backup_count).
+
+        Returns:
+            FleetResult -- The result of each cluster and the error of each cluster that failed or timed out.
+        """
+        results = {}
+        errors = {}
+        if not self.clusters:
+            return FleetResult(results, errors)
+
+        # Daemon threads are used so a cluster that never answers can not keep the interpreter from exiting
+        pending = Queue()
+        futures = {}
+        for name, mosaic in self.clusters.items():
+            future = Future()
+            futures[future] = name
+            pending.put((future, mosaic))
+        # The time each cluster was started at and the clusters that were abandoned after timing out
+        started = {}
+        abandoned = set()
+        lock = threading.Lock()
+        for _ in range(min(self.max_workers or len(self.clusters), len(self.clusters))):
+            self._start_worker(pending, method, args, kwargs, started, abandoned, lock)
+
+        not_done = set(futures)
+        while not_done:
+            wait_timeout = None
+            if self.timeout is not None:
+                now = time.time()
+                wait_timeout = self.timeout
+                for future in list(not_done):
+                    if future not in started:
+                        # A cluster still waiting for a worker has not used any of its time yet
+                        continue
+                    remaining = started[future] + self.timeout - now
+                    if remaining > 0:
+                        wait_timeout = min(wait_timeout, remaining)
+                        continue
+                    with lock:
+                        if future.done():
+                            continue
+                        abandoned.add(future)
+                    not_done.discard(future)
+                    name = futures[future]
+                    Connect.log('MosaicFleet - {} timed out on {}', method, name)
+                    errors[name] = RubrikConnectionException("The Rubrik Mosaic cluster {} did not complete {} within {} seconds.".format(name, method, self.timeout))
+                    # The worker of the cluster keeps running until the cluster answers, a new worker runs the queued clusters
+                    if not pending.empty():
+                        self._start_worker(pending, method, args, kwargs, started, abandoned, lock)
+                if not not_done:
+                    break
+            done, not_done = wait(not_done, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = futures[future]
+                error = future.exception()
+                if error is None:
+                    results[name] = future.result()
+                else:
+                    Connect.log('MosaicFleet - {} failed on {}: {}', method, name, error)
+                    errors[name] = error
+
+        # Keep the results in the order the clusters were provided
+        return FleetResult({name: results[name] for name in self.clusters if name in results},
+                           {name: errors[name] for name in self.clusters if name in errors})
+
+    def _start_worker(self, pending, method, args, kwargs, started, abandoned, lock):
+        """Internal method used to start a worker thread that runs a reporting function on the clusters of the pending queue."""
+        worker = threading.Thread(target=self._worker, args=(pending, method, args, kwargs, started, abandoned, lock))
+        worker.daemon = True
+        worker.start()
+
+    @staticmethod
+    def _worker(pending, method, args, kwargs, started, abandoned, lock):
+        """Internal method used to run a reporting function on each cluster taken from the pending queue. The worker stops
+        once a cluster it ran was abandoned after timing out, since a new worker has replaced it."""
+        while True:
+            try:
+                future, mosaic = pending.get_nowait()
+            except Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            start = started[future] = time.time()
+            try:
+                result = getattr(mosaic, method)(*args, **kwargs)
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                mosaic.log('MosaicFleet - {} completed on {} in {:.2f} seconds', method, mosaic.node_ip, time.time() - start)
+                future.set_result(result)
+            with lock:
+                if future in abandoned:
+                    return
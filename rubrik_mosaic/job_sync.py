@@ -0,0 +1,175 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK JobSync class.
+"""
+
+import json
+import os
+
+from .records import Job
+from .reporting import _JobSummary
+
+_STATE_VERSION = 1
+
+
+class JobSync():
+    """Incrementally synchronize the jobs of a Rubrik Mosaic cluster. A high-water mark of the last job end time seen is
+    persisted in a local state file along with a window of the recently ended jobs, so each poll only processes the jobs
+    that ended since the previous poll.
+
+    Each poll only appends the jobs it found to a journal next to the state file (`<state_file>.journal`) instead of
+    rewriting the whole window. The journal is compacted into the state file once it holds more jobs than the window.
+
+    Arguments:
+        mosaic {Connect} -- The connection to the Rubrik Mosaic cluster.
+        state_file {str} -- The path of the file used to persist the high-water mark and recent jobs between polls.
+
+    Keyword Arguments:
+        window_hours {int} -- The number of hours of recently ended jobs to keep in the local window. (default: {24})
+        clock_skew {int} -- The number of seconds before the high-water mark that are checked again on each poll to catch jobs that were recorded late. (default: {300})
+    """
+
+    def __init__(self, mosaic, state_file, window_hours=24, clock_skew=300):
+        self.mosaic = mosaic
+        self.state_file = state_file
+        self.journal_file = "{}.journal".format(state_file)
+        self.window_hours = window_hours
+        self.clock_skew = clock_skew
+        self.watermark = {'end_time': 0, '_id': None}
+        self.jobs = {}
+        self._journal_jobs = 0
+        self._journal_damaged = False
+        self._load()
+
+    def _load(self):
+        """Internal method used to read the high-water mark and recent jobs from the state file and replay the journal of
+        the polls made since it was written."""
+        try:
+            with open(self.state_file) as state_file:
+                state = json.load(state_file)
+        except (IOError, OSError):
+            state = None
+        except ValueError:
+            self.mosaic.log('JobSync - Ignoring the corrupt state file {}', self.state_file)
+            state = None
+        if state is not None:
+            if state.get('version') != _STATE_VERSION:
+                self.mosaic.log('JobSync - Ignoring the state file {} written by an unsupported version', self.state_file)
+                return
+            self.watermark = state['watermark']
+            self.jobs = state['jobs']
+
+        try:
+            journal = open(self.journal_file)
+        except (IOError, OSError):
+            return
+        with journal:
+            for line in journal:
+                try:
+                    if not line.endswith('\n'):
+                        raise ValueError('incomplete entry')
+                    entry = json.loads(line)
+                except ValueError:
+                    # A poll was interrupted while writing its entry, the journal is compacted on the next poll so new
+                    # entries are not appended after it
+                    self.mosaic.log('JobSync - Ignoring the incomplete last entry of the journal {}', self.journal_file)
+                    self._journal_damaged = True
+                    break
+                for job in entry['jobs']:
+                    self.jobs[job['_id']] = job
+                if (entry['watermark']['end_time'], entry['watermark']['_id'] or '') > (self.watermark['end_time'], self.watermark['_id'] or ''):
+                    self.watermark = entry['watermark']
+                self._journal_jobs += len(entry['jobs'])
+        self._age_out()
+
+    def _age_out(self):
+        """Internal method used to remove the jobs that ended before the window from the window."""
+        # Age out the window relative to the cluster time of the newest job so a skewed local clock has no effect
+        oldest = self.watermark['end_time'] - self.window_hours * 3600
+        for job_id in [job_id for job_id, job in self.jobs.items() if job['end_time'] < oldest]:
+            del self.jobs[job_id]
+
+    def _save(self, newjobs):
+        """Internal method used to append the new jobs and high-water mark of a poll to the journal, or to compact the
+        journal into the state file once it holds more jobs than the window."""
+        if self._journal_damaged or self._journal_jobs + len(newjobs) > len(self.jobs):
+            self._compact()
+            return
+        if not newjobs:
+            return
+        with open(self.journal_file, 'a') as journal:
+            journal.write(json.dumps({'watermark': self.watermark, 'jobs': newjobs}) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        self._journal_jobs += len(newjobs)
+
+    def _compact(self):
+        """Internal method used to atomically write the high-water mark and recent jobs to the state file and remove the journal."""
+        state = {'version': _STATE_VERSION, 'watermark': self.watermark, 'jobs': self.jobs}
+        temp_file = "{}.tmp".format(self.state_file)
+        with open(temp_file, 'w') as state_file:
+            json.dump(state, state_file)
+        os.replace(temp_file, self.state_file)
+        # Replaying a journal that is left behind by an interruption here only merges jobs the state file already has
+        try:
+            os.remove(self.journal_file)
+        except (IOError, OSError):
+            pass
+        self._journal_jobs = 0
+        self._journal_damaged = False
+
+    def poll(self):
+        """Get the jobs that ended since the previous poll and merge them into the window of recent jobs. The first poll
+        without a state file returns every job that has ended.
+
+        Returns:
+            list -- A list that contains the details of each job that ended since the previous poll, in the order they were listed. The jobs are Job records when the connection was created with `records=True`.
+        """
+        threshold = self.watermark['end_time'] - self.clock_skew
+        watermark = self.watermark
+        newjobs = []
+        # The window is persisted as JSON so the jobs are always read as dicts
+        for job in self.mosaic._iter_jobs(None, False):
+            end_time = job.get('end_time') or 0
+            if end_time < threshold or end_time == 0:
+                continue
+            previous = self.jobs.get(job['_id'])
+            # Jobs inside the clock skew band may already have been processed by a previous poll
+            if previous is not None and previous.get('end_time') == end_time and previous.get('current_state') == job['current_state']:
+                continue
+            self.jobs[job['_id']] = job
+            newjobs.append(job)
+            if (end_time, job['_id']) > (watermark['end_time'], watermark['_id'] or ''):
+                watermark = {'end_time': end_time, '_id': job['_id']}
+        self.watermark = watermark
+
+        self._age_out()
+        self._save(newjobs)
+        self.mosaic.log('JobSync - Found {} new jobs, {} jobs in the window, high-water mark {}', len(newjobs), len(self.jobs), self.watermark['end_time'])
+        if self.mosaic.records:
+            return [Job.from_dict(job) for job in newjobs]
+        return newjobs
+
+    def get_job_summary(self, job_state, num_hours):
+        """Get a list of the jobs in the local window that are in `job_state` and ended within the last `num_hours` hours.
+
+        Arguments:
+            job_state {str} -- The current state of the job as a string, or a list of states
+            num_hours {int} -- The number of hours to go back in the job history, or a list of hours
+
+        Returns:
+            list -- A list that contains the details of each matching job. When a list of hours is provided a dict that contains the list of jobs for each number of hours is returned instead.
+        """
+        return _JobSummary(job_state, num_hours, self.mosaic.log, Job if self.mosaic.records else None).extend(self.jobs.values()).result()
@@ -0,0 +1,224 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK JobTable class.
+"""
+
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .columnar import _pandas, _pyarrow
+
+
+class JobTable():
+    """A columnar table of jobs backed by NumPy arrays. The ids, start times, end times and states of the jobs are stored in
+    contiguous arrays so time window, state and duration queries are answered with vectorized comparisons instead of a
+    Python loop over every job. The `numpy` package must be installed to use it.
+
+    Arguments:
+        ids {list} -- The `_id` of each job.
+        start_times {numpy.ndarray} -- The `start_time` of each job in seconds since the epoch.
+        end_times {numpy.ndarray} -- The `end_time` of each job in seconds since the epoch.
+        state_codes {numpy.ndarray} -- The index in `states` of the `current_state` of each job.
+        states {list} -- The name of each job state.
+
+    Keyword Arguments:
+        jobs {list} -- The details of each job, in the same order as the columns. (default: {None})
+    """
+
+    def __init__(self, ids, start_times, end_times, state_codes, states, jobs=None):
+        if numpy is None:
+            raise ImportError("The numpy package is required to use JobTable. Install it with `pip install rubrik_mosaic[numpy]`.")
+        self.ids = numpy.asarray(ids, dtype=object)
+        self.start_times = numpy.asarray(start_times, dtype=numpy.int64)
+        self.end_times = numpy.asarray(end_times, dtype=numpy.int64)
+        self.state_codes = numpy.asarray(state_codes, dtype=numpy.int16)
+        self.states = list(states)
+        self._jobs = jobs
+
+    @classmethod
+    def from_jobs(cls, jobs, keep_jobs=False):
+        """Build a table from the details of each job, ex. the result of `get_jobs()` or `iter_jobs()`.
+
+        Arguments:
+            jobs {iterable} -- The details of each job.
+
+        Keyword Arguments:
+            keep_jobs {bool} -- Flag to determine if the details of each job are kept so `jobs()` can return them. (default: {False})
+
+        Returns:
+            JobTable -- The table of jobs.
+        """
+        ids = []
+        start_times = []
+        end_times = []
+        state_codes = []
+        codes = {}
+        kept = [] if keep_jobs else None
+        for job in jobs:
+            ids.append(job['_id'])
+            start_times.append(job.get('start_time') or 0)
+            end_times.append(job.get('end_time') or 0)
+            state_codes.append(codes.setdefault(job['current_state'], len(codes)))
+            if kept is not None:
+                kept.append(job)
+        return cls(ids, start_times, end_times, state_codes, sorted(codes, key=codes.get), kept)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def durations(self):
+        """Get the duration of each job.
+
+        Returns:
+            numpy.ndarray -- The number of seconds between the start and end time of each job.
+        """
+        return self.end_times - self.start_times
+
+    def select(self, job_state=None, num_hours=None, min_duration=None, max_duration=None, now=None):
+        """Select the jobs that match all of the provided conditions.
+
+        Keyword Arguments:
+            job_state {str} -- The current state of the jobs to select, or a list of states. (default: {None})
+            num_hours {int} -- Only select the jobs that ended within this number of hours. (default: {None})
+            min_duration {int} -- Only select the jobs that ran for at least this number of seconds. (default: {None})
+            max_duration {int} -- Only select the jobs that ran for at most this number of seconds. (default: {None})
+            now {int} -- The time the `num_hours` window ends at in seconds since the epoch. If a value is not provided the current time is used. (default: {None})
+
+        Returns:
+            numpy.ndarray -- A boolean mask of the selected jobs.
+        """
+        mask = numpy.ones(len(self.ids), dtype=bool)
+        if job_state is not None:
+            mask &= numpy.isin(self.state_codes, self._state_codes(job_state))
+        if num_hours is not None:
+            if now is None:
+                now = time.time()
+            mask &= self.end_times >= now - num_hours * 3600
+        if min_duration is not None or max_duration is not None:
+            durations = self.durations()
+            if min_duration is not None:
+                mask &= durations >= min_duration
+            if max_duration is not None:
+                mask &= durations <= max_duration
+        return mask
+
+    def count(self, **conditions):
+        """Count the jobs that match all of the provided conditions. See `select()` for the supported conditions.
+
+        Returns:
+            int -- The number of matching jobs.
+        """
+        return int(numpy.count_nonzero(self.select(**conditions)))
+
+    def count_by_state(self, num_hours=None, now=None):
+        """Count the jobs in each state.
+
+        Keyword Arguments:
+            num_hours {int} -- Only count the jobs that ended within this number of hours. (default: {None})
+            now {int} -- The time the `num_hours` window ends at in seconds since the epoch. If a value is not provided the current time is used. (default: {None})
+
+        Returns:
+            dict -- The number of jobs keyed by state.
+        """
+        codes = self.state_codes if num_hours is None else self.state_codes[self.select(num_hours=num_hours, now=now)]
+        counts = numpy.bincount(codes, minlength=len(self.states))
+        return dict(zip(self.states, counts.tolist()))
+
+    def summary(self, job_states, hours, now=None):
+        """Count the jobs for every combination of state and time window in one call.
+
+        Arguments:
+            job_states {list} -- The job states to count.
+            hours {list} -- The time windows to count, in hours.
+
+        Keyword Arguments:
+            now {int} -- The time the windows end at in seconds since the epoch. If a value is not provided the current time is used. (default: {None})
+
+        Returns:
+            dict -- The number of jobs keyed by a `(state, hours)` tuple.
+        """
+        if now is None:
+            now = time.time()
+        counts = {}
+        for job_state in job_states:
+            state_mask = self.select(job_state=job_state)
+            for num_hours in hours:
+                counts[(job_state, num_hours)] = int(numpy.count_nonzero(state_mask & (self.end_times >= now - num_hours * 3600)))
+        return counts
+
+    def job_ids(self, mask):
+        """Get the `_id` of the selected jobs.
+
+        Arguments:
+            mask {numpy.ndarray} -- A boolean mask returned by `select()`.
+
+        Returns:
+            list -- The `_id` of each selected job.
+        """
+        return self.ids[mask].tolist()
+
+    def jobs(self, mask):
+        """Get the details of the selected jobs. The table must have been built with `keep_jobs=True`.
+
+        Arguments:
+            mask {numpy.ndarray} -- A boolean mask returned by `select()`.
+
+        Returns:
+            list -- The details of each selected job.
+        """
+        if self._jobs is None:
+            raise ValueError("The details of the jobs were not kept, build the table with keep_jobs=True.")
+        return [self._jobs[index] for index in numpy.flatnonzero(mask)]
+
+    def to_dataframe(self):
+        """Convert the columns of the table to a pandas DataFrame without a Python loop over the jobs. The start and end times
+        are UTC datetimes and the states are categories. The `pandas` package must be installed.
+
+        Returns:
+            pandas.DataFrame -- The `_id`, `current_state`, `start_time` and `end_time` of each job.
+        """
+        pandas = _pandas()
+        return pandas.DataFrame({
+            '_id': self.ids,
+            'current_state': pandas.Categorical.from_codes(self.state_codes, self.states),
+            'start_time': pandas.to_datetime(self.start_times, unit='s', utc=True),
+            'end_time': pandas.to_datetime(self.end_times, unit='s', utc=True),
+        })
+
+    def to_arrow(self):
+        """Convert the columns of the table to an Arrow Table without a Python loop over the jobs. The start and end times are
+        UTC timestamps and the states are dictionary encoded. The `pyarrow` package must be installed.
+
+        Returns:
+            pyarrow.Table -- The `_id`, `current_state`, `start_time` and `end_time` of each job.
+        """
+        pyarrow = _pyarrow()
+        timestamp = pyarrow.timestamp('s', tz='UTC')
+        return pyarrow.table({
+            '_id': pyarrow.array(self.ids, type=pyarrow.string()),
+            'current_state': pyarrow.DictionaryArray.from_arrays(pyarrow.array(self.state_codes, type=pyarrow.int16()), pyarrow.array(self.states, type=pyarrow.string())),
+            'start_time': pyarrow.array(self.start_times, type=pyarrow.int64()).cast(timestamp),
+            'end_time': pyarrow.array(self.end_times, type=pyarrow.int64()).cast(timestamp),
+        })
+
+    def _state_codes(self, job_state):
+        """Internal method used to convert a state, or list of states, to the list of matching state codes."""
+        if isinstance(job_state, str):
+            job_state = [job_state]
+        return [code for code, state in enumerate(self.states) if state in job_state]
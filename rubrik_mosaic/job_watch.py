@@ -0,0 +1,184 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK JobWatcher and JobTransition classes.
+"""
+
+import threading
+from sys import intern
+
+from .exceptions import RubrikConnectionException
+from .records import Job
+
+# The states of a job that has finished, any other state (ex. job_scheduled) means the cluster is busy
+TERMINAL_STATES = frozenset(['job_successful', 'job_failed', 'job_aborted'])
+
+
+class JobTransition():
+    """A change in the state of a job, ex. from job_scheduled to job_failed.
+
+    Arguments:
+        job_id {str} -- The id of the job.
+        previous_state {str} -- The state of the job on the previous poll, None if the job was not listed before.
+        current_state {str} -- The state of the job now.
+        job {dict} -- The details of the job, a Job record when the connection was created with `records=True`.
+    """
+
+    __slots__ = ('job_id', 'previous_state', 'current_state', 'job')
+
+    def __init__(self, job_id, previous_state, current_state, job):
+        self.job_id = job_id
+        self.previous_state = previous_state
+        self.current_state = current_state
+        self.job = job
+
+    def __repr__(self):
+        return 'JobTransition({!r}, {!r} -> {!r})'.format(self.job_id, self.previous_state, self.current_state)
+
+
+class JobWatcher():
+    """Watch the jobs of a Rubrik Mosaic cluster for state changes. Each poll lists the jobs and compares the state of each
+    one to its state on the previous poll through an index of the job states keyed by job id, so only the jobs whose state
+    changed, and the jobs that were not listed before, are reported. The first poll only builds the index.
+
+    The poll interval adapts to the cluster: it drops to `min_interval` while any job is not in one of the
+    `terminal_states` or a job changed state, and is multiplied by `backoff` after each poll that finds the cluster idle, up
+    to `max_interval`.
+
+    Arguments:
+        mosaic {Connect} -- The connection to the Rubrik Mosaic cluster.
+
+    Keyword Arguments:
+        states {list} -- The states, or a single state, to report the transitions to. If a value is not provided every transition is reported. (default: {None})
+        min_interval {float} -- The number of seconds between polls while the cluster is busy. (default: {5})
+        max_interval {float} -- The maximum number of seconds between polls while the cluster is idle. (default: {300})
+        backoff {float} -- The factor the poll interval is multiplied by after each idle poll. (default: {2})
+        initial {bool} -- Flag to determine if the first poll reports every job, with a previous state of None, instead of only building the index. (default: {False})
+        terminal_states {list} -- The states of a job that has finished. (default: {TERMINAL_STATES})
+    """
+
+    def __init__(self, mosaic, states=None, min_interval=5, max_interval=300, backoff=2, initial=False, terminal_states=TERMINAL_STATES):
+        self.mosaic = mosaic
+        self.states = frozenset([states] if isinstance(states, str) else states) if states is not None else None
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.initial = initial
+        self.terminal_states = frozenset(terminal_states)
+        self.interval = min_interval
+        self.index = None
+        self.polls = 0
+        self.errors = 0
+        self._stopped = threading.Event()
+
+    def _begin(self):
+        """Internal method used to start a poll."""
+        self._next = {}
+        self._transitions = []
+        self._changed = 0
+        self._busy = 0
+
+    def _add(self, job):
+        """Internal method used to compare a listed job to its state on the previous poll."""
+        job_id = job['_id']
+        state = job['current_state']
+        if type(state) is str:
+            # Every job in the same state shares a single string in the index
+            state = intern(state)
+        self._next[job_id] = state
+        if state not in self.terminal_states:
+            self._busy += 1
+        if self.index is None:
+            if not self.initial:
+                return
+            previous = None
+        else:
+            previous = self.index.get(job_id)
+            if previous == state:
+                return
+        self._changed += 1
+        if self.states is None or state in self.states:
+            self._transitions.append(JobTransition(job_id, previous, state, Job.from_dict(job) if self.mosaic.records else job))
+
+    def _finish(self):
+        """Internal method used to replace the index with the states of the poll and adapt the poll interval."""
+        self.index = self._next
+        self.polls += 1
+        if self._busy or self._changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        self.mosaic.log('JobWatcher - {} jobs, {} changed state, {} not finished, next poll in {} seconds', len(self.index), self._changed, self._busy, self.interval)
+        transitions = self._transitions
+        self._next = self._transitions = None
+        return transitions
+
+    def _failed(self, error):
+        """Internal method used to back off after a poll failed."""
+        self.errors += 1
+        self.interval = min(self.max_interval, self.interval * self.backoff)
+        self.mosaic.log('JobWatcher - Unable to list the jobs, next poll in {} seconds: {}', self.interval, error)
+
+    def poll(self):
+        """List the jobs once and get the state transitions since the previous poll.
+
+        Returns:
+            list -- A JobTransition for each job whose state changed since the previous poll, in the order the jobs were listed.
+        """
+        self._begin()
+        for job in self.mosaic._iter_jobs(None, False):
+            self._add(job)
+        return self._finish()
+
+    def watch(self, max_polls=None):
+        """Poll the jobs until `stop()` is called, waiting the adaptive poll interval between polls. A poll that fails with
+        a connection error is logged and retried after backing off.
+
+        Keyword Arguments:
+            max_polls {int} -- The number of polls after which to stop. If a value is not provided the jobs are watched until `stop()` is called. (default: {None})
+
+        Returns:
+            generator -- A JobTransition for each state change, as soon as the poll that found it completes.
+        """
+        self._stopped.clear()
+        polls = 0
+        while not self._stopped.is_set():
+            try:
+                transitions = self.poll()
+            except RubrikConnectionException as error:
+                self._failed(error)
+                transitions = []
+            for transition in transitions:
+                yield transition
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                return
+            self._stopped.wait(self.interval)
+
+    def run(self, callback, max_polls=None):
+        """Poll the jobs until `stop()` is called, or `callback` returns False, and call `callback` with each state change.
+
+        Arguments:
+            callback {function} -- The function called with each JobTransition. Return False to stop watching.
+
+        Keyword Arguments:
+            max_polls {int} -- The number of polls after which to stop. If a value is not provided the jobs are watched until `stop()` is called. (default: {None})
+        """
+        for transition in self.watch(max_polls):
+            if callback(transition) is False:
+                break
+
+    def stop(self):
+        """Stop watching the jobs. It can be called from a callback or another thread and interrupts the wait for the next poll."""
+        self._stopped.set()
@@ -0,0 +1,86 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the JSON backend used to decode the responses of the Rubrik Mosaic API.
+"""
+
+import json
+from importlib.util import find_spec
+
+
+def _orjson_loads(data):
+    """Internal function used to import orjson the first time a document is decoded with it rather than when the SDK is
+    imported. It replaces itself with `orjson.loads` once orjson is imported."""
+    global _loads
+    import orjson
+    BACKENDS['orjson'] = orjson.loads
+    if _loads is _orjson_loads:
+        _loads = orjson.loads
+    return orjson.loads(data)
+
+
+BACKENDS = {'json': json.loads}
+if find_spec('orjson') is not None:
+    BACKENDS['orjson'] = _orjson_loads
+
+_backend = 'orjson' if 'orjson' in BACKENDS else 'json'
+_loads = BACKENDS[_backend]
+
+
+def loads(data):
+    """Decode a JSON document with the current JSON backend.
+
+    Arguments:
+        data {bytes} -- The JSON document.
+
+    Returns:
+        object -- The decoded document.
+    """
+
+    try:
+        return _loads(data)
+    except ValueError:
+        if _loads is json.loads:
+            raise
+        # orjson rejects some documents the standard library accepts, ex. NaN and integers larger than 64 bits
+        return json.loads(data)
+
+
+def get_json_backend():
+    """Get the name of the JSON backend used to decode the responses of the Rubrik Mosaic API.
+
+    Returns:
+        str -- The name of the JSON backend, or `custom` if a function was provided to `set_json_backend()`.
+    """
+
+    return _backend
+
+
+def set_json_backend(backend):
+    """Set the JSON backend used to decode the responses of the Rubrik Mosaic API. `orjson` is used by default when it is
+    installed and the standard library `json` module otherwise.
+
+    Arguments:
+        backend {str} -- The name of the JSON backend (choices: {'json', 'orjson'}), or a function that decodes a bytes or str JSON document.
+    """
+
+    global _backend, _loads
+    if callable(backend):
+        _backend, _loads = 'custom', backend
+        return
+    if backend not in BACKENDS:
+        if backend == 'orjson':
+            raise ImportError("The orjson package is required to use the orjson JSON backend. Install it with `pip install rubrik_mosaic[orjson]`.")
+        raise ValueError("The backend argument must be one of: {}.".format(', '.join(sorted(BACKENDS))))
+    _backend, _loads = backend, BACKENDS[backend]
@@ -0,0 +1,41 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK debug logger.
+"""
+
+import logging
+
+# Print the log messages of the SDK to the console. The handler is added when the SDK is first used rather than when the
+# package is imported
+console_output_handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] -- %(message)s")
+console_output_handler.setFormatter(formatter)
+
+log = logging.getLogger('rubrik_mosaic')
+log.addHandler(console_output_handler)
+
+# The debug log messages have always been created under the name of the Connect module, keep it so existing logging
+# configuration still applies
+LOGGER = logging.getLogger('rubrik_mosaic.rubrik_mosaic')
+
+
+def debug_enabled():
+    """Determine if the debug log messages of the SDK will be emitted. Use it to skip building expensive log messages.
+
+    Returns:
+        bool -- True if debug logging is enabled.
+    """
+    return LOGGER.isEnabledFor(logging.DEBUG)
+
@@ -0,0 +1,248 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK MetricsRegistry class.
+"""
+
+import threading
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _endpoint_label(request_path):
+    """Internal function used to reduce the path of an API call to the endpoint it is recorded under. Only the first
+    segment of the path is kept so the per item endpoints (ex. /getstorestats/{store}) are recorded once."""
+    path = request_path.split('?', 1)[0]
+    if path.startswith('/datos/'):
+        path = path[len('/datos'):]
+    return '/' + path.lstrip('/').split('/', 1)[0]
+
+
+class _EndpointMetrics():
+    """Internal class used to hold the metrics of a single endpoint and HTTP method."""
+
+    __slots__ = ('buckets', 'count', 'sum', 'request_bytes', 'response_bytes', 'statuses', 'exceptions')
+
+    def __init__(self, bucket_count):
+        self.buckets = [0] * (bucket_count + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.statuses = {}
+        self.exceptions = {}
+
+
+class MetricsRegistry():
+    """An in-process registry of the metrics of the API calls made by the SDK: a latency histogram, the number of request and
+    response bytes, and the number of responses per status code and exceptions per type of each endpoint, along with the
+    number of logins. Recording a metric only takes a lock and a few additions so it can be left enabled in production.
+
+    Keyword Arguments:
+        buckets {tuple} -- The upper bounds, in seconds, of the buckets of the latency histograms. (default: {(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)})
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bucket_bounds = tuple(sorted(buckets))
+        self.logins = 0
+        self.login_failures = 0
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, method, endpoint):
+        """Internal method used to get the metrics of an endpoint, the lock must be held."""
+        key = (endpoint, method)
+        metrics = self._endpoints.get(key)
+        if metrics is None:
+            metrics = self._endpoints[key] = _EndpointMetrics(len(self.bucket_bounds))
+        return metrics
+
+    def observe_request(self, method, endpoint, status_code, latency, request_bytes=0, response_bytes=0):
+        """Record an API call the Rubrik Mosaic cluster responded to.
+
+        Arguments:
+            method {str} -- The HTTP Method of the API call.
+            endpoint {str} -- The endpoint of the API call (ex. /liststore).
+            status_code {int} -- The status code of the response.
+            latency {float} -- The number of seconds the API call took.
+
+        Keyword Arguments:
+            request_bytes {int} -- The size of the request body. (default: {0})
+            response_bytes {int} -- The size of the response body. (default: {0})
+        """
+
+        index = bisect_left(self.bucket_bounds, latency)
+        with self._lock:
+            metrics = self._endpoint(method, endpoint)
+            metrics.buckets[index] += 1
+            metrics.count += 1
+            metrics.sum += latency
+            metrics.request_bytes += request_bytes
+            metrics.response_bytes += response_bytes
+            metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+
+    def add_response_bytes(self, method, endpoint, response_bytes):
+        """Record the size of a response body that was streamed after the API call was recorded.
+
+        Arguments:
+            method {str} -- The HTTP Method of the API call.
+            endpoint {str} -- The endpoint of the API call (ex. /listjobs).
+            response_bytes {int} -- The number of bytes read.
+        """
+
+        with self._lock:
+            self._endpoint(method, endpoint).response_bytes += response_bytes
+
+    def count_exception(self, method, endpoint, exception):
+        """Record an API call that failed without a response.
+
+        Arguments:
+            method {str} -- The HTTP Method of the API call.
+            endpoint {str} -- The endpoint of the API call (ex. /liststore).
+            exception {Exception} -- The exception raised by the API call.
+        """
+
+        name = type(exception).__name__
+        with self._lock:
+            exceptions = self._endpoint(method, endpoint).exceptions
+            exceptions[name] = exceptions.get(name, 0) + 1
+
+    def count_login(self, success=True):
+        """Record a login to the Rubrik Mosaic cluster.
+
+        Keyword Arguments:
+            success {bool} -- Flag to determine if the login succeeded. (default: {True})
+        """
+
+        with self._lock:
+            if success:
+                self.logins += 1
+            else:
+                self.login_failures += 1
+
+    def snapshot(self, cache=None, coalescer=None):
+        """Get a copy of the current metrics.
+
+        Keyword Arguments:
+            cache {ResponseCache} -- The response cache whose statistics are included. (default: {None})
+            coalescer {RequestCoalescer} -- The request coalescer whose statistics are included. (default: {None})
+
+        Returns:
+            dict -- The metrics of each endpoint keyed by endpoint and HTTP method, the number of logins, the cache statistics and the coalescing statistics.
+        """
+
+        endpoints = {}
+        with self._lock:
+            for (endpoint, method), metrics in sorted(self._endpoints.items()):
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(self.bucket_bounds + (float('inf'),), metrics.buckets):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                endpoints.setdefault(endpoint, {})[method] = {
+                    'count': metrics.count,
+                    'latency_sum': metrics.sum,
+                    'latency_buckets': buckets,
+                    'request_bytes': metrics.request_bytes,
+                    'response_bytes': metrics.response_bytes,
+                    'status_codes': dict(metrics.statuses),
+                    'exceptions': dict(metrics.exceptions),
+                }
+            snapshot = {'endpoints': endpoints, 'logins': self.logins, 'login_failures': self.login_failures}
+        snapshot['cache'] = cache.stats() if cache is not None else None
+        snapshot['coalescing'] = coalescer.stats() if coalescer is not None else None
+        return snapshot
+
+    def prometheus(self, cache=None, coalescer=None):
+        """Get the current metrics in the Prometheus text exposition format.
+
+        Keyword Arguments:
+            cache {ResponseCache} -- The response cache whose statistics are included. (default: {None})
+            coalescer {RequestCoalescer} -- The request coalescer whose statistics are included. (default: {None})
+
+        Returns:
+            str -- The metrics in the Prometheus text exposition format.
+        """
+
+        snapshot = self.snapshot(cache, coalescer)
+        lines = [
+            '# HELP rubrik_mosaic_request_duration_seconds The duration of the API calls to the Rubrik Mosaic cluster.',
+            '# TYPE rubrik_mosaic_request_duration_seconds histogram',
+        ]
+        requests = []
+        for endpoint, methods in snapshot['endpoints'].items():
+            for method, metrics in methods.items():
+                requests.append((_labels(endpoint=endpoint, method=method), endpoint, method, metrics))
+        for labels, endpoint, method, metrics in requests:
+            for bound, count in metrics['latency_buckets'].items():
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append('rubrik_mosaic_request_duration_seconds_bucket{} {}'.format(_labels(endpoint=endpoint, method=method, le=le), count))
+            lines.append('rubrik_mosaic_request_duration_seconds_sum{} {}'.format(labels, repr(metrics['latency_sum'])))
+            lines.append('rubrik_mosaic_request_duration_seconds_count{} {}'.format(labels, metrics['count']))
+
+        lines.append('# HELP rubrik_mosaic_request_bytes_total The number of bytes sent in the bodies of the API calls.')
+        lines.append('# TYPE rubrik_mosaic_request_bytes_total counter')
+        for labels, endpoint, method, metrics in requests:
+            lines.append('rubrik_mosaic_request_bytes_total{} {}'.format(labels, metrics['request_bytes']))
+        lines.append('# HELP rubrik_mosaic_response_bytes_total The number of bytes received in the bodies of the responses.')
+        lines.append('# TYPE rubrik_mosaic_response_bytes_total counter')
+        for labels, endpoint, method, metrics in requests:
+            lines.append('rubrik_mosaic_response_bytes_total{} {}'.format(labels, metrics['response_bytes']))
+        lines.append('# HELP rubrik_mosaic_responses_total The number of responses by status code.')
+        lines.append('# TYPE rubrik_mosaic_responses_total counter')
+        for labels, endpoint, method, metrics in requests:
+            for status_code, count in sorted(metrics['status_codes'].items()):
+                lines.append('rubrik_mosaic_responses_total{} {}'.format(_labels(endpoint=endpoint, method=method, code=status_code), count))
+        lines.append('# HELP rubrik_mosaic_exceptions_total The number of API calls that failed without a response by exception type.')
+        lines.append('# TYPE rubrik_mosaic_exceptions_total counter')
+        for labels, endpoint, method, metrics in requests:
+            for exception, count in sorted(metrics['exceptions'].items()):
+                lines.append('rubrik_mosaic_exceptions_total{} {}'.format(_labels(endpoint=endpoint, method=method, exception=exception), count))
+
+        lines.append('# HELP rubrik_mosaic_logins_total The number of logins to the Rubrik Mosaic cluster.')
+        lines.append('# TYPE rubrik_mosaic_logins_total counter')
+        lines.append('rubrik_mosaic_logins_total {}'.format(snapshot['logins']))
+        lines.append('# HELP rubrik_mosaic_login_failures_total The number of logins to the Rubrik Mosaic cluster that failed.')
+        lines.append('# TYPE rubrik_mosaic_login_failures_total counter')
+        lines.append('rubrik_mosaic_login_failures_total {}'.format(snapshot['login_failures']))
+
+        if snapshot['cache'] is not None:
+            cache_stats = snapshot['cache']
+            lines.append('# HELP rubrik_mosaic_cache_hits_total The number of GET requests served from the response cache.')
+            lines.append('# TYPE rubrik_mosaic_cache_hits_total counter')
+            lines.append('rubrik_mosaic_cache_hits_total {}'.format(cache_stats['hits']))
+            lines.append('# HELP rubrik_mosaic_cache_misses_total The number of GET requests that were not in the response cache.')
+            lines.append('# TYPE rubrik_mosaic_cache_misses_total counter')
+            lines.append('rubrik_mosaic_cache_misses_total {}'.format(cache_stats['misses']))
+            lines.append('# HELP rubrik_mosaic_cache_hit_ratio The ratio of GET requests served from the response cache.')
+            lines.append('# TYPE rubrik_mosaic_cache_hit_ratio gauge')
+            lines.append('rubrik_mosaic_cache_hit_ratio {}'.format(repr(cache_stats['hit_rate'])))
+
+        if snapshot['coalescing'] is not None:
+            coalescing_stats = snapshot['coalescing']
+            lines.append('# HELP rubrik_mosaic_coalesced_requests_total The number of GET requests that shared an identical request already in flight.')
+            lines.append('# TYPE rubrik_mosaic_coalesced_requests_total counter')
+            lines.append('rubrik_mosaic_coalesced_requests_total {}'.format(coalescing_stats['coalesced']))
+            lines.append('# HELP rubrik_mosaic_in_flight_requests The number of GET requests currently in flight that concurrent callers can share.')
+            lines.append('# TYPE rubrik_mosaic_in_flight_requests gauge')
+            lines.append('rubrik_mosaic_in_flight_requests {}'.format(coalescing_stats['in_flight']))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels):
+    """Internal function used to format the labels of a Prometheus sample."""
+    return '{' + ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                          for name, value in sorted(labels.items())) + '}'
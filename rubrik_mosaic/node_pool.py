@@ -0,0 +1,159 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK NodePool class.
+"""
+
+import threading
+
+from .exceptions import CircuitOpenException
+from .retry import CircuitBreaker
+
+
+class NodePool():
+    """The nodes of a Rubrik Mosaic cluster that API calls are spread across. Each node has its own circuit breaker, so a
+    node that keeps failing is ejected from the pool and automatically re-admitted once a probe call to it succeeds.
+
+    Arguments:
+        nodes {list} -- The Hostname or IP Address of each node.
+
+    Keyword Arguments:
+        strategy {str} -- How a node is selected for each API call. `round_robin` uses each healthy node in turn and `least_latency` uses the healthy node with the lowest moving average response time. (default: {'round_robin'})
+        circuit_breaker {CircuitBreaker} -- The circuit breaker of the first node. Every other node uses a copy of it. If a value is not provided a single node is never ejected and multiple nodes use a `CircuitBreaker()` with the default settings. (default: {None})
+        latency_alpha {float} -- The weight of the latest response time in the exponentially weighted moving average of each node. (default: {0.3})
+    """
+
+    ROUND_ROBIN = 'round_robin'
+    LEAST_LATENCY = 'least_latency'
+
+    def __init__(self, nodes, strategy='round_robin', circuit_breaker=None, latency_alpha=0.3):
+        if not nodes:
+            raise ValueError("At least one Rubrik Mosaic node is required.")
+        if strategy not in (self.ROUND_ROBIN, self.LEAST_LATENCY):
+            raise ValueError("The strategy argument must be '{}' or '{}'.".format(self.ROUND_ROBIN, self.LEAST_LATENCY))
+        self.nodes = list(nodes)
+        self.strategy = strategy
+        self.latency_alpha = latency_alpha
+        if circuit_breaker is None and len(self.nodes) > 1:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breakers = {}
+        for node in self.nodes:
+            self.circuit_breakers[node] = circuit_breaker
+            if circuit_breaker is not None:
+                circuit_breaker = circuit_breaker.copy()
+        self.latency = dict.fromkeys(self.nodes)
+        self.requests = dict.fromkeys(self.nodes, 0)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _candidates(self):
+        """Internal method used to order the nodes by preference for the next API call."""
+        with self._lock:
+            if self.strategy == self.ROUND_ROBIN:
+                start = self._next
+                self._next = (self._next + 1) % len(self.nodes)
+                return self.nodes[start:] + self.nodes[:start]
+            latency = dict(self.latency)
+        # Nodes due a probe call and nodes without a response time yet are tried first so every node gets re-admitted and measured
+        probes = [node for node in self.nodes if self.circuit_breakers[node] is not None and self.circuit_breakers[node].state == CircuitBreaker.HALF_OPEN]
+        return probes + sorted((node for node in self.nodes if node not in probes), key=lambda node: -1 if latency[node] is None else latency[node])
+
+    def _allow(self, node):
+        """Internal method used to determine if an API call may be sent to the node and count it."""
+        circuit_breaker = self.circuit_breakers[node]
+        if circuit_breaker is None or circuit_breaker.allow():
+            with self._lock:
+                self.requests[node] += 1
+            return True
+        return False
+
+    def select(self):
+        """Select the node to send the next API call to. Every selection must be followed by `record_success()` or
+        `record_failure()` for the selected node.
+
+        Returns:
+            str -- The Hostname or IP Address of the selected node.
+        """
+
+        for node in self._candidates():
+            if self._allow(node):
+                return node
+        raise CircuitOpenException("The circuit breaker of every Rubrik Mosaic node is open after repeated failures.")
+
+    def failover(self, tried):
+        """Select a node that has not been tried yet to send an API call that failed on the `tried` nodes to. The selection
+        must be followed by `record_success()` or `record_failure()` for the selected node.
+
+        Arguments:
+            tried {set} -- The nodes the API call has already been sent to.
+
+        Returns:
+            str -- The Hostname or IP Address of the selected node, or None if every other node has been tried or is ejected.
+        """
+
+        for node in self._candidates():
+            if node not in tried and self._allow(node):
+                return node
+        return None
+
+    def record_success(self, node, latency):
+        """Record an API call the node responded to.
+
+        Arguments:
+            node {str} -- The node the API call was sent to.
+            latency {float} -- The number of seconds the node took to respond.
+        """
+
+        with self._lock:
+            average = self.latency[node]
+            self.latency[node] = latency if average is None else average + self.latency_alpha * (latency - average)
+        if self.circuit_breakers[node] is not None:
+            self.circuit_breakers[node].record_success()
+
+    def record_failure(self, node):
+        """Record an API call that failed with a connection error, a timeout or a server error.
+
+        Arguments:
+            node {str} -- The node the API call was sent to.
+        """
+
+        if self.circuit_breakers[node] is not None:
+            self.circuit_breakers[node].record_failure()
+
+    def release(self, node):
+        """Record an API call to the node that ended without a response or a failure of the node, ex. because it was interrupted.
+
+        Arguments:
+            node {str} -- The node the API call was sent to.
+        """
+
+        if self.circuit_breakers[node] is not None:
+            self.circuit_breakers[node].release()
+
+    def stats(self):
+        """Get the current state of each node.
+
+        Returns:
+            dict -- The circuit breaker state, moving average response time and number of API calls of each node, keyed by node.
+        """
+
+        nodes = {}
+        for node in self.nodes:
+            circuit_breaker = self.circuit_breakers[node]
+            nodes[node] = {
+                'state': CircuitBreaker.CLOSED if circuit_breaker is None else circuit_breaker.state,
+                'latency': self.latency[node],
+                'requests': self.requests[node],
+            }
+        return nodes
@@ -0,0 +1,216 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK Job, Policy, SourceStats and StoreStats record classes.
+"""
+
+import json
+from sys import intern
+
+from .json_backend import loads
+
+# The names of the fields a record does not have a slot for, shared by every record with the same fields
+_KEYS = {}
+
+
+class Record():
+    """The base class of the compact records the reporting functions return when a connection is created with
+    `records=True`. The common fields of a record are stored in slots and any other field of the API response is kept in a
+    tuple whose field names are shared by every record with the same fields, so a record uses a fraction of the memory of
+    the dict it replaces. Fields are read as attributes (ex. job.end_time) or, like a dict, by key (ex. job['end_time']).
+    """
+
+    __slots__ = ('_keys', '_values')
+
+    fields = ()
+    interned = ()
+
+    @classmethod
+    def from_dict(cls, data, **defaults):
+        """Create a record from a dict returned by the Rubrik Mosaic API.
+
+        Arguments:
+            data {dict} -- The fields of the record.
+
+        Keyword Arguments:
+            defaults {dict} -- Values of the slot fields to use when they are not in `data`.
+
+        Returns:
+            Record -- The new record.
+        """
+
+        record = cls.__new__(cls)
+        fields = cls.fields
+        interned = cls.interned
+        keys = []
+        values = []
+        for key, value in data.items():
+            if key in fields:
+                if key in interned and type(value) is str:
+                    value = intern(value)
+                setattr(record, key, value)
+            else:
+                keys.append(key)
+                values.append(value)
+        for key, value in defaults.items():
+            if key not in data:
+                setattr(record, key, value)
+        keys = tuple(keys)
+        record._keys = _KEYS.setdefault(keys, keys)
+        record._values = tuple(values)
+        return record
+
+    def __getitem__(self, key):
+        if key in self.fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        """Get the value of a field.
+
+        Arguments:
+            key {str} -- The name of the field.
+
+        Keyword Arguments:
+            default {object} -- The value returned when the record does not have the field. (default: {None})
+
+        Returns:
+            object -- The value of the field.
+        """
+
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        """Convert the record back to the dict it was created from.
+
+        Returns:
+            dict -- The fields of the record.
+        """
+
+        data = {}
+        for key in self.__slots__:
+            try:
+                data[key] = getattr(self, key)
+            except AttributeError:
+                pass
+        data.update(zip(self._keys, self._values))
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.to_dict())
+
+
+class Job(Record):
+    """A job of the Rubrik Mosaic cluster. The job states are interned so every job in the same state shares a single string.
+    """
+
+    __slots__ = ('_id', 'current_state', 'start_time', 'end_time')
+
+    fields = frozenset(__slots__)
+    interned = frozenset(['current_state'])
+
+
+class Policy(Record):
+    """A backup policy of the Rubrik Mosaic cluster. The `sys_p_doc` policy document is kept as compact JSON, which uses a
+    fraction of the memory of the decoded document, and is only decoded when it is accessed. Each access returns a new copy
+    of the document, so read it once rather than once per field.
+    """
+
+    __slots__ = ('_id', '_sys_p_doc', 'physical_size', 'version_count')
+
+    fields = frozenset(['_id', 'sys_p_doc', 'physical_size', 'version_count'])
+
+    @property
+    def sys_p_doc(self):
+        """The policy document."""
+        return loads(self._sys_p_doc)
+
+    @sys_p_doc.setter
+    def sys_p_doc(self, value):
+        self._sys_p_doc = json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+    @property
+    def policy_group_name(self):
+        """The name of the policy."""
+        return self.sys_p_doc['policy_group_name']
+
+    @property
+    def source_mgmt_obj(self):
+        """The object, or list of objects, protected by the policy."""
+        return self.sys_p_doc['source_mgmt_obj']
+
+    @property
+    def policy_disabled(self):
+        """Flag that determines if the policy is disabled."""
+        return self.sys_p_doc['policy_disabled']
+
+    def to_dict(self):
+        data = {}
+        for key, value in super().to_dict().items():
+            if key == '_sys_p_doc':
+                key, value = 'sys_p_doc', loads(value)
+            data[key] = value
+        return data
+
+
+class SourceStats(Record):
+    """The statistics of a data source of the Rubrik Mosaic cluster."""
+
+    __slots__ = ('source_name', 'db_stats')
+
+    fields = frozenset(__slots__)
+
+    @property
+    def status(self):
+        """Flag that determines if the data source is enabled."""
+        return self.db_stats['status']
+
+    @property
+    def licensed_size(self):
+        """The capacity of the data source under protection in MB."""
+        return int(self.db_stats['licensed_size'])
+
+
+class StoreStats(Record):
+    """The statistics of a backup store of the Rubrik Mosaic cluster. The `store_name` field is set to the name of the store
+    the statistics were requested for."""
+
+    __slots__ = ('store_name',)
+
+    fields = frozenset(__slots__)
@@ -15,178 +15,576 @@
 This module contains the Rubrik Mosaic SDK Reporting class.
 """
 
-import requests
-import os
-import logging
 import datetime
-from copy import deepcopy
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from .api import Api
+from .logger import LOGGER, debug_enabled
+from .records import Job, Policy, SourceStats, StoreStats
+from .tracing import NULL_SPAN, traced
 from .exceptions import RubrikConnectionException, InvalidAPIEndPointException, MissingCredentialException
 
 
+class ReportList(list):
+    """A list of jobs, policies or statistics returned by a reporting function that can be exported to a pandas DataFrame or
+    an Arrow Table.
+    """
+
+    def to_dataframe(self, columns=None):
+        """Convert the items of the list to a pandas DataFrame. Nested fields are flattened into typed columns named by their
+        dotted path (ex. sys_p_doc.policy_group_name). The `pandas` package must be installed.
+
+        Keyword Arguments:
+            columns {list} -- The flattened names of the columns to include. If a value is not provided every field found in the items is included. (default: {None})
+
+        Returns:
+            pandas.DataFrame -- One row per item and one column per field.
+        """
+        from .columnar import to_dataframe
+        return to_dataframe(self, columns)
+
+    def to_arrow(self, columns=None):
+        """Convert the items of the list to an Arrow Table. Nested fields are flattened into typed columns named by their
+        dotted path (ex. db_stats.licensed_size). The `pyarrow` package must be installed.
+
+        Keyword Arguments:
+            columns {list} -- The flattened names of the columns to include. If a value is not provided every field found in the items is included. (default: {None})
+
+        Returns:
+            pyarrow.Table -- One row per item and one column per field.
+        """
+        from .columnar import to_arrow
+        return to_arrow(self, columns)
+
+
+class StatsList(ReportList):
+    """A list of statistics collected from Rubrik Mosaic along with the errors raised while collecting them when they were
+    collected with `collect_errors=True`. It can be exported with `to_dataframe()` or `to_arrow()`.
+
+    Keyword Arguments:
+        errors {dict} -- The exception raised for each item whose statistics could not be collected, keyed by the item name.
+    """
+
+    def __init__(self, iterable=(), errors=None):
+        super().__init__(iterable)
+        self.errors = errors if errors is not None else {}
+
+
+def _stats_list(api_endpoint, names, results, log, record=None, name_field=None):
+    """Internal function used to build a StatsList from the `(data, error)` result of the API call made for each item name.
+    When a `record` class is provided each item is converted to it with its name stored in `name_field`."""
+    statslist = StatsList()
+    for name, (data, error) in zip(names, results):
+        if error is None:
+            statslist.append(data if record is None else record.from_dict(data, **{name_field: name}))
+        else:
+            log('_get_each - Unable to get {}: {}', api_endpoint.format(name), error)
+            statslist.errors[name] = error
+    return statslist
+
+
+def _log_policies(policies, log):
+    """Internal function used to log each backup policy returned by Rubrik Mosaic."""
+    if not debug_enabled():
+        return
+    for policy in policies:
+        sys_p_doc = policy['sys_p_doc']
+        log('get_policies - Found the following policy: {} - {}', sys_p_doc['policy_group_name'], sys_p_doc['source_mgmt_obj'])
+
+
+def _count_job_state(job, counters):
+    """Internal function used to increment the number of jobs in the state of `job`."""
+    state = job['current_state']
+    counters[state] = counters.get(state, 0) + 1
+
+
+def _log_job_states(counters, log):
+    """Internal function used to log the number of jobs in each state."""
+    log('get_jobs - Found {} jobs. Job Summary - Scheduled: {} | Failed: {} | Successful: {} | Aborted: {}', sum(counters.values()), counters.get("job_scheduled", 0), counters.get("job_failed", 0), counters.get("job_successful", 0), counters.get("job_aborted", 0))
+
+
+class _JobSummary():
+    """Internal class used to collect the jobs in `job_state` that ended within the last `num_hours` hours. A list of states
+    and a list of hours may be provided to collect several states and time windows in a single pass over the jobs."""
+
+    def __init__(self, job_state, num_hours, log, record=None):
+        log('get_job_summary - Attepting to find \'{}\' jobs within the last {} hours', job_state, num_hours)
+        self.log = log
+        # Only the matching jobs are converted to records
+        self.record = record
+        self.debug = debug_enabled()
+        # A str keeps the original substring match, any other collection of states is matched by membership
+        self.job_state = job_state if isinstance(job_state, str) else frozenset(job_state)
+        self.multiple = isinstance(num_hours, (list, tuple))
+        self.windows = list(num_hours) if self.multiple else [num_hours]
+        currenttime = time.time()
+        self.cutoffs = [currenttime - hours * 3600 for hours in self.windows]
+        self.oldest = min(self.cutoffs)
+        self.matches = [ReportList() for _ in self.windows]
+
+    def add(self, job):
+        if type(job) is Job:
+            end_time, current_state = job.end_time, job.current_state
+        else:
+            end_time, current_state = job['end_time'], job['current_state']
+        if current_state in self.job_state and end_time >= self.oldest:
+            if self.debug:
+                starttime = datetime.datetime.fromtimestamp(job['start_time'])
+                endtime = datetime.datetime.fromtimestamp(end_time)
+                self.log('get_job_summary - Found match! job id: {} | start time: {} | end time: {} | status: {}', job['_id'], starttime.strftime("%m-%d-%Y %H:%M:%S"), endtime.strftime("%m-%d-%Y %H:%M:%S"), job['current_state'])
+            if self.record is not None and type(job) is not self.record:
+                job = self.record.from_dict(job)
+            for matches, cutoff in zip(self.matches, self.cutoffs):
+                if end_time >= cutoff:
+                    matches.append(job)
+
+    def extend(self, jobs):
+        for job in jobs:
+            self.add(job)
+        return self
+
+    def result(self):
+        if self.multiple:
+            return dict(zip(self.windows, self.matches))
+        return self.matches[0]
+
+
+def _policy_object_count(policy):
+    """Internal function used to count the objects protected by a single backup policy."""
+    # Read the policy document once, a Policy record decodes it on each access
+    sys_p_doc = policy['sys_p_doc']
+    #verify we only have on object in our policy and not a list of objects, if so increment
+    #this should always be the case currently, trying to futureproof this module
+    if isinstance(sys_p_doc['source_mgmt_obj'], str) and sys_p_doc['policy_disabled'] == False:
+        return 1
+    #if we have a list of objects in our policy, increment the object count by the number of protected objects
+    #this should not be the case currently, trying to futureproof this module
+    elif isinstance(sys_p_doc['source_mgmt_obj'], list) and sys_p_doc['policy_disabled'] == False:
+        return len(sys_p_doc['source_mgmt_obj'])
+    #skip disabled policies
+    elif (isinstance(sys_p_doc['source_mgmt_obj'], str) or isinstance(sys_p_doc['source_mgmt_obj'], list)) and sys_p_doc['policy_disabled'] == True:
+        return 0
+    #something went wrong, raise an error
+    else:
+        raise ValueError("get_protected_object_count - invalid source_mgmt_obj value in policy document {}".format(sys_p_doc['policy_group_name']))
+
+
+def _protected_object_count(policies):
+    """Internal function used to count the objects protected by the enabled backup policies."""
+    objectcount = 0
+    for policy in policies:
+        objectcount+=_policy_object_count(policy)
+    return objectcount
+
+
+def _size_under_protection(sources, log):
+    """Internal function used to total the licensed size of the enabled data sources."""
+    sizeunderprotection = 0
+    debug = debug_enabled()
+    log('get_size_under_protection - Calculating capacity under protection')
+    for source in sources:
+        if source['db_stats']['status'] == True:
+            if debug:
+                log('get_size_under_protection - source {} has {} MB under protection', source['source_name'], source['db_stats']['licensed_size'])
+            sizeunderprotection+=int(source['db_stats']['licensed_size'])
+        #skip disabled policies
+        elif source['db_stats']['status'] != True:
+            if debug:
+                log('get_size_under_protection - source {} has a status of {}, skipping it', source['source_name'], source['db_stats']['status'])
+            pass
+    return sizeunderprotection
+
+
+def _secondary_storage_consumed(policies, log):
+    """Internal function used to total the physical size of the backup policies."""
+    secondarystorageconsumed = 0
+    debug = debug_enabled()
+    for policy in policies:
+        if debug:
+            sys_p_doc = policy['sys_p_doc']
+            log('get_secondary_storage_consumed - {} - {} is storing {} MB of data', sys_p_doc['policy_group_name'], sys_p_doc['source_mgmt_obj'], policy['physical_size'])
+        secondarystorageconsumed+=int(policy['physical_size'])
+    return secondarystorageconsumed
+
+
+def _backup_count(policies, log):
+    """Internal function used to total the number of versions stored by the backup policies."""
+    backupcount = 0
+    debug = debug_enabled()
+    for policy in policies:
+        if debug:
+            sys_p_doc = policy['sys_p_doc']
+            log('get_backup_count - {} - {} has {} versions', sys_p_doc['policy_group_name'], sys_p_doc['source_mgmt_obj'], policy['version_count'])
+        backupcount+=int(policy['version_count'])
+    return backupcount
+
+
+class ClusterSnapshot():
+    """A point in time snapshot of the Rubrik Mosaic cluster. All of the aggregates returned by the reporting functions are
+    computed from the same data, with a single pass over the policies.
+
+    When the stats were collected with `collect_errors=True` the stores and sources whose stats could not be collected are
+    listed in the `errors` attribute, keyed by 'store_stats' or 'source_stats', and a warning is logged since the
+    `size_under_protection` only includes the sources that were collected.
+
+    Arguments:
+        policies {list} -- The details of each backup policy in the Rubrik Mosaic cluster.
+        store_stats {list} -- The statistics for each backup store in the Rubrik Mosaic cluster.
+        source_stats {list} -- The statistics for each data source in the Rubrik Mosaic cluster.
+        jobs {list} -- The details of each job in the Rubrik Mosaic cluster.
+        job_state_counts {dict} -- The number of jobs in each state.
+        log {function} -- The function used to create debug log messages.
+    """
+
+    def __init__(self, policies, store_stats, source_stats, jobs, job_state_counts, log):
+        self.created = time.time()
+        self.policies = policies
+        self.store_stats = store_stats
+        self.source_stats = source_stats
+        self.jobs = jobs
+        self.job_state_counts = job_state_counts
+        self._log = log
+        self._job_table = None
+
+        self.protected_object_count = 0
+        self.secondary_storage_consumed = 0
+        self.backup_count = 0
+        for policy in policies:
+            self.protected_object_count+=_policy_object_count(policy)
+            self.secondary_storage_consumed+=int(policy['physical_size'])
+            self.backup_count+=int(policy['version_count'])
+        log('snapshot - {} policies protect {} objects with {} backups consuming {} MB', len(policies), self.protected_object_count, self.backup_count, self.secondary_storage_consumed)
+
+        self.size_under_protection = _size_under_protection(source_stats, log)
+
+        self.errors = {}
+        for name, stats in (('store_stats', store_stats), ('source_stats', source_stats)):
+            if getattr(stats, 'errors', None):
+                self.errors[name] = stats.errors
+        if self.errors:
+            LOGGER.warning('snapshot - The stats of {} stores and {} sources could not be collected, the snapshot is incomplete: {}'.format(
+                len(self.errors.get('store_stats', ())), len(self.errors.get('source_stats', ())),
+                ', '.join('{} ({})'.format(item, error) for errors in self.errors.values() for item, error in errors.items())))
+
+    @property
+    def job_table(self):
+        """The jobs of the snapshot as a JobTable, built the first time it is used."""
+        if self._job_table is None:
+            from .job_table import JobTable
+            self._job_table = JobTable.from_jobs(self.jobs, keep_jobs=True)
+        return self._job_table
+
+    def get_job_summary(self, job_state, num_hours):
+        """Get a list of the jobs in the snapshot that are in `job_state` and ended within the last `num_hours` hours.
+
+        Arguments:
+            job_state {str} -- The current state of the job as a string, or a list of states
+            num_hours {int} -- The number of hours to go back in the job history, or a list of hours
+
+        Returns:
+            list -- A list that contains the details of each matching job. When a list of hours is provided a dict that contains the list of jobs for each number of hours is returned instead.
+        """
+        return _JobSummary(job_state, num_hours, self._log).extend(self.jobs).result()
+
+
 class Reporting(Api):
-    def get_store_stats(self):
+    def _get_each(self, api_endpoint, names, max_workers=None, record=None, name_field=None, collect_errors=False):
+        """Internal method used to send a GET request for each item name and collect the responses in the same order as the names.
+
+        Arguments:
+            api_endpoint {str} -- The endpoint of the Rubrik Mosaic API to call with a `{}` placeholder for the item name (ex. /getstorestats/{}).
+            names {list} -- The names of the items to get.
+
+        Keyword Arguments:
+            max_workers {int} -- The maximum number of API calls to run in parallel. If a value is not provided the `max_workers` value of the connection is used. (default: {None})
+            record {class} -- The record class each item is converted to when the connection was created with `records=True`. (default: {None})
+            name_field {str} -- The field of the record the item name is stored in. (default: {None})
+            collect_errors {bool} -- Flag to determine if the items that fail are skipped, with their exception stored in the `errors` dict, instead of raising the exception. (default: {False})
+
+        Returns:
+            StatsList -- The `data` of each successful API call.
+        """
+
+        if max_workers is None:
+            max_workers = self.max_workers
+
+        # The API calls made by the worker threads are recorded under the span of the calling thread
+        parent = None if self.tracer is None else self.tracer.current()
+
+        def get_data(name):
+            try:
+                with NULL_SPAN if parent is None else self.tracer.activate(parent):
+                    return self.get(api_endpoint.format(name))['data'], None
+            except Exception as error:
+                if not collect_errors:
+                    raise
+                return None, error
+
+        if max_workers > 1 and len(names) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as executor:
+                results = list(executor.map(get_data, names))
+        else:
+            results = [get_data(name) for name in names]
+
+        return _stats_list(api_endpoint, names, results, self.log, record if self.records else None, name_field)
+
+    @traced
+    def get_store_stats(self, max_workers=None, collect_errors=False):
         """Get a list of all the backup store stats from Rubrik Mosaic.
 
+        Keyword Arguments:
+            max_workers {int} -- The maximum number of stores to get the stats of in parallel. If a value is not provided the `max_workers` value of the connection is used. (default: {None})
+            collect_errors {bool} -- Flag to determine if the stores whose stats could not be collected are skipped, and listed in the `errors` attribute of the returned list, instead of raising the exception. (default: {False})
+
         Returns:
             list -- A list that contains the statistics for each backup store in the Rubrik Mosaic cluster.
         """
         stores = []
         for store in self.get("/liststore")['data']:
             stores.append(store['store_name'])
-        for store in stores:
-            self.log('get_store_stats - Found the following store: {}'.format(store))
-        storestatslist = []
-        for store in stores:
-            self.log('get_store_stats - Getting store stats for store: {}'.format(store))
-            storestats = self.get("/getstorestats/{}".format(store))['data']
-            storestatslist.append(deepcopy(storestats))
-        return storestatslist
-
-    def get_source_stats(self):
+        if debug_enabled():
+            for store in stores:
+                self.log('get_store_stats - Found the following store: {}', store)
+        self.log('get_store_stats - Getting store stats for {} stores', len(stores))
+        return self._get_each("/getstorestats/{}", stores, max_workers, StoreStats, 'store_name', collect_errors)
+
+    @traced
+    def get_source_stats(self, max_workers=None, collect_errors=False):
         """Get a list of all the data source stats from Rubrik Mosaic.
 
+        Keyword Arguments:
+            max_workers {int} -- The maximum number of sources to get the stats of in parallel. If a value is not provided the `max_workers` value of the connection is used. (default: {None})
+            collect_errors {bool} -- Flag to determine if the sources whose stats could not be collected are skipped, and listed in the `errors` attribute of the returned list, instead of raising the exception. (default: {False})
+
         Returns:
             list -- A list that contains the statistics for each data source in the Rubrik Mosaic cluster.
         """
         sources = []
         for source in self.get("/listsource")['data']:
             sources.append(source['source_name'])
-        for source in sources:
-            self.log('get_source_stats - Found the following source: {}'.format(source))
-        sourcestatslist = []
-        for source in sources:
-            self.log('get_source_stats - Getting store stats for source: {}'.format(source))
-            sourcestats = self.get("/getsourcestats/{}".format(source))['data']
-            sourcestatslist.append(deepcopy(sourcestats))
-        return sourcestatslist
+        if debug_enabled():
+            for source in sources:
+                self.log('get_source_stats - Found the following source: {}', source)
+        self.log('get_source_stats - Getting source stats for {} sources', len(sources))
+        return self._get_each("/getsourcestats/{}", sources, max_workers, SourceStats, 'source_name', collect_errors)
 
+    @traced
     def get_policies(self):
         """Get a list of all the backup policy documents from Rubrik Mosaic.
 
         Returns:
-            list -- A list that contains the details of each backup policy in the Rubrik Mosaic cluster.
+            list -- A list that contains the details of each backup policy in the Rubrik Mosaic cluster. It can be exported with `to_dataframe()` or `to_arrow()`.
         """
-        policylist = []
-        for policy in self.get("/listpolicy")['data']:
-            policylist.append(policy)
-            self.log('get_policies - Found the following policy: {} - {}'.format(policy['sys_p_doc']['policy_group_name'], policy['sys_p_doc']['source_mgmt_obj']))
-        return policylist
+        policylist = self.get("/listpolicy")['data']
+        _log_policies(policylist, self.log)
+        if self.records:
+            return ReportList(Policy.from_dict(policy) for policy in policylist)
+        return ReportList(policylist)
 
+    def iter_jobs(self, counters=None):
+        """Iterate over the jobs of the Rubrik Mosaic cluster as they are received, without loading the full job list into memory.
+
+        Keyword Arguments:
+            counters {dict} -- An optional dict that is updated with the number of jobs in each state as the jobs are read. (default: {None})
+
+        Returns:
+            generator -- The details of each job in the Rubrik Mosaic cluster.
+        """
+        return self._iter_jobs(counters, self.records)
+
+    def _iter_jobs(self, counters, records):
+        """Internal method used to iterate over the jobs of the Rubrik Mosaic cluster as they are received.
+
+        Arguments:
+            counters {dict} -- An optional dict that is updated with the number of jobs in each state as the jobs are read.
+            records {bool} -- Flag to determine if each job is converted to a Job record instead of being returned as a dict.
+
+        Returns:
+            generator -- The details of each job in the Rubrik Mosaic cluster.
+        """
+        for job in self._stream_api("/listjobs"):
+            if counters is not None:
+                _count_job_state(job, counters)
+            # The dict of each job is released as soon as it is converted so only the compact records are kept
+            yield Job.from_dict(job) if records else job
+
+    def watch_jobs(self, states=None, min_interval=5, max_interval=300, backoff=2, callback=None, max_polls=None, initial=False):
+        """Watch the jobs of the Rubrik Mosaic cluster and report only the jobs that change state, ex. from job_scheduled to
+        job_failed, instead of listing every job again. The first poll only records the state of each job. The poll interval
+        drops to `min_interval` while jobs are running and backs off to `max_interval` while the cluster is idle. A poll that
+        fails with a connection error is logged and retried after backing off.
+
+        Keyword Arguments:
+            states {list} -- The states, or a single state, to report the transitions to (ex. job_failed). If a value is not provided every transition is reported. (default: {None})
+            min_interval {float} -- The number of seconds between polls while jobs are running. (default: {5})
+            max_interval {float} -- The maximum number of seconds between polls while the cluster is idle. (default: {300})
+            backoff {float} -- The factor the poll interval is multiplied by after each idle poll. (default: {2})
+            callback {function} -- A function called with each JobTransition. When a callback is provided the jobs are watched until the callback returns False, or `max_polls` is reached, before returning. (default: {None})
+            max_polls {int} -- The number of polls after which to stop. If a value is not provided the jobs are watched indefinitely. (default: {None})
+            initial {bool} -- Flag to determine if the first poll reports every job, with a previous state of None. (default: {False})
+
+        Returns:
+            generator -- A JobTransition, with the job_id, previous_state, current_state and job details, for each state change. When a callback is provided the JobWatcher is returned instead once watching stops.
+        """
+        from .job_watch import JobWatcher
+        watcher = JobWatcher(self, states, min_interval, max_interval, backoff, initial)
+        if callback is None:
+            return watcher.watch(max_polls)
+        watcher.run(callback, max_polls)
+        return watcher
+
+    @traced
     def get_jobs(self):
         """Get a list of all the jobs from the Rubrik Mosaic cluster.
 
         Returns:
-            list -- A list that contains the details of each job in the Rubrik Mosaic cluster.
-        """
-        joblist = []
-        scheduled = 0
-        failed = 0
-        successful = 0
-        aborted = 0
-        for job in self.get("/listjobs")['data']:
-            joblist.append(job)
-            if job['current_state'] == "job_scheduled":
-                scheduled+=1
-            elif job['current_state'] == "job_failed":
-                failed+=1
-            elif job['current_state'] == "job_successful":
-                successful+=1
-            elif job['current_state'] == "job_aborted":
-                aborted+=1
-        self.log('get_jobs - Found {} jobs. Job Summary - Scheduled: {} | Failed: {} | Successful: {} | Aborted: {}'.format(len(joblist), scheduled, failed, successful, aborted))
+            list -- A list that contains the details of each job in the Rubrik Mosaic cluster. It can be exported with `to_dataframe()` or `to_arrow()`.
+        """
+        counters = {}
+        joblist = ReportList(self.iter_jobs(counters))
+        _log_job_states(counters, self.log)
         return joblist
 
+    @traced
     def get_job_summary(self, job_state, num_hours):
         """Get a list of all the jobs from the Rubrik Mosaic cluster.
 
         Arguments:
-            job_state {str} -- The current state of the job as a string
-            num_hours {int} -- The number of hours to go back in the job history
+            job_state {str} -- The current state of the job as a string, or a list of states
+            num_hours {int} -- The number of hours to go back in the job history, or a list of hours
 
         Returns:
-            list -- A list that contains the details of each job in the Rubrik Mosaic cluster.
+            list -- A list that contains the details of each job in the Rubrik Mosaic cluster. When a list of hours is provided a dict that contains the list of jobs for each number of hours is returned instead.
         """
-        jobs = self.get_jobs()
-        self.log('get_job_summary - Attepting to find \'{}\' jobs within the last {} hours'.format(job_state, num_hours))
-        joblist = []
-        hourdiff = datetime.timedelta(hours=num_hours)
-        currenttime = datetime.datetime.now()
-        for job in jobs:
-            endtime = datetime.datetime.fromtimestamp(job['end_time'])
-            if job['current_state'] in job_state and ((currenttime-endtime)<=hourdiff):
-                joblist.append(job)
-                starttime = datetime.datetime.fromtimestamp(job['start_time'])
-                self.log('get_job_summary - Found match! job id: {} | start time: {} | end time: {} | status: {}'.format(job['_id'], starttime.strftime("%m-%d-%Y %H:%M:%S"), endtime.strftime("%m-%d-%Y %H:%M:%S"), job['current_state']))
+        counters = {}
+        joblist = _JobSummary(job_state, num_hours, self.log, Job if self.records else None).extend(self._iter_jobs(counters, False)).result()
+        _log_job_states(counters, self.log)
         return joblist
 
+    @traced
+    def get_job_table(self, keep_jobs=False):
+        """Get a columnar table of all the jobs from the Rubrik Mosaic cluster that answers time window, state and duration
+        queries with vectorized NumPy operations. The `numpy` package must be installed.
+
+        Keyword Arguments:
+            keep_jobs {bool} -- Flag to determine if the details of each job are kept in the table in addition to its columns. (default: {False})
+
+        Returns:
+            JobTable -- The ids, start times, end times and states of the jobs in the Rubrik Mosaic cluster.
+        """
+        # numpy takes longer to import than the rest of the SDK, only import it for the scripts that use a JobTable
+        from .job_table import JobTable
+        counters = {}
+        jobtable = JobTable.from_jobs(self._iter_jobs(counters, self.records and keep_jobs), keep_jobs)
+        _log_job_states(counters, self.log)
+        return jobtable
+
+    @traced
+    def export_jobs(self, path, format='ndjson', compression=None, chunk_size=10000, columns=None, resume=False):
+        """Export all the jobs from the Rubrik Mosaic cluster to a NDJSON, CSV or Parquet file as they are received, holding
+        only `chunk_size` jobs in memory at a time. An interrupted export can be resumed with `resume=True`. The `pyarrow`
+        package must be installed to export to Parquet, which is written to a directory with one part file per chunk.
+
+        Arguments:
+            path {str} -- The path of the file, or directory for Parquet, to write.
+
+        Keyword Arguments:
+            format {str} -- The format of the export. (choices: {'ndjson', 'csv', 'parquet'}) (default: {'ndjson'})
+            compression {str} -- The compression of a NDJSON or CSV file ('gzip', 'bz2' or 'xz') or the compression codec of the Parquet files (ex. 'snappy' or 'zstd'). (default: {None})
+            chunk_size {int} -- The number of jobs written at a time. (default: {10000})
+            columns {list} -- The flattened names of the columns of a CSV or Parquet export. If a value is not provided the fields of the first chunk of jobs are used. (default: {None})
+            resume {bool} -- Flag to determine if an interrupted export to the same path is resumed instead of starting over. (default: {False})
+
+        Returns:
+            int -- The number of jobs exported.
+        """
+        # The export modules are only imported by the scripts that export, not by every script that imports the SDK
+        from .bulk_export import BulkExporter
+        exporter = BulkExporter(path, format, compression, chunk_size, columns, resume, '_id', self.log)
+        counters = {}
+        total = exporter.write(self._iter_jobs(counters, False))
+        _log_job_states(counters, self.log)
+        return total
+
+    @traced
+    def export_policies(self, path, format='ndjson', compression=None, chunk_size=10000, columns=None, resume=False):
+        """Export all the backup policy documents from Rubrik Mosaic to a NDJSON, CSV or Parquet file as they are received,
+        holding only `chunk_size` policies in memory at a time. An interrupted export can be resumed with `resume=True`. The `pyarrow` package must be
+        installed to export to Parquet, which is written to a directory with one part file per chunk.
+
+        Arguments:
+            path {str} -- The path of the file, or directory for Parquet, to write.
+
+        Keyword Arguments:
+            format {str} -- The format of the export. (choices: {'ndjson', 'csv', 'parquet'}) (default: {'ndjson'})
+            compression {str} -- The compression of a NDJSON or CSV file ('gzip', 'bz2' or 'xz') or the compression codec of the Parquet files (ex. 'snappy' or 'zstd'). (default: {None})
+            chunk_size {int} -- The number of policies written at a time. (default: {10000})
+            columns {list} -- The flattened names of the columns of a CSV or Parquet export. If a value is not provided the fields of the first chunk of policies are used. (default: {None})
+            resume {bool} -- Flag to determine if an interrupted export to the same path is resumed instead of starting over. (default: {False})
+
+        Returns:
+            int -- The number of policies exported.
+        """
+        from .bulk_export import BulkExporter
+        exporter = BulkExporter(path, format, compression, chunk_size, columns, resume, '_id', self.log)
+        return exporter.write(self._stream_api("/listpolicy"))
+
+    @traced
     def get_protected_object_count(self):
         """Get the number of objects currently under protection by the Rubrik Mosaic cluster
 
         Returns:
             int -- The total number of objects currently under protection by the Rubrik Mosaic cluster.
         """
-        policies = self.get_policies()
-        objectcount = 0
-        for policy in policies:
-            #verify we only have on object in our policy and not a list of objects, if so increment
-            #this should always be the case currently, trying to futureproof this module
-            if isinstance(policy['sys_p_doc']['source_mgmt_obj'], str) and policy['sys_p_doc']['policy_disabled'] == False:
-                objectcount+=1
-            #if we have a list of objects in our policy, increment the object count by the number of protected objects
-            #this should not be the case currently, trying to futureproof this module
-            elif isinstance(policy['sys_p_doc']['source_mgmt_obj'], list) and policy['sys_p_doc']['policy_disabled'] == False:
-                objectcount+=len(policy['sys_p_doc']['source_mgmt_obj'])
-            #skip disabled policies
-            elif (isinstance(policy['sys_p_doc']['source_mgmt_obj'], str) or isinstance(policy['sys_p_doc']['source_mgmt_obj'], list)) and policy['sys_p_doc']['policy_disabled'] == True:
-                pass
-            #something went wrong, raise an error
-            else:
-                raise ValueError("get_protected_object_count - invalid source_mgmt_obj value in policy document {}".format(policy['sys_p_doc']['policy_group_name']))
-        return objectcount
-
-    def get_size_under_protection(self):
+        return _protected_object_count(self.get_policies())
+
+    @traced
+    def get_size_under_protection(self, max_workers=None):
         """Get the total capacity of data currently under protection by the Rubrik Mosaic cluster
 
+        Keyword Arguments:
+            max_workers {int} -- The maximum number of sources to get the stats of in parallel. If a value is not provided the `max_workers` value of the connection is used. (default: {None})
+
         Returns:
             int -- The total capacity of data currently under protection in MB of the Rubrik Mosaic cluster.
         """
-        sources = self.get_source_stats()
-        sizeunderprotection = 0
-        self.log('get_size_under_protection - Calculating capacity under protection')
-        for source in sources:
-            if source['db_stats']['status'] == True:
-                self.log('get_size_under_protection - source {} has {} MB under protection'.format(source['source_name'], source['db_stats']['licensed_size']))
-                sizeunderprotection+=int(source['db_stats']['licensed_size'])
-            #skip disabled policies
-            elif source['db_stats']['status'] != True:
-                self.log('get_size_under_protection - source {} has a status of {}, skipping it'.format(source['source_name'], source['db_stats']['status']))
-                pass
-        return sizeunderprotection
+        return _size_under_protection(self.get_source_stats(max_workers), self.log)
 
+    @traced
     def get_secondary_storage_consumed(self):
         """Get the total secondary storage consumption of the Rubrik Mosaic cluster
 
         Returns:
             int -- The total secondary storage consumption in MB of the Rubrik Mosaic cluster.
         """
-        policies = self.get_policies()
-        secondarystorageconsumed = 0
-        for policy in policies:
-            self.log('get_secondary_storage_consumed - {} - {} is storing {} MB of data'.format(policy['sys_p_doc']['policy_group_name'], policy['sys_p_doc']['source_mgmt_obj'], policy['physical_size']))
-            secondarystorageconsumed+=int(policy['physical_size'])
-        return secondarystorageconsumed
+        return _secondary_storage_consumed(self.get_policies(), self.log)
 
+    @traced
     def get_backup_count(self):
         """Get the number of backups stored on a Rubrik Mosaic cluster.
 
         Returns:
             int -- The total number of backups stored on the Rubrik Mosaic cluster.
         """
+        return _backup_count(self.get_policies(), self.log)
+
+    @traced
+    def snapshot(self, max_workers=None, collect_errors=False):
+        """Get a point in time snapshot of the Rubrik Mosaic cluster that contains the results of all of the reporting functions.
+        The policies, sources, stores and jobs are each fetched only once no matter how many of the results are used.
+
+        Keyword Arguments:
+            max_workers {int} -- The maximum number of stores or sources to get the stats of in parallel. If a value is not provided the `max_workers` value of the connection is used. (default: {None})
+            collect_errors {bool} -- Flag to determine if the stores and sources whose stats could not be collected are skipped, and listed in the `errors` attribute of the snapshot, instead of raising the exception. (default: {False})
+
+        Returns:
+            ClusterSnapshot -- The policies, store stats, source stats and jobs of the Rubrik Mosaic cluster along with the aggregates computed from them.
+        """
         policies = self.get_policies()
-        backupcount = 0
-        for policy in policies:
-            self.log('get_backup_count - {} - {} has {} versions'.format(policy['sys_p_doc']['policy_group_name'], policy['sys_p_doc']['source_mgmt_obj'], policy['version_count']))
-            backupcount+=int(policy['version_count'])
-        return backupcount
\ No newline at end of file
+        store_stats = self.get_store_stats(max_workers, collect_errors)
+        source_stats = self.get_source_stats(max_workers, collect_errors)
+        job_state_counts = {}
+        jobs = list(self.iter_jobs(job_state_counts))
+        _log_job_states(job_state_counts, self.log)
+        return ClusterSnapshot(policies, store_stats, source_stats, jobs, job_state_counts, self.log)
@@ -0,0 +1,200 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK RetryPolicy and CircuitBreaker classes.
+"""
+
+import random
+import threading
+import time
+
+
+# The HTTP status codes of a transient server error, they are retried and count as a failure of the node
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+class RetryPolicy():
+    """The policy used to retry API calls that failed with a transient error. Each retry waits for an exponentially increasing
+    backoff with full jitter, so many clients retrying at once do not all call a struggling cluster at the same moment.
+
+    Keyword Arguments:
+        max_retries {int} -- The maximum number of times an API call is retried. (default: {3})
+        backoff_factor {float} -- The number of seconds the backoff starts at. The backoff doubles after each retry. (default: {0.5})
+        max_backoff {float} -- The maximum number of seconds to wait between two attempts. (default: {30})
+        jitter {bool} -- Flag to determine if a random wait between zero and the backoff is used instead of the backoff itself. (default: {True})
+        methods {tuple} -- The HTTP methods that are retried. Only idempotent methods should be included. (default: {('GET',)})
+        status_codes {tuple} -- The HTTP status codes that are retried. (default: {(500, 502, 503, 504)})
+    """
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30, jitter=True, methods=('GET',), status_codes=RETRY_STATUS_CODES):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.methods = frozenset(method.upper() for method in methods)
+        self.status_codes = frozenset(status_codes)
+        self.retries = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def should_retry(self, call_type, attempt):
+        """Determine if a failed API call is retried.
+
+        Arguments:
+            call_type {str} -- The HTTP Method of the API call. (choices: {'GET', 'POST'})
+            attempt {int} -- The number of times the API call has already been retried.
+
+        Returns:
+            bool -- True if the API call is retried.
+        """
+
+        if call_type.upper() not in self.methods:
+            return False
+        with self._lock:
+            if attempt < self.max_retries:
+                self.retries += 1
+                return True
+            self.exhausted += 1
+            return False
+
+    def backoff(self, attempt, retry_after=None):
+        """Get the number of seconds to wait before retrying an API call.
+
+        Arguments:
+            attempt {int} -- The number of times the API call has already been retried.
+
+        Keyword Arguments:
+            retry_after {str} -- The value of the `Retry-After` header of the failed response. When it is a number of seconds it is used as the minimum wait. (default: {None})
+
+        Returns:
+            float -- The number of seconds to wait.
+        """
+
+        backoff = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        if retry_after is not None:
+            try:
+                backoff = max(backoff, min(self.max_backoff, float(retry_after)))
+            except ValueError:
+                pass
+        return backoff
+
+    def stats(self):
+        """Get the usage statistics of the retry policy.
+
+        Returns:
+            dict -- The number of retries made and the number of API calls that failed after all of their retries.
+        """
+
+        with self._lock:
+            return {'retries': self.retries, 'exhausted': self.exhausted}
+
+
+class CircuitBreaker():
+    """A circuit breaker that fails API calls fast while a Rubrik Mosaic node is unhealthy. The circuit opens after
+    `failure_threshold` consecutive failures and rejects every call for `recovery_timeout` seconds. It is then half-open and
+    lets `half_open_max_calls` probe calls through. A successful probe closes the circuit, a failed probe opens it again.
+
+    Keyword Arguments:
+        failure_threshold {int} -- The number of consecutive failures that open the circuit. (default: {5})
+        recovery_timeout {float} -- The number of seconds the circuit stays open before a probe call is allowed. (default: {30})
+        half_open_max_calls {int} -- The number of probe calls allowed at the same time while the circuit is half-open. (default: {1})
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30, half_open_max_calls=1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._state = self.CLOSED
+        self._opened_at = 0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def copy(self):
+        """Create a new circuit breaker, in the closed state, with the same settings.
+
+        Returns:
+            CircuitBreaker -- The new circuit breaker.
+        """
+
+        return CircuitBreaker(self.failure_threshold, self.recovery_timeout, self.half_open_max_calls)
+
+    @property
+    def state(self):
+        """The current state of the circuit. (choices: {'closed', 'open', 'half_open'})"""
+        with self._lock:
+            if self._state == self.OPEN and time.time() >= self._opened_at + self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Determine if an API call may be sent. A call allowed while the circuit is half-open is a probe and must be followed
+        by `record_success()` or `record_failure()`.
+
+        Returns:
+            bool -- True if the API call may be sent.
+        """
+
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.time() < self._opened_at + self.recovery_timeout:
+                    self.rejected += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._probes = 0
+            if self._state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record_success(self):
+        """Record an API call the node responded to, which closes the circuit."""
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self):
+        """Record an API call that failed with a connection error, a timeout or a server error."""
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or (self._state == self.CLOSED and self.failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = time.time()
+                self.opened += 1
+
+    def release(self):
+        """Release a probe call that ended without a response or a failure of the node, ex. because it was interrupted, so
+        another probe call may be sent."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def stats(self):
+        """Get the current state and usage statistics of the circuit breaker.
+
+        Returns:
+            dict -- The state of the circuit, the number of consecutive failures, the number of times it opened and the number of calls it rejected.
+        """
+
+        return {'state': self.state, 'failures': self.failures, 'opened': self.opened, 'rejected': self.rejected}
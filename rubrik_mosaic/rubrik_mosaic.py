@@ -16,12 +16,23 @@ This module contains the Rubrik Mosaic SDK Connect class.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import os
 import logging
+import threading
+import time
+import json
+import base64
 
-from .api import Api
+from .api import Api, _error_message
+from .coalesce import RequestCoalescer
 from .exceptions import RubrikConnectionException, InvalidAPIEndPointException, MissingCredentialException
+from .json_backend import loads
+from .logger import LOGGER
+from .metrics import MetricsRegistry
+from .node_pool import NodePool
 from .reporting import Reporting
+from .transport import Transport
 
 _REPORTING = Reporting
 _API = Api
@@ -34,15 +45,30 @@ class Connect(Reporting):
         _REPORTING {class} - This class contains methods related to reporting on the operations of the Rubrik Mosaic cluster.
     """
 
-    def __init__(self, node_ip=None, username=None, password=None, port="9090", enable_logging=False):
+    def __init__(self, node_ip=None, username=None, password=None, port="9090", enable_logging=False, token_ttl=1800, token_refresh_margin=60, verify=False, pool_connections=10, pool_maxsize=10, max_workers=1, cache=None, retry=None, circuit_breaker=None, node_strategy='round_robin', metrics=True, tracer=None, transport=None, records=False, coalesce=False):
         """Constructor for the Connect class which is used to initialize the class variables.
 
         Keyword Arguments:
-            node_ip {str} -- The Hostname or IP Address of a node in the Rubrik Mosaic cluster you wish to connect to. If a value is not provided we will check for a `rubrik_mosaic_node_ip` environment variable. (default: {None})
+            node_ip {str} -- The Hostname or IP Address of a node in the Rubrik Mosaic cluster you wish to connect to. A list, or comma separated string, of nodes may be provided to spread the API calls across them. If a value is not provided we will check for a `rubrik_mosaic_node_ip` environment variable. (default: {None})
             port {str} -- The Port used to connect to the Rubrik Mosaic cluster. If a value is not provided we will check for a `rubrik_mosaic_port` environment variable. (default: {9090})
             username {str} -- The Username you wish to use to connect to the Rubrik Mosaic cluster. If a value is not provided we will check for a `rubrik_mosaic_username` environment variable. (default: {None})
             password {str} -- The Password you wish to use to connect to the Rubrik Mosaic cluster. If a value is not provided we will check for a `rubrik_mosaic_password` environment variable. (default: {None})
             enable_logging {bool} -- Flag to determine if logging will be enabled for the SDK. (default: {False})
+            token_ttl {int} -- The number of seconds a cached API token is considered valid when its expiry can not be read from the token itself. (default: {1800})
+            token_refresh_margin {int} -- The number of seconds before the API token expires that it will be proactively refreshed. (default: {60})
+            verify {bool} -- Flag to determine if the certificate of the Rubrik Mosaic cluster will be validated. A path to a CA bundle may also be provided. (default: {False})
+            pool_connections {int} -- The number of connection pools to cache, one pool is used per Rubrik Mosaic node. (default: {10})
+            pool_maxsize {int} -- The maximum number of connections to keep alive in each connection pool. This should be at least `max_workers`. (default: {10})
+            max_workers {int} -- The maximum number of API calls the reporting functions will run in parallel when collecting the stats of each store or source. (default: {1})
+            cache {ResponseCache} -- An optional cache used to serve repeated GET requests without calling the Rubrik Mosaic cluster. (default: {None})
+            retry {RetryPolicy} -- An optional policy used to retry API calls that fail with a connection error, a timeout or a server error. (default: {None})
+            circuit_breaker {CircuitBreaker} -- An optional circuit breaker used to fail API calls fast while the Rubrik Mosaic node is unhealthy. When multiple nodes are provided each node uses a copy of it to eject the node while it is unhealthy. (default: {None})
+            node_strategy {str} -- How a node is selected for each API call when multiple nodes are provided. (choices: {'round_robin', 'least_latency'}) (default: {'round_robin'})
+            metrics {bool} -- Flag to determine if the latency, size and outcome of each API call are recorded in a metrics registry. A MetricsRegistry may also be provided to share it between connections. (default: {True})
+            tracer {Tracer} -- An optional tracer used to record how long each phase of every reporting function and API call takes. (default: {None})
+            transport {Transport} -- The transport used to send the API calls, ex. a RecordTransport to record them to a cassette or a ReplayTransport to serve them from one without calling the Rubrik Mosaic cluster. (default: {Transport()})
+            records {bool} -- Flag to determine if the reporting functions return compact Job, Policy, SourceStats and StoreStats records instead of dicts, which use several times less memory on large clusters. (default: {False})
+            coalesce {bool} -- Flag to determine if concurrent GET requests for the same endpoint and params share a single API call, and its response or exception, instead of each making their own. (default: {False})
         """
 
         if enable_logging:
@@ -52,19 +78,21 @@ class Connect(Reporting):
             node_ip = os.environ.get('rubrik_mosaic_node_ip')
             if node_ip is None:
                 raise MissingCredentialException("The Rubrik Mosaic Node IP has not been provided.")
-            else:
-                self.node_ip = node_ip
-        else:
-            self.node_ip = node_ip
+        if isinstance(node_ip, str):
+            node_ip = [node.strip() for node in node_ip.split(',') if node.strip()]
+        self.nodes = list(node_ip)
+        if not self.nodes:
+            raise MissingCredentialException("The Rubrik Mosaic Node IP has not been provided.")
+        self.node_ip = self.nodes[0]
 
-        self.log("Node IP: {}".format(self.node_ip))
+        self.log("Node IP: {}", ', '.join(self.nodes))
 
         self.port = port
         port = os.environ.get('rubrik_mosaic_port')
         if port is not None:
             self.port = port
 
-        self.log("Node Port: {}".format(self.port))
+        self.log("Node Port: {}", self.port)
 
         if username is None:
             username = os.environ.get('rubrik_mosaic_username')
@@ -72,10 +100,10 @@ class Connect(Reporting):
                 raise MissingCredentialException("The Rubrik Mosaic Username has not been provided.")
             else:
                 self.username = username
-                self.log("Username: {}".format(self.username))
+                self.log("Username: {}", self.username)
         else:
             self.username = username
-            self.log("Username: {}".format(self.username))
+            self.log("Username: {}", self.username)
 
         if password is None:
             password = os.environ.get('rubrik_mosaic_password')
@@ -88,55 +116,97 @@ class Connect(Reporting):
             self.password = password
             self.log("Password: *******\n")
 
-    @staticmethod
-    def log(log_message):
-        """Create properly formatted debug log messages.
+        self.max_workers = max_workers
+        self.records = records
+        self.cache = cache
+        self.coalescer = RequestCoalescer() if coalesce else None
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+        self.node_pool = NodePool(self.nodes, node_strategy, circuit_breaker)
+        if metrics is True:
+            metrics = MetricsRegistry()
+        self.metrics_registry = metrics or None
+        self.tracer = tracer
+        self.transport = transport or Transport()
 
-        Arguments:
-            log_message {str} -- The message to pass to the debug log.
+        self.token_ttl = token_ttl
+        self.token_refresh_margin = token_refresh_margin
+        self._api_token = None
+        self._api_token_expiry = 0
+        self._api_token_lock = threading.Lock()
+
+        # All API calls share a single session so the TCP connections and TLS sessions to the cluster are reused.
+        # verify is passed on each request as the CA bundle environment variables take precedence over Session.verify
+        self.verify = verify
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close all of the connections to the Rubrik Mosaic cluster that are kept open by the SDK.
         """
-        log = logging.getLogger(__name__)
-        log.debug(log_message)
 
-    def _authorization_header(self):
-        """Internal method used to create the authorization header used in the API calls.
+        self.log("Closing the connections to the Rubrik Mosaic cluster")
+        self._session.close()
+        self.transport.close()
+
+    def metrics(self):
+        """Get a snapshot of the metrics of the API calls made to the Rubrik Mosaic cluster.
 
         Returns:
-            dict -- The authorization header that utilizes token-based authentication.
+            dict -- The latency histogram, request and response bytes, status code counts and exception counts of each endpoint keyed by endpoint and HTTP method, the number of logins, the response cache statistics and the request coalescing statistics.
         """
 
-        config = {}
-        config["username"] = self.username
-        config["password"] = self.password
+        if self.metrics_registry is None:
+            raise ValueError("Metrics are disabled for this connection, enable them with metrics=True.")
+        return self.metrics_registry.snapshot(self.cache, self.coalescer)
 
-        request_url = "https://{}:{}/datos/login".format(self.node_ip, self.port)
+    def prometheus_metrics(self):
+        """Get the metrics of the API calls made to the Rubrik Mosaic cluster in the Prometheus text exposition format.
 
-        self.log("Generating API Token")
+        Returns:
+            str -- The metrics in the Prometheus text exposition format.
+        """
 
-        try:
-            api_request = requests.post(request_url, verify=False, data=config, timeout=30)
-        except requests.exceptions.ConnectTimeout:
-            raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
-        except requests.exceptions.ConnectionError:
-            raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
-        except requests.exceptions.ReadTimeout:
-            raise RubrikConnectionException(
-                "The Rubrik Mosaic cluster did not respond to the API request in the allotted amount of time. To fix this issue, increase the timeout value.")
-        except requests.exceptions.RequestException as error:
-            # If "error_message" has be defined raise an exception with that message else
-            # raise an exception with the request exception error
-            try:
-                error_message
-            except NameError:
-                raise RubrikConnectionException(error)
-            else:
-                raise RubrikConnectionException(error_messageer)
+        if self.metrics_registry is None:
+            raise ValueError("Metrics are disabled for this connection, enable them with metrics=True.")
+        return self.metrics_registry.prometheus(self.cache, self.coalescer)
 
-        api_response = api_request.json()
+    @staticmethod
+    def log(log_message, *args):
+        """Create properly formatted debug log messages. The message is only formatted when debug logging is enabled, so
+        pass the values to include as `args` instead of formatting the message beforehand.
+
+        Arguments:
+            log_message {str} -- The message to pass to the debug log, with a `{}` placeholder for each of the `args`.
+            args {object} -- The values to format into the message.
+        """
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(log_message.format(*args) if args else log_message)
 
-        api_token = api_response["data"]["token"]
+    def _authorization_header(self, rejected_token=None):
+        """Internal method used to create the authorization header used in the API calls. The API token is cached and only
+        regenerated when it is close to expiring or after it has been rejected by the Rubrik Mosaic cluster.
 
-        self.log("API Token: {}".format(api_token))
+        Keyword Arguments:
+            rejected_token {str} -- An API token the Rubrik Mosaic cluster has rejected. If it is still the cached token a new token will be generated. (default: {None})
+
+        Returns:
+            dict -- The authorization header that utilizes token-based authentication.
+        """
+
+        api_token = self._api_token
+        if api_token is None or api_token == rejected_token or time.time() >= self._api_token_expiry - self.token_refresh_margin:
+            # Only a single thread generates a new token, any other caller waits on the lock and then reuses the result
+            with self._api_token_lock:
+                api_token = self._api_token
+                if api_token is None or api_token == rejected_token or time.time() >= self._api_token_expiry - self.token_refresh_margin:
+                    api_token = self._generate_api_token()
 
         authorization_header = {
             'Content-Type': 'application/json',
@@ -145,6 +215,97 @@ class Connect(Reporting):
 
         return authorization_header
 
+    def _generate_api_token(self):
+        """Internal method used to login to the Rubrik Mosaic cluster and cache the API token that is returned.
+
+        Returns:
+            str -- The API token generated by the Rubrik Mosaic cluster.
+        """
+
+        with self._span('login', 'login'):
+            config = {}
+            config["username"] = self.username
+            config["password"] = self.password
+
+            self.log("Generating API Token")
+
+            metrics = self.metrics_registry
+            try:
+                try:
+                    # Logins are spread across the nodes, retried and failed fast by the circuit breakers the same way as
+                    # every other API call
+                    api_request = self._send_with_retry('TOKEN_GENERATE', '/datos/login', None, config, 30)
+                except BaseException:
+                    if metrics is not None:
+                        metrics.count_login(success=False)
+                    raise
+            except requests.exceptions.ConnectTimeout:
+                raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
+            except requests.exceptions.ConnectionError:
+                raise RubrikConnectionException("Unable to establish a connection to the Rubrik Mosaic cluster.")
+            except requests.exceptions.ReadTimeout:
+                raise RubrikConnectionException(
+                    "The Rubrik Mosaic cluster did not respond to the API request in the allotted amount of time. To fix this issue, increase the timeout value.")
+            except requests.exceptions.RequestException as error:
+                raise RubrikConnectionException(error)
+
+            if metrics is not None:
+                metrics.count_login(success=api_request.status_code < 400)
+
+            try:
+                api_response = loads(api_request.content)
+            except ValueError:
+                api_response = None
+
+            api_token = self._api_token_from_response(api_response)
+
+            self.log("API Token: {}", api_token)
+
+            expiry = self._api_token_expiration(api_token)
+            if expiry is None:
+                expiry = time.time() + self.token_ttl
+
+            self._api_token_expiry = expiry
+            self._api_token = api_token
+
+            return api_token
+
+    @staticmethod
+    def _api_token_from_response(api_response):
+        """Internal method used to read the API token from the response of a login request.
+
+        Arguments:
+            api_response {dict} -- The decoded response of the login request, or None if it could not be decoded.
+
+        Returns:
+            str -- The API token generated by the Rubrik Mosaic cluster.
+        """
+
+        try:
+            return api_response["data"]["token"]
+        except (KeyError, TypeError):
+            # Failed logins, ex. invalid credentials, return the reason in the error message provided by Rubrik
+            message = _error_message(api_response) or "The response did not contain an API token."
+            raise RubrikConnectionException("Unable to login to the Rubrik Mosaic cluster: {}".format(message))
+
+    @staticmethod
+    def _api_token_expiration(api_token):
+        """Internal method used to read the expiration time from the `exp` claim of a JWT based API token.
+
+        Arguments:
+            api_token {str} -- The API token generated by the Rubrik Mosaic cluster.
+
+        Returns:
+            float -- The expiration time of the API token in seconds since the epoch or None if it could not be determined.
+        """
+
+        try:
+            payload = api_token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return float(json.loads(base64.urlsafe_b64decode(payload).decode("utf-8"))["exp"])
+        except (IndexError, KeyError, TypeError, ValueError, AttributeError):
+            return None
+
     @staticmethod
     def _api_validation(api_endpoint):
         """Internal method used to validate the API Version and API Endpoint provided by the end user
@@ -0,0 +1,175 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the incremental JSON parser used to stream large API responses.
+"""
+
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DELIMITERS = frozenset(' \t\n\r,:]}')
+
+# Parser states
+_START = 0
+_KEY = 1
+_COLON = 2
+_VALUE = 3
+_NEXT_KEY = 4
+_ITEM = 5
+_NEXT_ITEM = 6
+_DONE = 7
+
+
+class JSONArrayParser():
+    """Incrementally parse a JSON object and return the items of one of its array members as soon as they are complete,
+    without ever holding the full document in memory. Bytes are pushed in with `feed()` and `close()` must be called once
+    the whole document has been read.
+
+    Keyword Arguments:
+        key {str} -- The key of the top level array to stream the items of. (default: {'data'})
+    """
+
+    def __init__(self, key='data'):
+        self.key = key
+        self.found = False
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._state = _START
+        self._current_key = None
+
+    def feed(self, data):
+        """Parse the next chunk of the JSON document.
+
+        Arguments:
+            data {bytes} -- The next chunk of the JSON document.
+
+        Returns:
+            list -- The array items completed by this chunk.
+        """
+
+        self._buffer = self._buffer[self._pos:] + self._text.decode(data)
+        self._pos = 0
+        return self._parse(final=False)
+
+    def close(self):
+        """Parse the end of the JSON document and validate that it was complete.
+
+        Returns:
+            list -- The array items that were still pending.
+        """
+
+        self._buffer = self._buffer[self._pos:] + self._text.decode(b'', final=True)
+        self._pos = 0
+        items = self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError("The JSON document ended before it was complete.")
+        if not self.found:
+            raise KeyError(self.key)
+        return items
+
+    def _decode(self, pos, final):
+        """Decode the JSON value that starts at `pos`. A value that is not followed by a delimiter may have been truncated
+        (ex. the number `1.` of `1.5`) so it is only accepted once more data, or the end of the document, has been read.
+
+        Returns:
+            tuple -- The decoded value and the position following it, or (None, None) if more data is needed.
+        """
+
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, pos)
+        except ValueError:
+            if final:
+                raise
+            return None, None
+        if not final and (end == len(self._buffer) or self._buffer[end] not in _DELIMITERS):
+            return None, None
+        return value, end
+
+    def _parse(self, final):
+        items = []
+        buffer = self._buffer
+        while True:
+            pos = _WHITESPACE.match(buffer, self._pos).end()
+            self._pos = pos
+            if pos == len(buffer):
+                return items
+            char = buffer[pos]
+            state = self._state
+
+            if state == _ITEM:
+                if char == ']':
+                    self._pos = pos + 1
+                    self._state = _NEXT_KEY
+                    continue
+                item, end = self._decode(pos, final)
+                if end is None:
+                    return items
+                items.append(item)
+                self._pos = end
+                self._state = _NEXT_ITEM
+            elif state == _NEXT_ITEM:
+                if char == ',':
+                    self._state = _ITEM
+                elif char == ']':
+                    self._state = _NEXT_KEY
+                else:
+                    raise ValueError("Expecting ',' or ']' at position {}".format(pos))
+                self._pos = pos + 1
+            elif state == _START:
+                if char != '{':
+                    raise ValueError("Expecting '{{' at position {}".format(pos))
+                self._pos = pos + 1
+                self._state = _KEY
+            elif state == _KEY:
+                if char == '}':
+                    self._pos = pos + 1
+                    self._state = _DONE
+                    continue
+                key, end = self._decode(pos, final)
+                if end is None:
+                    return items
+                self._current_key = key
+                self._pos = end
+                self._state = _COLON
+            elif state == _COLON:
+                if char != ':':
+                    raise ValueError("Expecting ':' at position {}".format(pos))
+                self._pos = pos + 1
+                self._state = _VALUE
+            elif state == _VALUE:
+                if self._current_key == self.key and char == '[':
+                    self.found = True
+                    self._pos = pos + 1
+                    self._state = _ITEM
+                    continue
+                # Any other member of the object is decoded and discarded
+                value, end = self._decode(pos, final)
+                if end is None:
+                    return items
+                self._pos = end
+                self._state = _NEXT_KEY
+            elif state == _NEXT_KEY:
+                if char == ',':
+                    self._state = _KEY
+                elif char == '}':
+                    self._state = _DONE
+                else:
+                    raise ValueError("Expecting ',' or '}}' at position {}".format(pos))
+                self._pos = pos + 1
+            else:
+                raise ValueError("Extra data at position {}".format(pos))
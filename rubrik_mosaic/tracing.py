@@ -0,0 +1,295 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK Tracer and Span classes.
+"""
+
+import functools
+import threading
+import time
+from collections import deque
+
+
+class Span():
+    """A timed phase of an SDK call. The spans of a call form a tree: the reporting function, each API call it makes, the
+    login and the request, transfer and decode phases of each API call.
+
+    Arguments:
+        name {str} -- The name of the span (ex. get_store_stats or GET /liststore).
+        kind {str} -- The type of the span. (choices: {'method', 'request', 'login', 'phase'})
+
+    Keyword Arguments:
+        parent {Span} -- The span this span is a child of. (default: {None})
+        attributes {dict} -- Details of the span such as the endpoint, node and status code. (default: {None})
+    """
+
+    __slots__ = ('name', 'kind', 'parent', 'attributes', 'children', 'start_time', 'duration', '_start')
+
+    def __init__(self, name, kind, parent=None, attributes=None):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.attributes = attributes or {}
+        self.children = []
+        self.start_time = time.time()
+        self.duration = None
+        self._start = time.perf_counter()
+
+    def set(self, **attributes):
+        """Add details to the span.
+        """
+        self.attributes.update(attributes)
+
+    @property
+    def self_time(self):
+        """The number of seconds spent in the span itself and not in any of its children, ex. the time spent aggregating the
+        responses in a reporting function."""
+        if self.duration is None:
+            return None
+        return max(0.0, self.duration - sum(child.duration or 0 for child in self.children))
+
+    def to_dict(self):
+        """Convert the span and its children to a dict.
+
+        Returns:
+            dict -- The name, kind, start time, duration, self time and attributes of the span and a list of its children.
+        """
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'start_time': self.start_time,
+            'duration': self.duration,
+            'self_time': self.self_time,
+            'attributes': dict(self.attributes),
+            'children': [child.to_dict() for child in self.children],
+        }
+
+    def format(self, indent=0):
+        """Format the span and its children as an indented tree of durations.
+
+        Keyword Arguments:
+            indent {int} -- The number of levels to indent the span by. (default: {0})
+
+        Returns:
+            str -- One line per span with its duration and self time in seconds.
+        """
+        lines = ['{}{} {:.3f}s (self {:.3f}s)'.format('  ' * indent, self.name, self.duration or 0, self.self_time or 0)]
+        for child in self.children:
+            lines.append(child.format(indent + 1))
+        return '\n'.join(lines)
+
+
+class _NullSpan():
+    """Internal class used in place of a span when tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer():
+    """Records a tree of spans for each SDK call to break down where its time is spent. The spans of the most recent calls
+    are kept in `traces`, and hooks may be provided to forward each span to another tracing system as it starts and ends.
+
+    Keyword Arguments:
+        on_request_start {function} -- Called with each Span when it starts. (default: {None})
+        on_request_end {function} -- Called with each Span when it ends, once its duration and attributes are set. (default: {None})
+        max_traces {int} -- The number of root spans to keep in `traces`. (default: {100})
+    """
+
+    def __init__(self, on_request_start=None, on_request_end=None, max_traces=100):
+        self.on_request_start = on_request_start
+        self.on_request_end = on_request_end
+        self.traces = deque(maxlen=max_traces)
+        self._local = threading.local()
+
+    def current(self):
+        """Get the active span of the current thread.
+
+        Returns:
+            Span -- The active span or None if there is none.
+        """
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    def start_span(self, name, kind, parent=None, **attributes):
+        """Start a span without making it the active span of the current thread. It must be ended with `end_span()`.
+
+        Arguments:
+            name {str} -- The name of the span.
+            kind {str} -- The type of the span. (choices: {'method', 'request', 'login', 'phase'})
+
+        Keyword Arguments:
+            parent {Span} -- The span this span is a child of. If a value is not provided the active span of the current thread is used. (default: {None})
+            attributes {dict} -- Details of the span.
+
+        Returns:
+            Span -- The started span.
+        """
+        if parent is None:
+            parent = self.current()
+        span = Span(name, kind, parent, attributes)
+        if parent is not None:
+            parent.children.append(span)
+        if self.on_request_start is not None:
+            self.on_request_start(span)
+        return span
+
+    def end_span(self, span, error=None):
+        """End a span started with `start_span()`.
+
+        Arguments:
+            span {Span} -- The span to end.
+
+        Keyword Arguments:
+            error {Exception} -- The exception that ended the span, if any. (default: {None})
+        """
+        span.duration = time.perf_counter() - span._start
+        if error is not None:
+            span.attributes['error'] = type(error).__name__
+        if span.parent is None:
+            self.traces.append(span)
+        if self.on_request_end is not None:
+            self.on_request_end(span)
+
+    def add_span(self, name, kind, duration, parent=None, **attributes):
+        """Record a phase whose duration was measured separately, ex. the time spent reading a streamed response.
+
+        Arguments:
+            name {str} -- The name of the span.
+            kind {str} -- The type of the span.
+            duration {float} -- The number of seconds the phase took.
+
+        Keyword Arguments:
+            parent {Span} -- The span this span is a child of. If a value is not provided the active span of the current thread is used. (default: {None})
+            attributes {dict} -- Details of the span.
+        """
+        span = self.start_span(name, kind, parent, **attributes)
+        span.duration = duration
+        if span.parent is None:
+            self.traces.append(span)
+        if self.on_request_end is not None:
+            self.on_request_end(span)
+
+    def activate(self, span):
+        """Make a span the active span of the current thread, ex. in a worker thread that makes API calls on behalf of it.
+
+        Arguments:
+            span {Span} -- The span to activate.
+
+        Returns:
+            context manager -- Restores the previously active span on exit.
+        """
+        return _Activation(self, span)
+
+    def span(self, name, kind, **attributes):
+        """Start a span as a child of the active span and make it the active span until the context manager exits.
+
+        Arguments:
+            name {str} -- The name of the span.
+            kind {str} -- The type of the span. (choices: {'method', 'request', 'login', 'phase'})
+
+        Keyword Arguments:
+            attributes {dict} -- Details of the span.
+
+        Returns:
+            context manager -- The started Span.
+        """
+        return _ActiveSpan(self, name, kind, attributes)
+
+
+class _Activation():
+    """Internal class used to push a span on the span stack of the current thread."""
+
+    def __init__(self, tracer, span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self):
+        stack = getattr(self.tracer._local, 'stack', None)
+        if stack is None:
+            stack = self.tracer._local.stack = []
+        stack.append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer._local.stack.pop()
+        return False
+
+
+class _ActiveSpan(_Activation):
+    """Internal class used to start a span, make it the active span and end it."""
+
+    def __init__(self, tracer, name, kind, attributes):
+        super().__init__(tracer, None)
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.span = self.tracer.start_span(self.name, self.kind, **self.attributes)
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        self.tracer.end_span(self.span, exc_value)
+        return False
+
+
+def traced(function):
+    """Internal decorator used to record a span for each call of a reporting function when tracing is enabled."""
+
+    @functools.wraps(function)
+    def traced_function(self, *args, **kwargs):
+        if self.tracer is None:
+            return function(self, *args, **kwargs)
+        with self.tracer.span(function.__name__, 'method'):
+            return function(self, *args, **kwargs)
+
+    return traced_function
+
+
+def timed_iter(iterable, totals, key):
+    """Internal generator used to add the time spent waiting on each item of `iterable` to `totals[key]`."""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            totals[key] = totals.get(key, 0.0) + time.perf_counter() - start
+            return
+        totals[key] = totals.get(key, 0.0) + time.perf_counter() - start
+        yield item
+
+
+def timed_call(function, totals, key):
+    """Internal function used to wrap `function` so the time spent in each call is added to `totals[key]`."""
+
+    def timed_function(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            totals[key] = totals.get(key, 0.0) + time.perf_counter() - start
+
+    return timed_function
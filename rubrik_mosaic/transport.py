@@ -0,0 +1,183 @@
+# Copyright 2018 Rubrik, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License prop
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the Rubrik Mosaic SDK Transport, RecordTransport and ReplayTransport classes.
+"""
+
+import datetime
+import json
+import threading
+import time
+try:
+    from http.client import responses as reasons
+    from urllib.parse import urlsplit
+except ImportError:
+    from httplib import responses as reasons
+    from urlparse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import RubrikConnectionException
+
+# The response headers the SDK reads, no other header is recorded
+RECORDED_HEADERS = ('Content-Type', 'Retry-After')
+
+
+def _request_path(url):
+    """Internal function used to reduce a URL to the path and query string it is recorded under, so a cassette recorded
+    against one node can be replayed against any node."""
+    parts = urlsplit(url)
+    return parts.path + ('?' + parts.query if parts.query else '')
+
+
+class Transport():
+    """Sends the HTTP requests of the SDK to the Rubrik Mosaic cluster through a requests Session. Subclasses may change how
+    the requests are sent, ex. to record or replay them, and are provided to Connect through its `transport` argument.
+    """
+
+    def send(self, session, method, url, **kwargs):
+        """Send an HTTP request.
+
+        Arguments:
+            session {requests.Session} -- The session of the connection.
+            method {str} -- The HTTP Method of the request. (choices: {'GET', 'POST'})
+            url {str} -- The full URL of the request.
+
+        Keyword Arguments:
+            kwargs {dict} -- The arguments of `requests.Session.request()` (ex. headers, json, data, timeout, verify, stream).
+
+        Returns:
+            requests.Response -- The response of the request.
+        """
+
+        return session.request(method, url, **kwargs)
+
+    def close(self):
+        """Release any resource held by the transport."""
+        pass
+
+
+class RecordTransport(Transport):
+    """Sends the HTTP requests of the SDK to the Rubrik Mosaic cluster and records each request and response in a gzip
+    compressed cassette that a ReplayTransport can serve them back from. Only the method, path and query string of each
+    request are recorded along with the status code, `Content-Type` and `Retry-After` headers, body and latency of its
+    response. Request bodies and headers, which contain the credentials and API token, are never recorded and the API
+    token in the response of a login is replaced. Streamed responses are read in full so they can be recorded.
+
+    Arguments:
+        path {str} -- The path of the cassette file to write. An existing file is overwritten.
+
+    Keyword Arguments:
+        transport {Transport} -- The transport used to send the requests. (default: {Transport()})
+    """
+
+    def __init__(self, path, transport=None):
+        self.path = path
+        self.transport = transport or Transport()
+        self.interactions = 0
+        # gzip is only imported by the scripts that record or replay API calls, not by every Connect
+        import gzip
+        self._file = gzip.open(path, 'wb')
+        self._lock = threading.Lock()
+
+    def send(self, session, method, url, **kwargs):
+        start = time.perf_counter()
+        response = self.transport.send(session, method, url, **kwargs)
+        body = response.content
+        latency = time.perf_counter() - start
+
+        path = _request_path(url)
+        if path.endswith('/login') and response.status_code < 400:
+            body = json.dumps({'status': 'ok', 'data': {'token': 'recorded-api-token'}}).encode('utf-8')
+        interaction = {
+            'method': method,
+            'path': path,
+            'status_code': response.status_code,
+            'headers': dict((name, response.headers[name]) for name in RECORDED_HEADERS if name in response.headers),
+            'latency': latency,
+            'length': len(body),
+        }
+        # Each interaction is a JSON header line followed by the raw response body so large bodies are not escaped
+        with self._lock:
+            self._file.write(json.dumps(interaction).encode('utf-8') + b'\n')
+            self._file.write(body + b'\n')
+            self.interactions += 1
+        return response
+
+    def close(self):
+        """Finish writing the cassette file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """Serves the HTTP requests of the SDK from a cassette written by a RecordTransport without any network access. The
+    responses recorded for each method, path and query string are served in the order they were recorded and the last one
+    is repeated once they have all been served.
+
+    Arguments:
+        path {str} -- The path of the cassette file to read.
+
+    Keyword Arguments:
+        simulate_latency {float} -- A multiplier of the recorded latency to wait before serving each response, ex. 1 to wait as long as the Rubrik Mosaic cluster took to respond. (default: {0})
+    """
+
+    def __init__(self, path, simulate_latency=0):
+        self.path = path
+        self.simulate_latency = simulate_latency
+        self.replayed = 0
+        self._interactions = {}
+        self._served = {}
+        self._lock = threading.Lock()
+
+        import gzip
+        with gzip.open(path, 'rb') as cassette:
+            while True:
+                line = cassette.readline()
+                if not line:
+                    break
+                interaction = json.loads(line.decode('utf-8'))
+                interaction['body'] = cassette.read(interaction['length'] + 1)[:-1]
+                self._interactions.setdefault((interaction['method'], interaction['path']), []).append(interaction)
+
+    def send(self, session, method, url, **kwargs):
+        key = (method, _request_path(url))
+        with self._lock:
+            interactions = self._interactions.get(key)
+            if not interactions:
+                raise RubrikConnectionException("The cassette {} does not contain a response for {} {}.".format(self.path, method, key[1]))
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            self.replayed += 1
+        interaction = interactions[min(index, len(interactions) - 1)]
+
+        if self.simulate_latency:
+            time.sleep(interaction['latency'] * self.simulate_latency)
+
+        request = requests.PreparedRequest()
+        request.prepare(method=method, url=url, headers=kwargs.get('headers'), data=kwargs.get('data'), json=kwargs.get('json'))
+
+        response = requests.Response()
+        response.status_code = interaction['status_code']
+        response.reason = reasons.get(response.status_code, '')
+        response.headers = CaseInsensitiveDict(interaction['headers'])
+        response.url = url
+        response.request = request
+        response.elapsed = datetime.timedelta(seconds=interaction['latency'])
+        response._content = interaction['body']
+        response._content_consumed = True
+        return response
@@ -0,0 +1,7 @@
+import rubrik_mosaic
+
+mosaic = rubrik_mosaic.Connect()
+
+mosaic.get_store_stats()
+
+mosaic.close()
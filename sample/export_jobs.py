@@ -0,0 +1,7 @@
+import rubrik_mosaic
+
+mosaic = rubrik_mosaic.Connect()
+
+jobs = mosaic.export_jobs('jobs.csv.gz', format='csv', compression='gzip')
+
+print(jobs)
@@ -0,0 +1,7 @@
+import rubrik_mosaic
+
+mosaic = rubrik_mosaic.Connect()
+
+policies = mosaic.export_policies('policies.ndjson')
+
+print(policies)
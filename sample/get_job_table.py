@@ -0,0 +1,9 @@
+import rubrik_mosaic
+
+mosaic = rubrik_mosaic.Connect()
+
+jobs = mosaic.get_job_table()
+
+print(jobs.count(job_state='job_failed', num_hours=24))
+print(jobs.count_by_state(num_hours=12))
+print(jobs.summary(['job_failed', 'job_aborted'], [1, 12, 24]))
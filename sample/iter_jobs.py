@@ -0,0 +1,8 @@
+import rubrik_mosaic
+
+mosaic = rubrik_mosaic.Connect()
+
+counters = {}
+for job in mosaic.iter_jobs(counters):
+    print(job['_id'], job['current_state'])
+print(counters)
@@ -0,0 +1,10 @@
+import rubrik_mosaic
+
+mosaic = rubrik_mosaic.Connect()
+
+mosaic.get_store_stats()
+
+metrics = mosaic.metrics()
+
+print(metrics["endpoints"]["/getstorestats"]["GET"]["count"])
+print(metrics["logins"])
@@ -0,0 +1,11 @@
+import rubrik_mosaic
+
+mosaic = rubrik_mosaic.Connect()
+
+snapshot = mosaic.snapshot()
+
+print(snapshot.protected_object_count)
+print(snapshot.size_under_protection)
+print(snapshot.secondary_storage_consumed)
+print(snapshot.backup_count)
+print(snapshot.get_job_summary('job_failed', 24))
@@ -0,0 +1,6 @@
+import rubrik_mosaic
+
+mosaic = rubrik_mosaic.Connect()
+
+for transition in mosaic.watch_jobs('job_failed'):
+    print(transition.job_id, transition.previous_state, transition.current_state)
@@ -25,6 +25,18 @@ setuptools.setup(
     install_requires=[
         'requests >= 2.18.4',
     ],
+    extras_require={
+        'async': ['aiohttp >= 3.7'],
+        'numpy': ['numpy'],
+        'orjson': ['orjson'],
+        'pandas': ['pandas'],
+        'arrow': ['pyarrow'],
+    },
+    entry_points={
+        'console_scripts': [
+            'mosaic = rubrik_mosaic.cli:main',
+        ],
+    },
     tests_require=[
         'pytest'
     ],
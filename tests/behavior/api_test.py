@@ -0,0 +1,219 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+import rubrik_mosaic
+from rubrik_mosaic.exceptions import RubrikConnectionException
+
+
+def _run_async(server, function):
+
+    async def run():
+        async with rubrik_mosaic.AsyncConnect('127.0.0.1', 'admin', 'admin', port=server.port) as mosaic:
+            return await function(mosaic)
+
+    return asyncio.run(run())
+
+
+async def _list_jobs(mosaic):
+
+    return [job async for job in mosaic.iter_jobs()]
+
+
+@pytest.mark.unit
+def test_error_message(mosaic):
+
+    with pytest.raises(RubrikConnectionException, match='^Unknown endpoint /datos/nope$'):
+        mosaic.get('/nope')
+
+
+@pytest.mark.unit
+def test_streamed_error_message(mosaic, publish):
+
+    publish('/listjobs', None)
+
+    with pytest.raises(RubrikConnectionException, match='^Unknown endpoint /datos/listjobs$'):
+        list(mosaic.iter_jobs())
+
+
+@pytest.mark.unit
+def test_async_error_message(server):
+
+    with pytest.raises(RubrikConnectionException, match='^Unknown endpoint /datos/nope$'):
+        _run_async(server, lambda mosaic: mosaic.get('/nope'))
+
+
+@pytest.mark.unit
+def test_async_streamed_error_message(server, publish):
+
+    publish('/listjobs', None)
+
+    with pytest.raises(RubrikConnectionException, match='^Unknown endpoint /datos/listjobs$'):
+        _run_async(server, _list_jobs)
+
+
+@pytest.mark.unit
+def test_streamed_jobs(cluster, server, mosaic):
+
+    counters = {}
+
+    assert list(mosaic.iter_jobs(counters)) == cluster.jobs
+    assert sum(counters.values()) == len(cluster.jobs)
+    assert _run_async(server, _list_jobs) == cluster.jobs
+
+
+def _pools(mosaic):
+
+    return mosaic._session.get_adapter('https://127.0.0.1').poolmanager.pools
+
+
+@pytest.mark.unit
+def test_connection_is_reused(mosaic):
+
+    for _ in range(5):
+        mosaic.get('/liststore')
+
+    pools = _pools(mosaic)
+    assert len(pools) == 1
+    assert pools[list(pools.keys())[0]].num_connections == 1
+
+
+@pytest.mark.unit
+def test_close(mosaic):
+
+    mosaic.get('/liststore')
+    pools = _pools(mosaic)
+
+    mosaic.close()
+    assert len(pools) == 0
+
+
+@pytest.mark.unit
+def test_context_manager_closes_the_connections(server):
+
+    with pytest.raises(RubrikConnectionException):
+        with rubrik_mosaic.Connect('127.0.0.1', 'admin', 'admin', port=server.port) as mosaic:
+            assert mosaic.get('/liststore')['data']
+            pools = _pools(mosaic)
+            assert len(pools) == 1
+            mosaic.get('/nope')
+    assert len(pools) == 0
+
+
+@pytest.mark.unit
+def test_token_is_refreshed_after_it_is_revoked(server, mosaic):
+
+    mosaic.get('/liststore')
+    server._tokens.clear()
+
+    assert len(mosaic.get('/liststore')['data']) == 3
+    assert server.logins == 2
+
+
+@pytest.mark.unit
+def test_async_token_is_refreshed_after_it_is_revoked(server):
+
+    async def revoke(mosaic):
+        await mosaic.get('/liststore')
+        server._tokens.clear()
+        return await mosaic.get('/liststore')
+
+    assert len(_run_async(server, revoke)['data']) == 3
+    assert server.logins == 2
+
+
+@pytest.mark.unit
+def test_async_connect_to_a_single_node():
+
+    with pytest.raises(ValueError, match='single Rubrik Mosaic node'):
+        rubrik_mosaic.AsyncConnect('127.0.0.1,127.0.0.2', 'admin', 'admin')
+    assert rubrik_mosaic.AsyncConnect(' 127.0.0.1 ', 'admin', 'admin').node_ip == '127.0.0.1'
+    assert rubrik_mosaic.AsyncConnect(['127.0.0.1'], 'admin', 'admin').node_ip == '127.0.0.1'
+
+
+@pytest.mark.unit
+def test_async_connect_is_created_outside_the_event_loop(server):
+
+    mosaic = rubrik_mosaic.AsyncConnect('127.0.0.1', 'admin', 'admin', port=server.port)
+
+    async def run():
+        async with mosaic:
+            return await asyncio.gather(*[mosaic.get('/liststore') for _ in range(5)])
+
+    assert len(asyncio.run(run())) == 5
+    assert server.logins == 1
+
+
+@pytest.mark.unit
+def test_async_stats_are_cancelled_after_an_error(server, publish):
+
+    publish('/getsourcestats/source-1', None)
+
+    async def get_source_stats(mosaic):
+        with pytest.raises(RubrikConnectionException, match='source-1'):
+            await mosaic.get_source_stats(max_workers=1)
+        await asyncio.sleep(0.2)
+
+    _run_async(server, get_source_stats)
+    # /listsource, source-0, the failed source-1 and at most the call of source-2 that had already started, the stats
+    # of the other sources were cancelled
+    assert server.requests <= 4
+
+
+@pytest.mark.unit
+def test_token_is_shared_between_calls(server, mosaic):
+
+    for _ in range(5):
+        mosaic.get('/liststore')
+
+    assert server.logins == 1
+
+
+@pytest.mark.unit
+def test_invalid_credentials(connect):
+
+    mosaic = connect()
+    mosaic.password = 'wrong'
+
+    with pytest.raises(RubrikConnectionException, match='^Unable to login to the Rubrik Mosaic cluster: Invalid username or password$'):
+        mosaic.get('/liststore')
+
+
+@pytest.mark.unit
+def test_async_invalid_credentials(server):
+
+    async def run():
+        async with rubrik_mosaic.AsyncConnect('127.0.0.1', 'admin', 'wrong', port=server.port) as mosaic:
+            await mosaic.get('/liststore')
+
+    with pytest.raises(RubrikConnectionException, match='^Unable to login to the Rubrik Mosaic cluster: Invalid username or password$'):
+        asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_metrics(mosaic):
+
+    mosaic.get_backup_count()
+    with pytest.raises(RubrikConnectionException):
+        mosaic.get('/nope')
+
+    metrics = mosaic.metrics()
+    assert metrics['logins'] == 1
+    assert metrics['endpoints']['/listpolicy']['GET']['count'] == 1
+    assert metrics['endpoints']['/nope']['GET']['count'] == 1
+    assert 'rubrik_mosaic' in mosaic.prometheus_metrics()
+
+
+@pytest.mark.unit
+def test_optional_modules_are_imported_on_first_use():
+
+    # Scripts run from cron import the SDK on every run, it must not import what only some of them use
+    code = 'import sys, rubrik_mosaic; rubrik_mosaic.Connect; rubrik_mosaic.AsyncConnect; print(" ".join(sorted(sys.modules)))'
+    root = os.path.join(os.path.dirname(__file__), '..', '..')
+    modules = subprocess.check_output([sys.executable, '-c', code], env=dict(os.environ, PYTHONPATH=root), universal_newlines=True).split()
+
+    assert 'rubrik_mosaic.reporting' in modules
+    for name in ('rubrik_mosaic.bulk_export', 'rubrik_mosaic.columnar', 'rubrik_mosaic.job_watch', 'rubrik_mosaic.job_table', 'gzip', 'numpy', 'pandas', 'pyarrow'):
+        assert name not in modules
@@ -0,0 +1,154 @@
+import asyncio
+import csv
+import gzip
+import json
+import os
+import random
+
+import pytest
+import rubrik_mosaic
+from rubrik_mosaic.bulk_export import BulkExporter
+
+pyarrow = pytest.importorskip('pyarrow')
+import pyarrow.parquet  # noqa: E402
+
+
+def _rows(count, prefix='job'):
+
+    return [{'_id': '{}-{}'.format(prefix, index), 'start_time': 1000 + index, 'details': {'size': index}} for index in range(count)]
+
+
+def _exported_ids(path, format):
+
+    if format == 'ndjson':
+        with gzip.open(path, 'rt') as export:
+            return [json.loads(line)['_id'] for line in export]
+    if format == 'csv':
+        with open(path, newline='') as export:
+            return [row['_id'] for row in csv.DictReader(export)]
+    return pyarrow.parquet.read_table(path).column('_id').to_pylist()
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('format, compression', [('ndjson', 'gzip'), ('csv', None), ('parquet', 'snappy')])
+def test_export_jobs(cluster, mosaic, tmp_path, format, compression):
+
+    path = str(tmp_path / 'jobs.{}'.format(format))
+
+    assert mosaic.export_jobs(path, format, compression, chunk_size=64) == len(cluster.jobs)
+    assert _exported_ids(path, format) == [job['_id'] for job in cluster.jobs]
+    assert not os.path.exists(path + '.progress')
+
+
+@pytest.mark.unit
+def test_export_policies_flattens_nested_fields(cluster, mosaic, tmp_path):
+
+    path = str(tmp_path / 'policies.csv')
+    mosaic.export_policies(path, 'csv')
+
+    with open(path, newline='') as export:
+        rows = list(csv.DictReader(export))
+    assert [row['sys_p_doc.policy_group_name'] for row in rows] == [policy['sys_p_doc']['policy_group_name'] for policy in cluster.policies]
+
+
+@pytest.mark.unit
+def test_export_policies_is_streamed(cluster, server, mosaic, tmp_path, monkeypatch):
+
+    async def export(path):
+        async with rubrik_mosaic.AsyncConnect('127.0.0.1', 'admin', 'admin', port=server.port) as async_mosaic:
+            monkeypatch.setattr(async_mosaic, 'get', None)
+            return await async_mosaic.export_policies(path, chunk_size=3)
+
+    # The policies are written as they are received instead of being read from a response held in memory by get()
+    monkeypatch.setattr(mosaic, 'get', None)
+    assert mosaic.export_policies(str(tmp_path / 'policies.ndjson'), chunk_size=3) == len(cluster.policies)
+    assert asyncio.run(export(str(tmp_path / 'async.ndjson'))) == len(cluster.policies)
+    for name in ('policies.ndjson', 'async.ndjson'):
+        with open(str(tmp_path / name)) as export:
+            assert [json.loads(line)['_id'] for line in export] == [policy['_id'] for policy in cluster.policies]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('format, compression', [('ndjson', 'gzip'), ('csv', None), ('parquet', None)])
+def test_resume_after_the_rows_changed(tmp_path, format, compression):
+
+    path = str(tmp_path / 'jobs.{}'.format(format))
+    rows = _rows(25)
+    exporter = BulkExporter(path, format, compression, chunk_size=5)
+    with pytest.raises(Interrupted):
+        for index, row in enumerate(rows):
+            if index == 13:
+                raise Interrupted()
+            exporter.add(row)
+
+    # The oldest rows aged out, new rows were added and the order changed before the export was resumed
+    changed = rows[3:] + _rows(4, 'new')
+    random.Random(0).shuffle(changed)
+    exporter = BulkExporter(path, format, compression, chunk_size=5, resume=True)
+    total = exporter.write(changed)
+
+    ids = _exported_ids(path, format)
+    assert total == len(ids) == 29
+    assert sorted(ids) == sorted(row['_id'] for row in rows + _rows(4, 'new'))
+    assert exporter.skipped == 7
+
+
+@pytest.mark.unit
+def test_resume_ignores_a_partly_recorded_chunk(tmp_path):
+
+    path = str(tmp_path / 'jobs.ndjson')
+    exporter = BulkExporter(path, chunk_size=5)
+    for row in _rows(12):
+        exporter.add(row)
+    with open(path + '.progress', 'a') as progress:
+        progress.write('{"rows": 15, "col')
+
+    exporter = BulkExporter(path, chunk_size=5, resume=True)
+    assert exporter.rows == 10
+    exporter.write(_rows(25))
+
+    with open(path) as export:
+        ids = [json.loads(line)['_id'] for line in export]
+    assert ids == [row['_id'] for row in _rows(25)]
+
+
+@pytest.mark.unit
+def test_export_starts_over_without_resume(tmp_path):
+
+    path = str(tmp_path / 'jobs.ndjson')
+    exporter = BulkExporter(path, chunk_size=5)
+    for row in _rows(12):
+        exporter.add(row)
+
+    assert BulkExporter(path, chunk_size=5).write(_rows(3)) == 3
+    with open(path) as export:
+        assert len(export.readlines()) == 3
+
+
+@pytest.mark.unit
+def test_parquet_schema_is_the_same_for_every_chunk(tmp_path):
+
+    path = str(tmp_path / 'jobs')
+    rows = [{'_id': str(index), 'start_time': 1000 + index, 'note': None if index < 3 else index} for index in range(5)]
+    rows += [{'_id': str(index), 'start_time': 1000 + index, 'note': 'text' if index % 2 else [index]} for index in range(5, 10)]
+
+    assert BulkExporter(path, 'parquet', chunk_size=5).write(rows) == 10
+
+    schemas = [pyarrow.parquet.read_schema(os.path.join(path, name)) for name in sorted(os.listdir(path))]
+    assert len(schemas) == 2 and schemas[0] == schemas[1]
+    assert pyarrow.types.is_timestamp(schemas[0].field('start_time').type)
+    table = pyarrow.parquet.read_table(path)
+    assert table.column('note').to_pylist()[4:7] == ['4', 'text', '[6]']
+
+
+@pytest.mark.unit
+def test_invalid_format(tmp_path):
+
+    with pytest.raises(ValueError):
+        BulkExporter(str(tmp_path / 'jobs'), 'xml')
+    with pytest.raises(ValueError):
+        BulkExporter(str(tmp_path / 'jobs'), 'csv', 'zip')
@@ -0,0 +1,123 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import rubrik_mosaic
+from rubrik_mosaic.exceptions import RubrikConnectionException
+
+
+def _concurrently(function, count):
+
+    barrier = threading.Barrier(count)
+
+    def call(_):
+        barrier.wait()
+        try:
+            return function()
+        except RubrikConnectionException as error:
+            return error
+
+    with ThreadPoolExecutor(count) as executor:
+        return list(executor.map(call, range(count)))
+
+
+@pytest.mark.unit
+def test_cached_responses(server, connect):
+
+    cache = rubrik_mosaic.ResponseCache(ttls={'/listjobs': 0})
+    mosaic = connect(cache=cache)
+    mosaic.get('/liststore')
+    before = server.requests
+
+    for _ in range(3):
+        mosaic.get('/liststore')
+        mosaic.get_backup_count()
+    assert server.requests - before == 1
+
+    # An endpoint with a time to live of 0 is never cached
+    mosaic.get_jobs()
+    mosaic.get_jobs()
+    assert server.requests - before == 3
+
+    cache.invalidate('/liststore')
+    mosaic.get('/liststore')
+    assert server.requests - before == 4
+    assert cache.stats()['hits'] == 5
+
+
+@pytest.mark.unit
+def test_response_is_not_cached_after_a_post(server, connect):
+
+    cache = rubrik_mosaic.ResponseCache()
+    mosaic = connect(cache=cache)
+    mosaic.get('/listpolicy')
+    server.latency = 0.3
+
+    # The POST is sent while the GET is in flight, its response may predate the change made by the POST
+    get = threading.Thread(target=mosaic.get, args=('/liststore',))
+    get.start()
+    time.sleep(0.1)
+    with pytest.raises(RubrikConnectionException):
+        mosaic.post('/liststore', {})
+    get.join()
+
+    assert cache.stats()['size'] == 0
+    cache.set('/liststore', None, {'data': []}, cache.generation - 1)
+    assert cache.get('/liststore') is None
+
+
+@pytest.mark.unit
+def test_cache_evicts_the_least_recently_used_response():
+
+    cache = rubrik_mosaic.ResponseCache(maxsize=2)
+    cache.set('/a', None, 1)
+    cache.set('/b', None, 2)
+    cache.get('/a')
+    cache.set('/c', None, 3)
+
+    assert cache.get('/a') == 1
+    assert cache.get('/b') is None
+    assert cache.evictions == 1
+
+
+@pytest.mark.unit
+def test_concurrent_gets_are_coalesced(server, connect):
+
+    server.latency = 0.2
+    mosaic = connect(coalesce=True, pool_maxsize=8)
+    mosaic.get('/liststore')
+    before = server.requests
+
+    results = _concurrently(lambda: mosaic.get('/listpolicy'), 8)
+
+    assert server.requests - before == 1
+    assert all(result is results[0] for result in results)
+    assert mosaic.coalescer.stats()['coalesced'] == 7
+
+
+@pytest.mark.unit
+def test_coalesced_error_is_shared(server, connect):
+
+    server.latency = 0.2
+    mosaic = connect(coalesce=True, pool_maxsize=8)
+    mosaic.get('/liststore')
+    before = server.requests
+
+    results = _concurrently(lambda: mosaic.get('/nope'), 8)
+
+    assert server.requests - before == 1
+    assert all(isinstance(result, RubrikConnectionException) for result in results)
+
+
+@pytest.mark.unit
+def test_gets_are_not_coalesced_by_default(server, connect):
+
+    server.latency = 0.2
+    mosaic = connect(pool_maxsize=4)
+    mosaic.get('/liststore')
+    before = server.requests
+
+    _concurrently(lambda: mosaic.get('/listpolicy'), 4)
+
+    assert server.requests - before == 4
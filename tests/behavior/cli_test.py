@@ -0,0 +1,87 @@
+import io
+import json
+import os
+
+import pytest
+from rubrik_mosaic.cli import main
+
+
+@pytest.fixture
+def run(server):
+
+    def run(*arguments):
+        output = io.StringIO()
+        status = main(['report'] + list(arguments) + ['--node-ip', '127.0.0.1', '--port', str(server.port),
+                                                      '--username', 'admin', '--password', 'admin'], output)
+        return status, output.getvalue()
+
+    return run
+
+
+@pytest.mark.unit
+def test_reports_share_one_session(cluster, server, run):
+
+    status, output = run('policies', 'protected-object-count', 'secondary-storage-consumed', 'backup-count', 'jobs', 'job-summary')
+
+    assert status == 0
+    results = json.loads(output)
+    assert len(results['policies']) == len(cluster.policies)
+    assert results['backup-count'] == sum(policy['version_count'] for policy in cluster.policies)
+    assert len(results['jobs']) == len(cluster.jobs)
+    assert server.logins == 1
+    # /listpolicy and /listjobs are each called once for every report that uses them
+    assert server.requests == 2
+
+
+@pytest.mark.unit
+def test_csv_reports(cluster, run, tmp_path):
+
+    status, output = run('backup-count', 'secondary-storage-consumed', '--format', 'csv')
+    assert status == 0
+    assert output.splitlines()[0] == 'report,value'
+
+    status, _ = run('store-stats', 'policies', '--format', 'csv', '--output-dir', str(tmp_path))
+    assert status == 0
+    assert sorted(os.listdir(str(tmp_path))) == ['policies.csv', 'store-stats.csv']
+    with open(str(tmp_path / 'policies.csv')) as report:
+        assert len(report.readlines()) == len(cluster.policies) + 1
+
+
+@pytest.mark.unit
+def test_several_tables_require_an_output_dir(run):
+
+    with pytest.raises(SystemExit):
+        run('jobs', 'policies', '--format', 'csv')
+
+
+@pytest.mark.unit
+def test_missing_stats_fail_the_report(publish, run, capsys):
+
+    publish('/getsourcestats/source-1', None)
+
+    status, output = run('source-stats')
+
+    assert status == 1
+    assert output == ''
+    assert 'Unknown endpoint /datos/getsourcestats/source-1' in capsys.readouterr().err
+
+
+@pytest.mark.unit
+def test_missing_stats_are_collected_on_request(cluster, publish, run, capsys):
+
+    publish('/getsourcestats/source-1', None)
+
+    status, output = run('source-stats', '--collect-errors')
+
+    assert status == 0
+    assert len(json.loads(output)['source-stats']) == len(cluster.sources) - 1
+    assert 'missing source-1' in capsys.readouterr().err
+
+
+@pytest.mark.unit
+def test_stats(run, capsys):
+
+    status, _ = run('backup-count', '--stats')
+
+    assert status == 0
+    assert 'GET /listpolicy called 1 time(s)' in capsys.readouterr().err
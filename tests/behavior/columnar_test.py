@@ -0,0 +1,121 @@
+import datetime
+
+import pytest
+from rubrik_mosaic.records import Job, Policy
+
+pandas = pytest.importorskip('pandas')
+pyarrow = pytest.importorskip('pyarrow')
+
+
+@pytest.mark.unit
+def test_policies_to_dataframe(cluster, mosaic):
+
+    frame = mosaic.get_policies().to_dataframe()
+
+    assert list(frame.columns) == ['_id', 'sys_p_doc.policy_group_name', 'sys_p_doc.source_mgmt_obj', 'sys_p_doc.policy_disabled',
+                                   'sys_p_doc.backup_store', 'sys_p_doc.retention.days', 'physical_size', 'version_count']
+    assert frame['sys_p_doc.policy_disabled'].dtype == bool
+    assert frame['physical_size'].dtype == 'int64'
+    assert frame['version_count'].dtype == 'int64'
+    assert list(frame['sys_p_doc.policy_group_name']) == [policy['sys_p_doc']['policy_group_name'] for policy in cluster.policies]
+    assert list(frame['sys_p_doc.retention.days']) == [policy['sys_p_doc']['retention']['days'] for policy in cluster.policies]
+
+
+@pytest.mark.unit
+def test_source_stats_to_dataframe(cluster, mosaic):
+
+    frame = mosaic.get_source_stats().to_dataframe(columns=['source_name', 'db_stats.status', 'db_stats.licensed_size'])
+
+    assert list(frame.columns) == ['source_name', 'db_stats.status', 'db_stats.licensed_size']
+    assert frame['db_stats.status'].dtype == bool
+    # The cluster returns the licensed sizes as strings
+    assert frame['db_stats.licensed_size'].dtype == 'int64'
+    assert sorted(frame['db_stats.licensed_size']) == sorted(int(stats['db_stats']['licensed_size']) for stats in cluster.source_stats.values())
+
+
+@pytest.mark.unit
+def test_jobs_to_dataframe(cluster, mosaic, publish):
+
+    jobs = cluster.jobs[:3] + [{'_id': 'running', 'current_state': 'job_scheduled', 'start_time': cluster.jobs[0]['start_time']}]
+    publish('/listjobs', jobs)
+
+    frame = mosaic.get_jobs().to_dataframe()
+
+    assert str(frame['start_time'].dt.tz) == 'UTC'
+    assert frame['start_time'][0] == pandas.Timestamp(datetime.datetime.fromtimestamp(jobs[0]['start_time'], datetime.timezone.utc))
+    assert pandas.isna(frame['end_time'][3])
+    assert isinstance(frame['current_state'].dtype, pandas.CategoricalDtype)
+    assert list(frame['current_state'].cat.categories) == sorted(set(job['current_state'] for job in jobs))
+
+
+@pytest.mark.unit
+def test_missing_values(cluster, mosaic, publish):
+
+    policy = dict(cluster.policies[1])
+    del policy['version_count']
+    policy['sys_p_doc'] = dict(policy['sys_p_doc'])
+    del policy['sys_p_doc']['policy_disabled']
+    publish('/listpolicy', [cluster.policies[0], policy])
+
+    frame = mosaic.get_policies().to_dataframe()
+
+    # A missing value keeps the integer and boolean columns typed instead of turning them into floats or objects
+    assert frame['version_count'].dtype == 'Int64'
+    assert frame['sys_p_doc.policy_disabled'].dtype == 'boolean'
+    assert frame['version_count'][0] == cluster.policies[0]['version_count']
+    assert pandas.isna(frame['version_count'][1])
+    assert pandas.isna(frame['sys_p_doc.policy_disabled'][1])
+
+
+@pytest.mark.unit
+def test_to_arrow(cluster, mosaic, publish):
+
+    policies = cluster.policies[:2] + [dict(cluster.policies[2], tags=['gold'])]
+    policies[1] = dict(policies[1], tags='silver')
+    publish('/listpolicy', policies)
+
+    table = mosaic.get_policies().to_arrow()
+    jobs = mosaic.get_jobs().to_arrow()
+
+    assert table.schema.field('sys_p_doc.policy_group_name').type == pyarrow.string()
+    assert table.schema.field('sys_p_doc.policy_disabled').type == pyarrow.bool_()
+    assert table.schema.field('version_count').type == pyarrow.int64()
+    # A field with values of more than one type is stored as JSON text
+    assert table.column('tags').to_pylist() == [None, 'silver', '["gold"]']
+    assert jobs.schema.field('start_time').type == pyarrow.timestamp('s', tz='UTC')
+    assert pyarrow.types.is_dictionary(jobs.schema.field('current_state').type)
+    assert jobs.column('current_state').to_pylist() == [job['current_state'] for job in cluster.jobs]
+
+
+@pytest.mark.unit
+def test_records_are_flattened_like_dicts(mosaic, connect):
+
+    records = connect(records=True)
+    assert isinstance(records.get_policies()[0], Policy)
+    assert isinstance(records.get_jobs()[0], Job)
+
+    pandas.testing.assert_frame_equal(records.get_policies().to_dataframe(), mosaic.get_policies().to_dataframe())
+    pandas.testing.assert_frame_equal(records.get_jobs().to_dataframe(), mosaic.get_jobs().to_dataframe())
+    assert records.get_policies().to_arrow().equals(mosaic.get_policies().to_arrow())
+
+
+@pytest.mark.unit
+def test_job_table_matches_job_list(mosaic):
+
+    pytest.importorskip('numpy')
+    columns = ['_id', 'current_state', 'start_time', 'end_time']
+    table = mosaic.get_job_table()
+    jobs = mosaic.get_jobs()
+
+    frame = table.to_dataframe()
+    expected = jobs.to_dataframe(columns=columns)
+    assert list(frame.columns) == columns
+    assert isinstance(frame['current_state'].dtype, pandas.CategoricalDtype)
+    assert str(frame['end_time'].dt.tz) == 'UTC'
+    pandas.testing.assert_frame_equal(frame.astype({'current_state': str}), expected.astype({'current_state': str}))
+
+    arrow = table.to_arrow()
+    assert arrow.schema.field('start_time').type == pyarrow.timestamp('s', tz='UTC')
+    assert pyarrow.types.is_dictionary(arrow.schema.field('current_state').type)
+    assert arrow.column('current_state').to_pylist() == jobs.to_arrow(columns=columns).column('current_state').to_pylist()
+    assert arrow.column('end_time').to_pylist() == jobs.to_arrow(columns=columns).column('end_time').to_pylist()
@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pytest
+import rubrik_mosaic
+
+# The fake Rubrik Mosaic server lives with the benchmarks, which are not a package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'benchmarks'))
+from fake_mosaic import FakeMosaicServer, SyntheticCluster  # noqa: E402
+
+
+def pytest_configure(config):
+
+    config.addinivalue_line('markers', 'unit: a test that runs against the fake Rubrik Mosaic server')
+
+
+@pytest.fixture(autouse=True)
+def no_environment(monkeypatch):
+
+    for name in ('rubrik_mosaic_node_ip', 'rubrik_mosaic_port', 'rubrik_mosaic_username', 'rubrik_mosaic_password'):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def cluster():
+
+    return SyntheticCluster(stores=3, sources=5, policies=10, jobs=200)
+
+
+@pytest.fixture(scope='session')
+def certificate():
+
+    # Generating a self-signed certificate takes longer than most tests, every server of the session shares one
+    directory = tempfile.mkdtemp(prefix='fake_mosaic_')
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.check_call(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-subj', '/CN=localhost', '-days', '1',
+                           '-keyout', key, '-out', cert], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    yield cert, key
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def server(cluster, certificate):
+
+    server = FakeMosaicServer(cluster, cert=certificate[0], key=certificate[1]).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def connect(server):
+
+    connections = []
+
+    def connect(**kwargs):
+        kwargs.setdefault('node_ip', '127.0.0.1')
+        kwargs.setdefault('port', server.port)
+        connection = rubrik_mosaic.Connect(username='admin', password='admin', **kwargs)
+        connections.append(connection)
+        return connection
+
+    yield connect
+    for connection in connections:
+        connection.close()
+
+
+@pytest.fixture
+def mosaic(connect):
+
+    return connect()
+
+
+@pytest.fixture
+def publish(server):
+
+    def publish(path, data):
+        # Replace the response of a GET endpoint, or remove it so the endpoint returns a 404
+        if data is None:
+            server._responses.pop('/datos' + path, None)
+        else:
+            server._responses['/datos' + path] = json.dumps({'status': 'ok', 'data': data}).encode('utf-8')
+
+    return publish
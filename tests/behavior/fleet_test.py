@@ -0,0 +1,76 @@
+import pytest
+import rubrik_mosaic
+from fake_mosaic import FakeMosaicServer, SyntheticCluster
+from rubrik_mosaic.exceptions import RubrikConnectionException
+
+
+@pytest.fixture
+def servers(certificate):
+
+    started = []
+
+    def start(latency=0):
+        server = FakeMosaicServer(SyntheticCluster(stores=1, sources=1, policies=3, jobs=10), latency=latency,
+                                  cert=certificate[0], key=certificate[1]).start()
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.stop()
+
+
+def _config(name, server):
+
+    return dict(name=name, node_ip='127.0.0.1', port=server.port, username='admin', password='admin')
+
+
+@pytest.mark.unit
+def test_results_are_merged(servers):
+
+    clusters = [_config('cluster-{}'.format(index), servers()) for index in range(3)]
+
+    with rubrik_mosaic.MosaicFleet(clusters) as fleet:
+        result = fleet.get_backup_count()
+        jobs = fleet.get_jobs()
+
+    assert sorted(result.results) == ['cluster-0', 'cluster-1', 'cluster-2']
+    assert result.errors == {}
+    assert result.merge() == 3 * result.results['cluster-0']
+    assert len(jobs.merge()) == 30
+
+
+@pytest.mark.unit
+def test_failing_cluster_is_isolated(servers):
+
+    clusters = [_config('healthy', servers()), dict(name='down', node_ip='127.0.0.2', port=9, username='admin', password='admin')]
+
+    with rubrik_mosaic.MosaicFleet(clusters) as fleet:
+        result = fleet.get_backup_count()
+
+    assert list(result.results) == ['healthy']
+    assert list(result.errors) == ['down']
+    assert isinstance(result.errors['down'], RubrikConnectionException)
+
+
+@pytest.mark.unit
+def test_timeout_is_counted_from_when_each_cluster_starts(servers):
+
+    # A single worker runs the clusters one at a time, the queued clusters must not time out while the slow one runs
+    clusters = [_config('slow', servers(latency=1.5))] + [_config('fast-{}'.format(index), servers(latency=0.1)) for index in range(3)]
+
+    with rubrik_mosaic.MosaicFleet(clusters, max_workers=1, timeout=1) as fleet:
+        result = fleet.get_backup_count()
+
+    assert sorted(result.results) == ['fast-0', 'fast-1', 'fast-2']
+    assert list(result.errors) == ['slow']
+    assert 'within 1 seconds' in str(result.errors['slow'])
+
+
+@pytest.mark.unit
+def test_duplicate_cluster_names(servers):
+
+    server = servers()
+
+    with pytest.raises(ValueError):
+        rubrik_mosaic.MosaicFleet([_config('cluster', server), _config('cluster', server)])
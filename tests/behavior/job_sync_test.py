@@ -0,0 +1,99 @@
+import json
+import os
+import time
+
+import pytest
+import rubrik_mosaic
+from rubrik_mosaic.records import Job
+
+
+def _new_jobs(count, state='job_failed'):
+
+    now = int(time.time())
+    return [{'_id': 'new-job-{}'.format(index), 'current_state': state, 'start_time': now - 60, 'end_time': now + index}
+            for index in range(count)]
+
+
+@pytest.mark.unit
+def test_poll_only_returns_new_jobs(cluster, mosaic, publish, tmp_path):
+
+    sync = rubrik_mosaic.JobSync(mosaic, str(tmp_path / 'jobs.json'))
+
+    assert len(sync.poll()) == len(cluster.jobs)
+    assert sync.poll() == []
+
+    newjobs = _new_jobs(2)
+    publish('/listjobs', cluster.jobs + newjobs)
+    assert sync.poll() == newjobs
+    assert sync.watermark == {'end_time': newjobs[1]['end_time'], '_id': newjobs[1]['_id']}
+    assert set(job['_id'] for job in newjobs) <= set(job['_id'] for job in sync.get_job_summary('job_failed', 1))
+
+
+@pytest.mark.unit
+def test_state_is_reloaded(cluster, mosaic, publish, tmp_path):
+
+    state_file = str(tmp_path / 'jobs.json')
+    sync = rubrik_mosaic.JobSync(mosaic, state_file)
+    sync.poll()
+    publish('/listjobs', cluster.jobs + _new_jobs(3))
+    sync.poll()
+
+    reloaded = rubrik_mosaic.JobSync(mosaic, state_file)
+    assert reloaded.watermark == sync.watermark
+    assert reloaded.jobs == sync.jobs
+    assert reloaded.poll() == []
+
+
+@pytest.mark.unit
+def test_polls_are_journaled(cluster, mosaic, publish, tmp_path):
+
+    state_file = str(tmp_path / 'jobs.json')
+    sync = rubrik_mosaic.JobSync(mosaic, state_file)
+    sync.poll()
+    with open(state_file) as state:
+        snapshot = state.read()
+
+    newjobs = _new_jobs(2)
+    publish('/listjobs', cluster.jobs + newjobs)
+    sync.poll()
+
+    with open(state_file) as state:
+        assert state.read() == snapshot
+    with open(sync.journal_file) as journal:
+        entries = [json.loads(line) for line in journal]
+    assert entries == [{'watermark': sync.watermark, 'jobs': newjobs}]
+
+
+@pytest.mark.unit
+def test_incomplete_journal_entry_is_ignored(cluster, mosaic, publish, tmp_path):
+
+    state_file = str(tmp_path / 'jobs.json')
+    sync = rubrik_mosaic.JobSync(mosaic, state_file)
+    sync.poll()
+    publish('/listjobs', cluster.jobs + _new_jobs(2))
+    sync.poll()
+    with open(sync.journal_file, 'a') as journal:
+        journal.write('{"watermark": {"end_t')
+
+    reloaded = rubrik_mosaic.JobSync(mosaic, state_file)
+    assert reloaded.jobs == sync.jobs
+    reloaded.poll()
+    assert not os.path.exists(reloaded.journal_file)
+    assert rubrik_mosaic.JobSync(mosaic, state_file).jobs == sync.jobs
+
+
+@pytest.mark.unit
+def test_records(cluster, connect, publish, tmp_path):
+
+    state_file = str(tmp_path / 'jobs.json')
+    mosaic = connect(records=True)
+    sync = rubrik_mosaic.JobSync(mosaic, state_file)
+    sync.poll()
+    expected = _new_jobs(2)
+    publish('/listjobs', cluster.jobs + expected)
+
+    newjobs = sync.poll()
+    assert all(isinstance(job, Job) for job in newjobs)
+    assert newjobs == expected
+    assert all(isinstance(job, Job) for job in sync.get_job_summary('job_failed', 1))
+    assert rubrik_mosaic.JobSync(mosaic, state_file).jobs == sync.jobs
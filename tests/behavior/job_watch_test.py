@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+import rubrik_mosaic
+from rubrik_mosaic.records import Job
+
+
+@pytest.fixture
+def jobs(cluster, publish):
+
+    # Start with every job finished so the cluster is idle
+    for job in cluster.jobs:
+        if job['current_state'] == 'job_scheduled':
+            job['current_state'] = 'job_successful'
+    publish('/listjobs', cluster.jobs)
+    return cluster.jobs
+
+
+@pytest.mark.unit
+def test_only_state_changes_are_reported(jobs, mosaic, publish):
+
+    watcher = rubrik_mosaic.JobWatcher(mosaic, min_interval=1, max_interval=8)
+
+    assert watcher.poll() == []
+    assert watcher.poll() == []
+    previous = jobs[5]['current_state']
+    jobs[5]['current_state'] = 'job_scheduled'
+    jobs.append(dict(jobs[0], _id='new-job', current_state='job_failed'))
+    publish('/listjobs', jobs)
+
+    transitions = watcher.poll()
+    assert [(transition.job_id, transition.previous_state, transition.current_state) for transition in transitions] == [
+        (jobs[5]['_id'], previous, 'job_scheduled'), ('new-job', None, 'job_failed')]
+    assert transitions[1].job == jobs[-1]
+
+
+@pytest.mark.unit
+def test_poll_interval_adapts(jobs, mosaic, publish):
+
+    watcher = rubrik_mosaic.JobWatcher(mosaic, min_interval=1, max_interval=8)
+
+    for interval in (2, 4, 8, 8):
+        watcher.poll()
+        assert watcher.interval == interval
+
+    jobs[5]['current_state'] = 'job_scheduled'
+    publish('/listjobs', jobs)
+    watcher.poll()
+    assert watcher.interval == 1
+    watcher.poll()
+    assert watcher.interval == 1
+
+    jobs[5]['current_state'] = 'job_failed'
+    publish('/listjobs', jobs)
+    assert len(watcher.poll()) == 1
+    assert watcher.interval == 1
+    watcher.poll()
+    assert watcher.interval == 2
+
+
+@pytest.mark.unit
+def test_watch_filters_states_and_stops(jobs, connect, publish):
+
+    mosaic = connect(records=True)
+    jobs[7]['current_state'] = 'job_successful'
+    jobs[8]['current_state'] = 'job_successful'
+    publish('/listjobs', jobs)
+
+    def change():
+        jobs[7]['current_state'] = 'job_failed'
+        jobs[8]['current_state'] = 'job_aborted'
+        publish('/listjobs', jobs)
+
+    seen = []
+
+    def callback(transition):
+        seen.append(transition)
+        return False
+
+    changed = threading.Timer(0.2, change)
+    changed.start()
+    mosaic.watch_jobs('job_failed', min_interval=0.05, max_interval=0.05, callback=callback, max_polls=100)
+    changed.join()
+
+    assert [transition.job_id for transition in seen] == [jobs[7]['_id']]
+    assert isinstance(seen[0].job, Job)
+
+
+@pytest.mark.unit
+def test_failed_poll_backs_off(jobs, mosaic, publish):
+
+    watcher = rubrik_mosaic.JobWatcher(mosaic, min_interval=0.01, max_interval=0.04)
+    publish('/listjobs', None)
+
+    assert list(watcher.watch(max_polls=2)) == []
+    assert watcher.errors == 2
+    assert watcher.interval == 0.04
@@ -0,0 +1,66 @@
+import json
+import math
+
+import pytest
+import rubrik_mosaic
+from rubrik_mosaic import json_backend
+
+
+@pytest.fixture(autouse=True)
+def restore_backend(monkeypatch):
+
+    # set_json_backend() changes the backend of the whole process, restore it after each test
+    monkeypatch.setattr(json_backend, '_backend', json_backend._backend)
+    monkeypatch.setattr(json_backend, '_loads', json_backend._loads)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('backend', sorted(json_backend.BACKENDS))
+def test_backend_by_name(cluster, mosaic, backend):
+
+    rubrik_mosaic.set_json_backend(backend)
+
+    assert rubrik_mosaic.get_json_backend() == backend
+    assert mosaic.get_backup_count() == sum(policy['version_count'] for policy in cluster.policies)
+
+
+@pytest.mark.unit
+def test_backend_function(cluster, mosaic):
+
+    decoded = []
+
+    def decode(data):
+        decoded.append(data)
+        return json.loads(data)
+
+    rubrik_mosaic.set_json_backend(decode)
+
+    assert rubrik_mosaic.get_json_backend() == 'custom'
+    assert len(mosaic.get_policies()) == len(cluster.policies)
+    # The login and the /listpolicy response
+    assert len(decoded) == 2
+
+
+@pytest.mark.unit
+def test_invalid_backend(monkeypatch):
+
+    with pytest.raises(ValueError):
+        rubrik_mosaic.set_json_backend('simplejson')
+    monkeypatch.delitem(json_backend.BACKENDS, 'orjson', raising=False)
+    with pytest.raises(ImportError):
+        rubrik_mosaic.set_json_backend('orjson')
+
+
+@pytest.mark.unit
+def test_documents_orjson_rejects_are_decoded_with_json(mosaic, publish):
+
+    pytest.importorskip('orjson')
+    rubrik_mosaic.set_json_backend('orjson')
+    publish('/liststore', [{'store_name': 'store-0', 'store_size': 2 ** 70, 'dedup_ratio': float('nan')}])
+
+    store = mosaic.get('/liststore')['data'][0]
+
+    assert store['store_size'] == 2 ** 70
+    assert math.isnan(store['dedup_ratio'])
+    with pytest.raises(ValueError):
+        json_backend.loads(b'{"data": ')
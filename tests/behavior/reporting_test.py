@@ -0,0 +1,109 @@
+import logging
+
+import pytest
+from rubrik_mosaic.exceptions import RubrikConnectionException
+from rubrik_mosaic.records import Job, Policy
+
+
+def _expected(cluster):
+
+    enabled = [policy for policy in cluster.policies if not policy['sys_p_doc']['policy_disabled']]
+    return {
+        'protected_object_count': len(enabled),
+        'secondary_storage_consumed': sum(policy['physical_size'] for policy in cluster.policies),
+        'backup_count': sum(policy['version_count'] for policy in cluster.policies),
+        'size_under_protection': sum(int(stats['db_stats']['licensed_size']) for stats in cluster.source_stats.values()
+                                     if stats['db_stats']['status']),
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('records', [False, True])
+def test_aggregates(cluster, connect, records):
+
+    mosaic = connect(records=records)
+    expected = _expected(cluster)
+
+    assert mosaic.get_protected_object_count() == expected['protected_object_count']
+    assert mosaic.get_secondary_storage_consumed() == expected['secondary_storage_consumed']
+    assert mosaic.get_backup_count() == expected['backup_count']
+    assert mosaic.get_size_under_protection() == expected['size_under_protection']
+
+    snapshot = mosaic.snapshot()
+    for name, value in expected.items():
+        assert getattr(snapshot, name) == value
+    assert snapshot.errors == {}
+
+
+@pytest.mark.unit
+def test_records_match_dicts(cluster, connect):
+
+    jobs = connect(records=True).get_jobs()
+    policies = connect(records=True).get_policies()
+
+    assert all(isinstance(job, Job) for job in jobs)
+    assert [job.to_dict() for job in jobs] == cluster.jobs
+    assert all(isinstance(policy, Policy) for policy in policies)
+    assert policies == cluster.policies
+
+
+@pytest.mark.unit
+def test_policy_decodes_sys_p_doc_on_access(cluster):
+
+    document = cluster.policies[0]
+    policy = Policy.from_dict(document)
+
+    assert isinstance(policy._sys_p_doc, bytes)
+    assert policy['sys_p_doc'] == document['sys_p_doc']
+    assert policy.policy_group_name == document['sys_p_doc']['policy_group_name']
+    assert list(policy.to_dict()) == list(document)
+    assert 'sys_p_doc' not in Policy.from_dict({'_id': 'policy'})
+
+
+@pytest.mark.unit
+def test_stats_error_is_raised_by_default(mosaic, publish):
+
+    publish('/getsourcestats/source-1', None)
+
+    with pytest.raises(RubrikConnectionException, match='Unknown endpoint /datos/getsourcestats/source-1'):
+        mosaic.get_source_stats()
+    with pytest.raises(RubrikConnectionException):
+        mosaic.get_size_under_protection()
+    with pytest.raises(RubrikConnectionException):
+        mosaic.snapshot()
+
+
+@pytest.mark.unit
+def test_stats_errors_are_collected_on_request(cluster, mosaic, publish, caplog):
+
+    publish('/getsourcestats/source-1', None)
+
+    stats = mosaic.get_source_stats(collect_errors=True)
+    assert len(stats) == len(cluster.sources) - 1
+    assert list(stats.errors) == ['source-1']
+
+    with caplog.at_level(logging.WARNING, logger='rubrik_mosaic'):
+        snapshot = mosaic.snapshot(collect_errors=True)
+    assert list(snapshot.errors) == ['source_stats']
+    assert list(snapshot.errors['source_stats']) == ['source-1']
+    assert 'source-1' in caplog.text
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_store_stats(cluster, connect, max_workers):
+
+    stats = connect(max_workers=max_workers).get_store_stats()
+
+    assert stats == [cluster.store_stats[name] for name in cluster.stores]
+
+
+@pytest.mark.unit
+def test_job_summary_matches_job_table(mosaic):
+
+    summary = mosaic.get_job_summary(['job_failed', 'job_aborted'], [12, 24])
+    table = mosaic.get_job_table()
+
+    for hours in (12, 24):
+        assert len(summary[hours]) == table.count(job_state=['job_failed', 'job_aborted'], num_hours=hours)
+    assert len(mosaic.get_job_summary('job_failed', 24)) == table.count(job_state='job_failed', num_hours=24)
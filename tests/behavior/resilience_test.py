@@ -0,0 +1,184 @@
+import json
+
+import pytest
+import requests
+import rubrik_mosaic
+from rubrik_mosaic.exceptions import CircuitOpenException, RubrikConnectionException
+
+
+class FaultyTransport(rubrik_mosaic.Transport):
+    """Fails the next `failures` API calls, logins included when `logins` is set, with a connection error or a status code.
+    When `node` is set only the API calls sent to that node fail."""
+
+    def __init__(self, failures=0, status_code=None, logins=False, node=None):
+        self.failures = failures
+        self.status_code = status_code
+        self.logins = logins
+        self.node = node
+        self.sent = 0
+        self.failed = 0
+
+    def send(self, session, method, url, **kwargs):
+        self.sent += 1
+        if self.failures and (self.logins or not url.endswith('/login')) and (self.node is None or '//{}:'.format(self.node) in url):
+            self.failed += 1
+            self.failures -= 1
+            if self.status_code is None:
+                raise requests.exceptions.ConnectionError('Connection refused')
+            response = requests.Response()
+            response.status_code = self.status_code
+            response.url = url
+            response.request = requests.Request(method, url).prepare()
+            response._content = json.dumps({'errorType': 'Unavailable', 'message': 'Node unavailable'}).encode('utf-8')
+            return response
+        return super().send(session, method, url, **kwargs)
+
+
+def _retry():
+
+    return rubrik_mosaic.RetryPolicy(max_retries=3, backoff_factor=0)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('status_code', [None, 503])
+def test_get_is_retried(connect, status_code):
+
+    retry = _retry()
+    mosaic = connect(retry=retry, transport=FaultyTransport(2, status_code))
+
+    assert len(mosaic.get('/liststore')['data']) == 3
+    assert retry.stats()['retries'] == 2
+
+
+@pytest.mark.unit
+def test_exhausted_retries_raise(connect):
+
+    retry = _retry()
+    mosaic = connect(retry=retry, transport=FaultyTransport(10, 503))
+
+    with pytest.raises(RubrikConnectionException, match='Node unavailable'):
+        mosaic.get('/liststore')
+    assert retry.stats()['exhausted'] == 1
+
+
+@pytest.mark.unit
+def test_post_is_not_retried(connect):
+
+    transport = FaultyTransport()
+    mosaic = connect(retry=_retry(), transport=transport)
+    mosaic.get('/liststore')
+    transport.failures = 1
+    sent = transport.sent
+
+    with pytest.raises(RubrikConnectionException):
+        mosaic.post('/liststore', {})
+    assert transport.sent - sent == 1
+
+
+@pytest.mark.unit
+def test_login_is_retried(server, connect):
+
+    mosaic = connect(retry=_retry(), transport=FaultyTransport(2, logins=True))
+
+    assert len(mosaic.get('/liststore')['data']) == 3
+    assert server.logins == 1
+
+
+@pytest.mark.unit
+def test_circuit_breaker_opens_and_recovers(connect):
+
+    transport = FaultyTransport()
+    circuit_breaker = rubrik_mosaic.CircuitBreaker(failure_threshold=2, recovery_timeout=0.2)
+    mosaic = connect(circuit_breaker=circuit_breaker, transport=transport)
+    mosaic.get('/liststore')
+    transport.failures = 2
+
+    for _ in range(2):
+        with pytest.raises(RubrikConnectionException):
+            mosaic.get('/liststore')
+    sent = transport.sent
+    with pytest.raises(CircuitOpenException):
+        mosaic.get('/liststore')
+    assert transport.sent == sent
+
+    breaker = mosaic.node_pool.circuit_breakers['127.0.0.1']
+    breaker._opened_at -= 0.2
+    assert len(mosaic.get('/liststore')['data']) == 3
+    assert breaker.state == breaker.CLOSED
+
+
+@pytest.mark.unit
+def test_token_is_refreshed_by_a_half_open_probe(server, connect):
+
+    transport = FaultyTransport()
+    mosaic = connect(circuit_breaker=rubrik_mosaic.CircuitBreaker(failure_threshold=1), transport=transport)
+    mosaic.get('/liststore')
+    transport.failures = 1
+    with pytest.raises(RubrikConnectionException):
+        mosaic.get('/liststore')
+    breaker = mosaic.node_pool.circuit_breakers['127.0.0.1']
+    breaker._opened_at -= breaker.recovery_timeout
+
+    # The probe is rejected with a 401, the login that follows is sent to the same, and only, node
+    server._tokens.clear()
+    assert len(mosaic.get('/liststore')['data']) == 3
+    assert server.logins == 2
+    assert breaker.state == breaker.CLOSED
+
+
+@pytest.mark.unit
+def test_client_errors_do_not_open_the_circuit(connect):
+
+    mosaic = connect(circuit_breaker=rubrik_mosaic.CircuitBreaker(failure_threshold=2))
+
+    for _ in range(3):
+        with pytest.raises(RubrikConnectionException):
+            mosaic.get('/nope')
+    assert mosaic.node_pool.circuit_breakers['127.0.0.1'].state == 'closed'
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('node_strategy', ['round_robin', 'least_latency'])
+def test_failover_to_a_healthy_node(server, connect, node_strategy):
+
+    # Nothing listens on 127.0.0.2 so every API call sent to it is refused
+    mosaic = connect(node_ip=['127.0.0.2', '127.0.0.1'], node_strategy=node_strategy)
+
+    for _ in range(6):
+        assert mosaic.get_backup_count() > 0
+        assert len(list(mosaic.iter_jobs())) == 200
+
+
+@pytest.mark.unit
+def test_server_error_is_retried_on_another_node(connect):
+
+    # Both nodes are the fake server, the one with the lowest response time fails with a server error
+    retry = _retry()
+    transport = FaultyTransport(10, 503, logins=True, node='127.0.0.1')
+    mosaic = connect(node_ip=['127.0.0.1', 'localhost'], node_strategy='least_latency', retry=retry, transport=transport)
+    mosaic.node_pool.latency.update({'127.0.0.1': 0.001, 'localhost': 1})
+
+    assert len(mosaic.get('/liststore')['data']) == 3
+    # The login and the GET each fail once on 127.0.0.1 and are retried on localhost
+    assert transport.failed == 2
+    assert retry.stats()['retries'] == 2
+
+
+@pytest.mark.unit
+def test_every_node_down(connect):
+
+    mosaic = connect(node_ip='127.0.0.2,127.0.0.3')
+
+    with pytest.raises(RubrikConnectionException):
+        mosaic.get('/liststore')
+
+
+@pytest.mark.unit
+def test_half_open_nodes_are_probed_once():
+
+    pool = rubrik_mosaic.NodePool(['a', 'b', 'c'], 'least_latency', rubrik_mosaic.CircuitBreaker(failure_threshold=1, recovery_timeout=0))
+    pool.record_failure('b')
+
+    candidates = pool._candidates()
+    assert candidates[0] == 'b'
+    assert sorted(candidates) == ['a', 'b', 'c']
@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+import rubrik_mosaic
+from rubrik_mosaic.exceptions import RubrikConnectionException
+
+
+def _tree(span):
+
+    return (span.name, span.kind, [_tree(child) for child in span.children])
+
+
+def _phases(names):
+
+    return [(name, 'phase', []) for name in names]
+
+
+@pytest.mark.unit
+def test_span_tree(connect):
+
+    tracer = rubrik_mosaic.Tracer()
+    mosaic = connect(tracer=tracer)
+
+    mosaic.get_backup_count()
+    mosaic.get_job_summary('job_failed', 24)
+
+    backup_count, job_summary = tracer.traces
+    assert _tree(backup_count) == (
+        'get_backup_count', 'method', [
+            ('get_policies', 'method', [
+                ('GET /listpolicy', 'request', [('login', 'login', _phases(['request', 'transfer']))] + _phases(['request', 'transfer', 'decode']))])])
+    # /listjobs is streamed, its transfer and decode phases are measured as the jobs are consumed
+    assert _tree(job_summary) == ('get_job_summary', 'method', [('GET /listjobs', 'request', _phases(['request', 'transfer', 'decode']))])
+
+    request = backup_count.children[0].children[0]
+    assert request.attributes == {'method': 'GET', 'endpoint': '/listpolicy'}
+    assert request.children[1].attributes['status_code'] == 200
+    assert request.children[2].attributes['bytes'] > 0
+
+
+@pytest.mark.unit
+def test_self_time(server, connect):
+
+    tracer = rubrik_mosaic.Tracer()
+    mosaic = connect(tracer=tracer)
+    mosaic.get('/liststore')
+    server.latency = 0.1
+
+    mosaic.get_backup_count()
+
+    backup_count = tracer.traces[-1]
+    request = backup_count.children[0].children[0]
+    assert request.children[0].duration >= 0.1
+    # The time of the API call is spent in its phases, not in the spans of the reporting functions
+    assert request.self_time == pytest.approx(request.duration - sum(child.duration for child in request.children))
+    assert backup_count.self_time < 0.1
+    assert backup_count.duration >= 0.1
+    assert backup_count.to_dict()['self_time'] == backup_count.self_time
+
+
+@pytest.mark.unit
+def test_hooks(connect):
+
+    started = []
+    ended = []
+    tracer = rubrik_mosaic.Tracer(on_request_start=started.append, on_request_end=ended.append)
+    mosaic = connect(tracer=tracer)
+
+    mosaic.get_backup_count()
+    with pytest.raises(RubrikConnectionException):
+        mosaic.get('/nope')
+
+    assert [span.name for span in started][:3] == ['get_backup_count', 'get_policies', 'GET /listpolicy']
+    assert sorted(map(id, started)) == sorted(map(id, ended))
+    assert all(span.duration is not None for span in ended)
+    # A span ends after all of its children
+    position = dict((id(span), index) for index, span in enumerate(ended))
+    assert all(position[id(child)] < position[id(span)] for span in ended for child in span.children)
+    assert ended[-1] is tracer.traces[1]
+    assert tracer.traces[1].name == 'GET /nope'
+    assert tracer.traces[1].attributes['error'] == 'RubrikConnectionException'
+
+
+@pytest.mark.unit
+def test_worker_threads_attach_their_calls_to_the_caller(cluster, connect):
+
+    threads = {}
+
+    def on_request_start(span):
+        threads[span.name] = threading.get_ident()
+
+    tracer = rubrik_mosaic.Tracer(on_request_start=on_request_start)
+    mosaic = connect(tracer=tracer, max_workers=3)
+    mosaic.get('/liststore')
+
+    mosaic.get_store_stats()
+
+    store_stats = tracer.traces[-1]
+    assert len(tracer.traces) == 2
+    assert store_stats.name == 'get_store_stats'
+    assert sorted(child.name for child in store_stats.children) == ['GET /getstorestats/{}'.format(name) for name in cluster.stores] + ['GET /liststore']
+    assert all(child.parent is store_stats for child in store_stats.children)
+    assert all(threads['GET /getstorestats/{}'.format(name)] != threading.get_ident() for name in cluster.stores)
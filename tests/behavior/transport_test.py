@@ -0,0 +1,41 @@
+import gzip
+
+import pytest
+import rubrik_mosaic
+from rubrik_mosaic.exceptions import RubrikConnectionException
+
+
+@pytest.mark.unit
+def test_record_and_replay(server, connect, tmp_path):
+
+    cassette = str(tmp_path / 'mosaic.cassette.gz')
+    recorder = rubrik_mosaic.RecordTransport(cassette)
+    mosaic = connect(transport=recorder)
+    recorded = mosaic.snapshot()
+    summary = mosaic.get_job_summary('job_failed', 24)
+    mosaic.close()
+    requests = server.requests
+
+    with rubrik_mosaic.Connect('offline', 'user', 'password', transport=rubrik_mosaic.ReplayTransport(cassette)) as replay:
+        replayed = replay.snapshot()
+        assert replayed.backup_count == recorded.backup_count
+        assert replayed.size_under_protection == recorded.size_under_protection
+        assert replayed.jobs == recorded.jobs
+        assert replay.get_job_summary('job_failed', 24) == summary
+        with pytest.raises(RubrikConnectionException, match='does not contain a response'):
+            replay.get('/nope')
+    assert server.requests == requests
+
+
+@pytest.mark.unit
+def test_cassette_does_not_contain_credentials(connect, tmp_path):
+
+    cassette = str(tmp_path / 'mosaic.cassette.gz')
+    mosaic = connect(transport=rubrik_mosaic.RecordTransport(cassette))
+    mosaic.get('/liststore')
+    mosaic.close()
+
+    with gzip.open(cassette, 'rb') as cassette_file:
+        content = cassette_file.read()
+    assert b'fake-mosaic-token' not in content
+    assert b'admin' not in content